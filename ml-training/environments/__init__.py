@@ -2,8 +2,15 @@
 WeMee Game Environments for Gymnasium
 
 A collection of Gymnasium environments for RL training.
+
+SnakeVecEnv and the batched Vec* wrappers need Stable-Baselines3
+(`pip install wemee-environments[sb3]`); they are imported on first access,
+so the Gymnasium environments work without it.
 """
 
+import importlib
+import importlib.util
+
 from gymnasium.envs.registration import register
 
 # Register Snake environment
@@ -14,18 +21,52 @@ register(
 )
 
 # Re-export for convenience
-from environments.snake_env import SnakeEnv
+from environments.snake_env import SnakeEnv, SnakeState
+from environments.recording import EpisodeRecorder, EpisodeReplayer
 from environments.wrappers import (
     Compact11Wrapper,
+    EgocentricWrapper,
+    FrameStackWrapper,
     GridFlattenWrapper,
     ImageWrapper,
     LidarHungerWrapper,
 )
 
+# Stable-Baselines3 classes: name -> module, imported on first access
+_SB3_EXPORTS = {
+    'SnakeVecEnv': 'environments.snake_vec_env',
+    'VecCompact11': 'environments.vec_wrappers',
+    'VecGridFlatten': 'environments.vec_wrappers',
+    'VecImage': 'environments.vec_wrappers',
+    'VecLidarHunger': 'environments.vec_wrappers',
+}
+
+
+def __getattr__(name):
+    if name not in _SB3_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        module = importlib.import_module(_SB3_EXPORTS[name])
+    except ImportError as e:
+        raise ImportError(
+            f"{name} needs stable-baselines3. Run: pip install stable-baselines3"
+        ) from e
+    return getattr(module, name)
+
+
 __all__ = [
     'SnakeEnv',
+    'SnakeState',
+    'EpisodeRecorder',
+    'EpisodeReplayer',
     'Compact11Wrapper',
+    'EgocentricWrapper',
+    'FrameStackWrapper',
     'GridFlattenWrapper',
     'ImageWrapper',
     'LidarHungerWrapper',
 ]
+
+# `from environments import *` must work without the sb3 extra
+if importlib.util.find_spec('stable_baselines3') is not None:
+    __all__ += list(_SB3_EXPORTS)
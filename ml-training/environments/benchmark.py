@@ -0,0 +1,414 @@
+"""
+Micro-Benchmark Harness for the Snake Env Layer
+
+Measures steps/sec and per-step allocations of the raw SnakeEnv and of
+each feature wrapper, on several grid sizes and snake-length regimes, and
+writes machine-readable JSON that can be compared against a stored
+baseline. Run it before long training runs to catch env-layer regressions:
+
+    python -m environments.benchmark --out bench.json
+    python -m environments.benchmark --baseline bench.json --tolerance 0.15
+
+Targets:
+    raw             SnakeEnv alone (Dict observations)
+    raw_inplace     SnakeEnv(obs_mode="inplace")
+    raw_none        SnakeEnv(obs_mode="none"), no observations
+    raw_chain       SnakeEnv(snake_encoding="chain")
+    raw_bitmap      SnakeEnv(snake_encoding="bitmap")
+    raw_jit         JitSnakeEnv (Numba step kernel; plain Python without Numba)
+    compact11       Compact11Wrapper
+    lidar           LidarHungerWrapper (default engine: "table")
+    lidar_bitboard  LidarHungerWrapper on SnakeEnv(bitboard=True)
+    lidar_field     LidarHungerWrapper on SnakeEnv(distance_field=True)
+    lidar_raycast   LidarHungerWrapper reference ray walker
+    grid            GridFlattenWrapper
+    grid_inc        GridFlattenWrapper(incremental=True)
+    image           ImageWrapper
+    image_inc       ImageWrapper(incremental=True)
+    ego             EgocentricWrapper (11x11 window, 4x4 coarse map)
+
+Length regimes (scripted states, see `long_snake_state`):
+    short      the 3-segment start snake
+    mid        body covering ~25% of the board
+    full       body covering ~85% of the board
+
+The snake follows a Hamiltonian cycle, so it never dies and keeps its
+regime; every `restore_every` steps (sooner if it could otherwise fill the
+board) the scripted state is restored, outside the timed region. Envs are
+built with max_snake_length = W*H, so the wrappers see the whole body, as
+in big-grid training.
+
+Allocations: tracemalloc is enabled for a separate, shorter pass (it slows
+execution, so timing runs without it):
+    alloc_peak_bytes  mean over steps of the peak traced memory during one
+                      step (transient allocations: observation arrays,
+                      temporaries)
+    retained_bytes    traced memory growth over the whole pass (leaks)
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import gymnasium as gym
+import numpy as np
+
+from environments.snake_env import SnakeEnv, SnakeState
+from environments.snake_kernel import JitSnakeEnv
+from environments.wrappers import (
+    Compact11Wrapper,
+    EgocentricWrapper,
+    GridFlattenWrapper,
+    ImageWrapper,
+    LidarHungerWrapper,
+)
+
+
+class Target(NamedTuple):
+    """A benchmarked configuration: env class and options plus a wrapper."""
+    wrap: Callable[[gym.Env], gym.Env]
+    env_kwargs: Dict[str, Any] = {}
+    env_cls: type = SnakeEnv
+
+
+def _unwrapped(env: gym.Env) -> gym.Env:
+    return env
+
+
+TARGETS: Dict[str, Target] = {
+    "raw": Target(_unwrapped),
+    "raw_inplace": Target(_unwrapped, {"obs_mode": "inplace"}),
+    "raw_none": Target(_unwrapped, {"obs_mode": "none"}),
+    "raw_chain": Target(_unwrapped, {"snake_encoding": "chain"}),
+    "raw_bitmap": Target(_unwrapped, {"snake_encoding": "bitmap"}),
+    "raw_jit": Target(_unwrapped, env_cls=JitSnakeEnv),
+    "compact11": Target(Compact11Wrapper),
+    "lidar": Target(LidarHungerWrapper),
+    "lidar_bitboard": Target(
+        lambda env: LidarHungerWrapper(env, engine="bitboard"), {"bitboard": True}
+    ),
+    "lidar_field": Target(
+        lambda env: LidarHungerWrapper(env, engine="field"), {"distance_field": True}
+    ),
+    "lidar_raycast": Target(lambda env: LidarHungerWrapper(env, engine="raycast")),
+    "grid": Target(GridFlattenWrapper),
+    "grid_inc": Target(lambda env: GridFlattenWrapper(env, incremental=True)),
+    "image": Target(ImageWrapper),
+    "image_inc": Target(lambda env: ImageWrapper(env, incremental=True)),
+    "ego": Target(EgocentricWrapper),
+}
+
+# Fraction of the board covered by the body (short = start snake)
+REGIMES = {"short": 0.0, "mid": 0.25, "full": 0.85}
+
+GRID_SIZES = (10, 20, 40)
+
+# Action deltas: 0=UP, 1=DOWN, 2=LEFT, 3=RIGHT
+_DELTA_TO_ACTION = {(0, -1): 0, (0, 1): 1, (-1, 0): 2, (1, 0): 3}
+
+
+def hamiltonian_cycle(grid_width: int, grid_height: int) -> List[Tuple[int, int]]:
+    """
+    A cycle through every cell (grid_height must be even).
+
+    Rows are swept in a serpentine over columns 1..W-1 and column 0 is the
+    way back up: (0,0) -> (W-1,0) -> (1,1) ... -> (0,H-1) -> (0,1).
+    """
+    if grid_height % 2:
+        raise ValueError(f"grid_height must be even, got {grid_height}")
+    cycle = [(0, 0)]
+    for y in range(grid_height):
+        xs = range(1, grid_width) if y % 2 == 0 else range(grid_width - 1, 0, -1)
+        cycle.extend((x, y) for x in xs)
+    cycle.extend((0, y) for y in range(grid_height - 1, 0, -1))
+    return cycle
+
+
+def long_snake_state(env: SnakeEnv, length: int, seed: int = 0) -> SnakeState:
+    """
+    Scripted state: a `length`-segment snake laid along the Hamiltonian cycle.
+
+    The env must have been reset; its RNG state is kept, food goes to a
+    random free cell.
+    """
+    cycle = hamiltonian_cycle(env.grid_width, env.grid_height)
+    n_cells = len(cycle)
+    length = max(2, min(length, n_cells - 1))
+
+    # Head at cycle[length - 1], tail at cycle[0]
+    snake = tuple(cycle[length - 1::-1])
+    occupied = bytearray(n_cells)
+    for x, y in snake:
+        occupied[y * env.grid_width + x] = 1
+    free_cells = [cell for cell in range(n_cells) if not occupied[cell]]
+    free_pos = [-1] * n_cells
+    for i, cell in enumerate(free_cells):
+        free_pos[cell] = i
+
+    food_cell = free_cells[np.random.default_rng(seed).integers(len(free_cells))]
+    dx = snake[0][0] - snake[1][0]
+    dy = snake[0][1] - snake[1][1]
+    return SnakeState(
+        snake=snake,
+        food=(food_cell % env.grid_width, food_cell // env.grid_width),
+        direction=_DELTA_TO_ACTION[(dx, dy)],
+        current_step=0,
+        score=0,
+        game_over=False,
+        occupied=bytes(occupied),
+        free_cells=tuple(free_cells),
+        free_pos=tuple(free_pos),
+        rng_state=env.get_state().rng_state,
+    )
+
+
+class _CyclePolicy:
+    """Next action along the Hamiltonian cycle (never collides)."""
+
+    def __init__(self, grid_width: int, grid_height: int):
+        cycle = hamiltonian_cycle(grid_width, grid_height)
+        self._action = {}
+        for (x0, y0), (x1, y1) in zip(cycle, cycle[1:] + cycle[:1]):
+            self._action[(x0, y0)] = _DELTA_TO_ACTION[(x1 - x0, y1 - y0)]
+
+    def __call__(self, env: SnakeEnv) -> int:
+        return self._action[env.snake[0]]
+
+
+def bench_case(
+    target: str,
+    grid_size: int,
+    regime: str,
+    steps: int = 2000,
+    repeats: int = 3,
+    alloc_steps: int = 200,
+    restore_every: int = 200,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Benchmark one (target, grid size, regime) case.
+
+    Returns:
+        Dict with the case key, snake length, steps_per_sec, us_per_step
+        (best of `repeats`), alloc_peak_bytes and retained_bytes
+    """
+    spec = TARGETS[target]
+    env = spec.env_cls(
+        grid_width=grid_size,
+        grid_height=grid_size,
+        max_steps=10 ** 9,
+        max_snake_length=grid_size * grid_size,
+        **spec.env_kwargs,
+    )
+    wrapped = spec.wrap(env)
+    wrapped.reset(seed=seed)
+    n_cells = grid_size * grid_size
+    length = max(3, int(REGIMES[regime] * n_cells))
+    state = long_snake_state(env, length, seed=seed)
+    policy = _CyclePolicy(grid_size, grid_size)
+    # The snake eats at most once per step: restoring before it could fill
+    # the board keeps it in its regime (and away from the full-board end)
+    restore_every = max(1, min(restore_every, len(state.free_cells) - 1))
+
+    def run(n: int, traced: bool = False) -> float:
+        """
+        Step n times; return the time spent stepping.
+
+        With traced=True (tracemalloc running), the peak traced memory of
+        each step is appended to `peaks` instead.
+        """
+        elapsed = 0.0
+        done = 0
+        while done < n:
+            env.set_state(state)
+            chunk = min(restore_every, n - done)
+            if traced:
+                for _ in range(chunk):
+                    action = policy(env)
+                    tracemalloc.reset_peak()
+                    before = tracemalloc.get_traced_memory()[0]
+                    wrapped.step(action)
+                    peaks.append(tracemalloc.get_traced_memory()[1] - before)
+            else:
+                start = time.perf_counter()
+                for _ in range(chunk):
+                    wrapped.step(policy(env))
+                elapsed += time.perf_counter() - start
+            done += chunk
+        return elapsed
+
+    peaks: List[int] = []
+    run(min(steps, 100))  # warm-up (lazy tables, caches)
+    best = min(run(steps) for _ in range(repeats))
+
+    # Allocation pass
+    tracemalloc.start()
+    try:
+        env.set_state(state)
+        baseline_memory = tracemalloc.get_traced_memory()[0]
+        run(alloc_steps, traced=True)
+        retained = tracemalloc.get_traced_memory()[0] - baseline_memory
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "target": target,
+        "grid": grid_size,
+        "regime": regime,
+        "snake_length": length,
+        "steps_per_sec": steps / best,
+        "us_per_step": best / steps * 1e6,
+        "alloc_peak_bytes": float(np.mean(peaks)) if peaks else 0.0,
+        "retained_bytes": int(retained),
+    }
+
+
+def run_benchmarks(
+    targets: Sequence[str] = tuple(TARGETS),
+    grid_sizes: Sequence[int] = GRID_SIZES,
+    regimes: Sequence[str] = tuple(REGIMES),
+    verbose: bool = True,
+    **case_kwargs: Any,
+) -> Dict[str, Any]:
+    """
+    Run every (target, grid size, regime) combination.
+
+    Returns:
+        {"meta": {...}, "results": [bench_case(...), ...]}
+    """
+    for name in targets:
+        if name not in TARGETS:
+            raise ValueError(f"Unknown target: {name!r} (expected one of {tuple(TARGETS)})")
+    for name in regimes:
+        if name not in REGIMES:
+            raise ValueError(f"Unknown regime: {name!r} (expected one of {tuple(REGIMES)})")
+
+    results = []
+    for target in targets:
+        for grid_size in grid_sizes:
+            for regime in regimes:
+                result = bench_case(target, grid_size, regime, **case_kwargs)
+                results.append(result)
+                if verbose:
+                    print(f"{target:>14} {grid_size:>3}x{grid_size:<3} {regime:>5} "
+                          f"len={result['snake_length']:>5}  "
+                          f"{result['steps_per_sec']:>10,.0f} steps/s  "
+                          f"{result['us_per_step']:>8.1f} us  "
+                          f"{result['alloc_peak_bytes']:>9,.0f} B/step")
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "case_kwargs": case_kwargs,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.1,
+) -> List[Dict[str, Any]]:
+    """
+    Compare two benchmark reports case by case.
+
+    Args:
+        current: Report from run_benchmarks()
+        baseline: Stored report
+        tolerance: Allowed relative slowdown before a case counts as a
+            regression (0.1 = 10% fewer steps/sec)
+
+    Returns:
+        One entry per case of `current`, with the speed ratio (current /
+        baseline) and a `regression` flag. Cases the baseline does not have
+        are reported with `new=True` and ratios of None.
+    """
+    def key(result):
+        return (result["target"], result["grid"], result["regime"])
+
+    stored = {key(result): result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        old = stored.get(key(result))
+        if old is None:
+            rows.append({
+                "target": result["target"],
+                "grid": result["grid"],
+                "regime": result["regime"],
+                "speed_ratio": None,
+                "alloc_ratio": None,
+                "regression": False,
+                "new": True,
+            })
+            continue
+        ratio = result["steps_per_sec"] / old["steps_per_sec"]
+        rows.append({
+            "target": result["target"],
+            "grid": result["grid"],
+            "regime": result["regime"],
+            "speed_ratio": ratio,
+            "alloc_ratio": (
+                result["alloc_peak_bytes"] / old["alloc_peak_bytes"]
+                if old["alloc_peak_bytes"] else None
+            ),
+            "regression": ratio < 1.0 - tolerance,
+            "new": False,
+        })
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Snake env and wrappers")
+    parser.add_argument("--targets", nargs="+", default=list(TARGETS), choices=list(TARGETS))
+    parser.add_argument("--grids", nargs="+", type=int, default=list(GRID_SIZES),
+                        help="Grid sizes (even; default: 10 20 40)")
+    parser.add_argument("--regimes", nargs="+", default=list(REGIMES), choices=list(REGIMES))
+    parser.add_argument("--steps", type=int, default=2000, help="Timed steps per repeat (default: 2000)")
+    parser.add_argument("--repeats", type=int, default=3, help="Timing repeats, best is kept (default: 3)")
+    parser.add_argument("--out", type=str, default=None, help="Write the JSON report here")
+    parser.add_argument("--baseline", type=str, default=None, help="Compare against a stored report")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Allowed relative slowdown vs baseline (default: 0.1)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        targets=args.targets,
+        grid_sizes=args.grids,
+        regimes=args.regimes,
+        steps=args.steps,
+        repeats=args.repeats,
+    )
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written: {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.tolerance)
+        print(f"\nvs baseline {args.baseline} (tolerance {args.tolerance:.0%}):")
+        for row in rows:
+            if row["new"]:
+                print(f"{row['target']:>14} {row['grid']:>3} {row['regime']:>5}  "
+                      f"   -   not in baseline")
+                continue
+            flag = "REGRESSION" if row["regression"] else "ok"
+            print(f"{row['target']:>14} {row['grid']:>3} {row['regime']:>5}  "
+                  f"x{row['speed_ratio']:.2f}  {flag}")
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
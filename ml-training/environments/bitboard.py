@@ -0,0 +1,126 @@
+"""
+Bitboard Representation for Snake Grids
+
+Stores the snake body as "rotated bitboards" (one Python int per line of
+the grid, one bit per cell) so that collision checks, free-cell counts and
+the 8-direction distance queries used by LIDAR features are a handful of
+bit operations instead of Python loops over tuples and sets.
+
+Four views of the same set of cells are kept in sync:
+    - rows[y]:               bit x set   (LEFT / RIGHT rays)
+    - cols[x]:               bit y set   (UP / DOWN rays)
+    - diag[x - y + H - 1]:   bit y set   (UP-LEFT / DOWN-RIGHT rays)
+    - anti[x + y]:           bit y set   (UP-RIGHT / DOWN-LEFT rays)
+
+Grid walls are the board boundary: every line knows its first and last
+cell, so a ray that finds no body bit ends at the wall.
+
+Grids up to 64x64 are supported, so each line fits in a single machine word.
+"""
+
+from typing import List, Tuple
+
+MAX_BITBOARD_SIZE = 64
+
+
+class SnakeBitboard:
+    """
+    Rotated bitboards for a grid_width x grid_height Snake board.
+
+    Example:
+        >>> board = SnakeBitboard(20, 20)
+        >>> board.set(5, 5)
+        >>> board.ray(5, 9, 0, -1)   # UP from (5, 9): body 4 cells away
+        (4, False)
+    """
+
+    def __init__(self, grid_width: int, grid_height: int):
+        if grid_width > MAX_BITBOARD_SIZE or grid_height > MAX_BITBOARD_SIZE:
+            raise ValueError(
+                f"Bitboard supports grids up to {MAX_BITBOARD_SIZE}x{MAX_BITBOARD_SIZE}, "
+                f"got {grid_width}x{grid_height}"
+            )
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.rows: List[int] = [0] * grid_height
+        self.cols: List[int] = [0] * grid_width
+        self.diag: List[int] = [0] * (grid_width + grid_height - 1)
+        self.anti: List[int] = [0] * (grid_width + grid_height - 1)
+        self.count = 0
+
+    def clear_all(self) -> None:
+        """Remove every cell from the board."""
+        self.rows = [0] * self.grid_height
+        self.cols = [0] * self.grid_width
+        self.diag = [0] * (self.grid_width + self.grid_height - 1)
+        self.anti = [0] * (self.grid_width + self.grid_height - 1)
+        self.count = 0
+
+    def set(self, x: int, y: int) -> None:
+        """Mark cell (x, y) as occupied."""
+        if (self.rows[y] >> x) & 1:
+            return
+        self.rows[y] |= 1 << x
+        self.cols[x] |= 1 << y
+        self.diag[x - y + self.grid_height - 1] |= 1 << y
+        self.anti[x + y] |= 1 << y
+        self.count += 1
+
+    def clear(self, x: int, y: int) -> None:
+        """Mark cell (x, y) as empty."""
+        if not (self.rows[y] >> x) & 1:
+            return
+        self.rows[y] &= ~(1 << x)
+        self.cols[x] &= ~(1 << y)
+        self.diag[x - y + self.grid_height - 1] &= ~(1 << y)
+        self.anti[x + y] &= ~(1 << y)
+        self.count -= 1
+
+    def is_set(self, x: int, y: int) -> bool:
+        """Check if cell (x, y) is occupied (out-of-bounds counts as wall)."""
+        if x < 0 or x >= self.grid_width or y < 0 or y >= self.grid_height:
+            return True
+        return bool((self.rows[y] >> x) & 1)
+
+    @property
+    def free_count(self) -> int:
+        """Number of empty cells."""
+        return self.grid_width * self.grid_height - self.count
+
+    def ray(self, x: int, y: int, dx: int, dy: int) -> Tuple[int, bool]:
+        """
+        Cast a ray from (x, y) in direction (dx, dy), each in {-1, 0, 1}.
+
+        Returns:
+            distance: Steps to the first obstacle (1 = adjacent)
+            hit_wall: True if the obstacle is the board boundary
+        """
+        if dy == 0:
+            # Horizontal: position along the line is x
+            line, pos, step = self.rows[y], x, dx
+            lo, hi = 0, self.grid_width - 1
+        else:
+            # Vertical and diagonal lines: position along the line is y
+            pos, step = y, dy
+            if dx == 0:
+                line = self.cols[x]
+                lo, hi = 0, self.grid_height - 1
+            elif dx == dy:
+                k = x - y
+                line = self.diag[k + self.grid_height - 1]
+                lo, hi = max(0, -k), min(self.grid_height - 1, self.grid_width - 1 - k)
+            else:
+                s = x + y
+                line = self.anti[s]
+                lo, hi = max(0, s - self.grid_width + 1), min(self.grid_height - 1, s)
+
+        if step > 0:
+            ahead = line >> (pos + 1)
+            if ahead:
+                return (ahead & -ahead).bit_length(), False
+            return hi - pos + 1, True
+
+        behind = line & ((1 << pos) - 1)
+        if behind:
+            return pos - behind.bit_length() + 1, False
+        return pos - lo + 1, True
@@ -0,0 +1,145 @@
+"""
+Incremental Per-Direction Distance Field for Snake Grids
+
+Keeps, for every cell and each of the 8 LIDAR directions, the number of
+steps to the first obstacle (body or wall). A LIDAR query at the head is
+then a single column lookup.
+
+Between two steps only the head cell is occupied and the tail cell freed.
+Occupancy of a cell c only changes the distances of cells that look at c:
+walking back from c (direction -d) up to and including the first obstacle,
+the k-th cell has distance
+
+    k                         if c became occupied
+    k + distance[d][c]        if c became empty
+
+so each change walks the 8 back-rays once, stopping at the first obstacle
+(O(W + H), usually far less) instead of recomputing the field. Along a
+ray the flat cell index moves by a constant delta, so the walk is plain
+integer arithmetic on Python lists, which beats NumPy fancy indexing for
+such short, data-dependent runs. Full rebuilds (set_state) use the ray
+index tables from environments/lidar.py.
+
+Like SnakeBitboard, the field is owned by SnakeEnv (`distance_field=True`)
+and sees the full, untruncated body; LidarHungerWrapper reads it with
+engine="field".
+"""
+
+import numpy as np
+from typing import List, Optional, Tuple
+
+from environments.lidar import LidarRayTables, RAY_DX, RAY_DY
+
+# Direction index of the opposite ray (UP <-> DOWN, UP-LEFT <-> DOWN-RIGHT, ...)
+_OPPOSITE_RAY = [1, 0, 3, 2, 7, 6, 5, 4]
+
+
+class DistanceField:
+    """
+    Per-direction obstacle distances for a grid_width x grid_height board.
+
+    Example:
+        >>> field = DistanceField(20, 20)
+        >>> field.set(5, 5)
+        >>> field.ray(5, 9, 0, -1)   # UP from (5, 9): body 4 cells away
+        (4, False)
+    """
+
+    def __init__(
+        self,
+        grid_width: int,
+        grid_height: int,
+        tables: Optional[LidarRayTables] = None,
+    ):
+        """
+        Args:
+            grid_width: Board width
+            grid_height: Board height
+            tables: Ray tables to share (built if not given)
+        """
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.n_cells = grid_width * grid_height
+        self.tables = tables if tables is not None else LidarRayTables(grid_width, grid_height)
+
+        # In-bounds steps before the wall, per direction: wall_steps[d][cell]
+        self._wall_steps: List[List[int]] = self.tables.wall_steps.T.tolist()
+        # Walking back against direction d moves the flat index by this much
+        self._back_delta = [-(int(dx) + int(dy) * grid_width) for dx, dy in zip(RAY_DX, RAY_DY)]
+
+        self.grid = bytearray(self.n_cells)
+        # distance[d][cell]: steps from cell to the first obstacle in direction d
+        self.distance: List[List[int]] = []
+        self.clear_all()
+
+    def clear_all(self) -> None:
+        """Remove every cell from the board."""
+        self.grid[:] = bytes(self.n_cells)
+        self.distance = [[steps + 1 for steps in row] for row in self._wall_steps]
+
+    def rebuild(self, occupancy: np.ndarray) -> None:
+        """Recompute the whole field from an (H, W) occupancy grid."""
+        grid = self.tables.load(occupancy)[0]
+        self.grid[:] = grid[:self.n_cells].tobytes()
+        hits = grid[self.tables.rays]                             # (C, 8, L)
+        self.distance = (hits.argmax(axis=2) + 1).T.tolist()
+
+    def set(self, x: int, y: int) -> None:
+        """Mark cell (x, y) as occupied."""
+        cell = y * self.grid_width + x
+        if not self.grid[cell]:
+            self.grid[cell] = 1
+            self._update(cell, occupied=True)
+
+    def clear(self, x: int, y: int) -> None:
+        """Mark cell (x, y) as empty."""
+        cell = y * self.grid_width + x
+        if self.grid[cell]:
+            self.grid[cell] = 0
+            self._update(cell, occupied=False)
+
+    def is_set(self, x: int, y: int) -> bool:
+        """Check if cell (x, y) is occupied (out-of-bounds counts as wall)."""
+        if x < 0 or x >= self.grid_width or y < 0 or y >= self.grid_height:
+            return True
+        return bool(self.grid[y * self.grid_width + x])
+
+    def ray(self, x: int, y: int, dx: int, dy: int) -> Tuple[int, bool]:
+        """
+        Distance from (x, y) in direction (dx, dy), each in {-1, 0, 1}.
+
+        Returns:
+            distance: Steps to the first obstacle (1 = adjacent)
+            hit_wall: True if the obstacle is the board boundary
+        """
+        i = int(np.flatnonzero((RAY_DX == dx) & (RAY_DY == dy))[0])
+        cell = y * self.grid_width + x
+        distance = self.distance[i][cell]
+        return distance, distance > self._wall_steps[i][cell]
+
+    def lidar(self, x: int, y: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        All 8 rays from (x, y), in LidarHungerWrapper.DIRECTIONS order.
+
+        Returns:
+            distance: (8,) int
+            hit_wall: (8,) bool
+        """
+        cell = y * self.grid_width + x
+        distance = np.array([row[cell] for row in self.distance])
+        return distance, distance > self.tables.wall_steps[cell]
+
+    def _update(self, cell: int, occupied: bool) -> None:
+        """Refresh the distances of every cell that looks at `cell`."""
+        grid = self.grid
+        for d in range(8):
+            row = self.distance[d]
+            offset = 0 if occupied else row[cell]
+            delta = self._back_delta[d]
+            p = cell
+            # Cells behind `cell` that are still on the board
+            for k in range(1, self._wall_steps[_OPPOSITE_RAY[d]][cell] + 1):
+                p += delta
+                row[p] = k + offset
+                if grid[p]:
+                    break
@@ -0,0 +1,106 @@
+"""
+Compact Snake Body Encodings
+
+The default "padded" observation stores up to `max_snake_length` (x, y)
+pairs and silently truncates longer snakes. The encodings here stay exact
+for full-board snakes while keeping observations small enough for
+million-transition replay buffers:
+
+    - "chain":  HEAD position + 2 bits per body link, head to tail.
+                Link i is the direction (0=UP, 1=DOWN, 2=LEFT, 3=RIGHT)
+                from segment i to segment i+1, packed little-endian
+                (link 0 in the lowest two bits of byte 0).
+                Size: ceil(W*H / 4) bytes.
+    - "bitmap": HEAD position + 1 bit per cell (row-major occupancy,
+                np.packbits order). Size: ceil(W*H / 8) bytes.
+                Segment order is not kept; all wrappers treat the body as
+                a set of cells plus the head, so they work unchanged.
+
+Wrappers should read the body through `snake_head()` / `snake_segments()`,
+which accept every encoding.
+"""
+
+import numpy as np
+from typing import Any, Dict, Sequence, Tuple
+
+SNAKE_ENCODINGS = ("padded", "chain", "bitmap")
+
+# Direction code -> (dx, dy): 0=UP, 1=DOWN, 2=LEFT, 3=RIGHT
+_LINK_DELTAS = np.array([[0, -1], [0, 1], [-1, 0], [1, 0]], dtype=np.int32)
+_DELTA_TO_LINK = {(0, -1): 0, (0, 1): 1, (-1, 0): 2, (1, 0): 3}
+
+
+def chain_bytes(n_cells: int) -> int:
+    """Bytes needed for the chain of a snake that fills n_cells."""
+    return (2 * n_cells + 7) // 8
+
+
+def bitmap_bytes(n_cells: int) -> int:
+    """Bytes needed for an n_cells occupancy bitmap."""
+    return (n_cells + 7) // 8
+
+
+def pack_chain(snake: Sequence[Tuple[int, int]]) -> int:
+    """Pack a head-first body into the chain integer (2 bits per link)."""
+    chain = 0
+    for i in range(len(snake) - 1):
+        dx = snake[i + 1][0] - snake[i][0]
+        dy = snake[i + 1][1] - snake[i][1]
+        chain |= _DELTA_TO_LINK[(dx, dy)] << (2 * i)
+    return chain
+
+
+def unpack_chain(head: np.ndarray, chain: np.ndarray, length: int) -> np.ndarray:
+    """
+    Decode a packed chain back to head-first (x, y) segments.
+
+    Args:
+        head: (2,) head position
+        chain: packed uint8 chain bytes
+        length: number of segments
+
+    Returns:
+        np.ndarray, shape=(length, 2), dtype=int32
+    """
+    segments = np.empty((length, 2), dtype=np.int32)
+    if length == 0:
+        return segments
+    segments[0] = head
+    if length > 1:
+        bits = np.unpackbits(chain, count=2 * (length - 1), bitorder="little")
+        links = bits[0::2] + 2 * bits[1::2]
+        segments[1:] = head + np.cumsum(_LINK_DELTAS[links], axis=0)
+    return segments
+
+
+def snake_head(obs: Dict[str, Any]) -> np.ndarray:
+    """HEAD position from an observation of any encoding."""
+    if "head" in obs:
+        return obs["head"]
+    return obs["snake"][0]
+
+
+def snake_segments(obs: Dict[str, Any]) -> np.ndarray:
+    """
+    Valid body segments from an observation of any encoding.
+
+    Returns:
+        np.ndarray, shape=(n, 2): segment 0 is the HEAD. For "padded" the
+        segments are truncated at max_snake_length; for "bitmap" the
+        segments after the head are in row-major order.
+    """
+    length = int(obs["snake_length"])
+    if "snake" in obs:
+        return obs["snake"][:length]
+    if "body_chain" in obs:
+        return unpack_chain(obs["head"], obs["body_chain"], length)
+
+    grid_w, grid_h = int(obs["grid_size"][0]), int(obs["grid_size"][1])
+    head = obs["head"]
+    cells = np.flatnonzero(np.unpackbits(obs["body_bitmap"], count=grid_w * grid_h))
+    cells = cells[cells != head[1] * grid_w + head[0]]
+    segments = np.empty((len(cells) + 1, 2), dtype=np.int32)
+    segments[0] = head
+    segments[1:, 0] = cells % grid_w
+    segments[1:, 1] = cells // grid_w
+    return segments
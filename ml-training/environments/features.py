@@ -0,0 +1,320 @@
+"""
+Fused Feature Extraction for Snake
+
+A training script declares the features it needs as a spec, e.g.
+
+    "compact11"                        (preset)
+    "danger,direction,food_direction"  (same features, spelled out)
+    "lidar,length,hunger,food_delta"   (LidarHungerWrapper layout)
+
+and `FeatureWrapper` writes them straight from the env's internal state
+(snake, food, direction, occupancy) into one float32 vector. There is no
+intermediate Dict observation, no padded array to convert back into Python
+sets and no second wrapper layer: create the env with `obs_mode="none"` so
+it does not build observations at all (see `make_feature_env`).
+
+Features (name: size):
+    danger (3):         collision flags for straight, right, left
+    direction (4):      current direction one-hot (left, right, up, down)
+    food_direction (4): food is left / right / up / down of the head
+    lidar (24):         8-ray distances, wall flags, food-on-ray flags
+                        (LidarHungerWrapper features 0-23)
+    length (1):         snake length / (W * H)
+    hunger (1):         steps since the last food / hunger_timeout
+    food_delta (2):     (food - head) / (W, H)
+    position (4):       head x, head y, food x, food y, normalized
+    grid (W * H):       flattened board, 0=empty, 1=snake, 2=food
+    space (3):          free area reachable after moving straight, right,
+                        left, / (W * H); 0 if the move is blocked (the
+                        whole body, tail included, counts as an obstacle;
+                        see flood_fill.move_areas). Not in any preset.
+
+Presets: "compact11" (= Compact11Wrapper), "lidar" (= LidarHungerWrapper
+features), "grid" (= GridFlattenWrapper).
+
+Features are computed from the full body, so they match the Dict-based
+wrappers exactly as long as the snake fits in max_snake_length.
+"""
+
+import gymnasium as gym
+from gymnasium import spaces
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from environments.flood_fill import move_areas
+from environments.lidar import LidarRayTables, food_on_rays
+from environments.snake_kernel import make_snake_env
+
+# Direction deltas: 0=UP, 1=DOWN, 2=LEFT, 3=RIGHT
+_DELTAS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+# (straight, right, left) absolute direction per current direction
+# (same as Compact11Wrapper._relative_dirs)
+_DANGER_MOVES = ((0, 3, 2), (1, 2, 3), (2, 0, 1), (3, 1, 0))
+
+# Direction -> one-hot position: left, right, up, down
+_DIRECTION_SLOT = (2, 3, 0, 1)
+
+FEATURE_PRESETS = {
+    "compact11": ("danger", "direction", "food_direction"),
+    "lidar": ("lidar", "length", "hunger", "food_delta"),
+    "grid": ("position", "grid"),
+}
+
+
+def parse_feature_spec(spec: Union[str, Sequence[str]]) -> Tuple[str, ...]:
+    """
+    Expand a feature spec into feature names.
+
+    Args:
+        spec: Comma-separated string or sequence of feature and preset names
+
+    Returns:
+        Tuple of feature names in output order
+    """
+    if isinstance(spec, str):
+        spec = [name.strip() for name in spec.split(",") if name.strip()]
+    names: List[str] = []
+    for name in spec:
+        names.extend(FEATURE_PRESETS.get(name, (name,)))
+    unknown = [name for name in names if name not in FeatureExtractor.WRITERS]
+    if unknown:
+        raise ValueError(f"Unknown features: {unknown}")
+    if not names:
+        raise ValueError("Empty feature spec")
+    return tuple(names)
+
+
+class FeatureExtractor:
+    """
+    Compiled feature spec: writes the selected features for one game.
+
+    Example:
+        >>> extractor = FeatureExtractor("compact11", 10, 10)
+        >>> extractor.size
+        11
+        >>> features = extractor(env.unwrapped, steps_since_eat=0)
+    """
+
+    # name -> (writer method, size as a function of (W, H))
+    WRITERS: Dict[str, Tuple[str, Callable[[int, int], int]]] = {
+        "danger": ("_danger", lambda w, h: 3),
+        "direction": ("_direction", lambda w, h: 4),
+        "food_direction": ("_food_direction", lambda w, h: 4),
+        "lidar": ("_lidar", lambda w, h: 24),
+        "length": ("_length", lambda w, h: 1),
+        "hunger": ("_hunger", lambda w, h: 1),
+        "food_delta": ("_food_delta", lambda w, h: 2),
+        "position": ("_position", lambda w, h: 4),
+        "grid": ("_grid", lambda w, h: w * h),
+        "space": ("_space", lambda w, h: 3),
+    }
+
+    def __init__(
+        self,
+        spec: Union[str, Sequence[str]],
+        grid_width: int,
+        grid_height: int,
+        hunger_timeout: int = 500,
+    ):
+        """
+        Args:
+            spec: Feature spec (see parse_feature_spec)
+            grid_width: Board width
+            grid_height: Board height
+            hunger_timeout: Steps without food that map to hunger = 1.0
+        """
+        self.names = parse_feature_spec(spec)
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.hunger_timeout = hunger_timeout
+        self._ray_tables: Optional[LidarRayTables] = None
+
+        self._plan = []
+        offset = 0
+        for name in self.names:
+            method, size = self.WRITERS[name]
+            self._plan.append((getattr(self, method), offset))
+            offset += size(grid_width, grid_height)
+        self.size = offset
+
+        self.low = -1.0 if {"lidar", "food_delta"} & set(self.names) else 0.0
+        self.high = 2.0 if "grid" in self.names else 1.0
+
+    def __call__(self, env: Any, steps_since_eat: int = 0) -> np.ndarray:
+        """
+        Extract the features of the env's current state.
+
+        Args:
+            env: Unwrapped SnakeEnv (or JitSnakeEnv)
+            steps_since_eat: Hunger counter (only used by "hunger")
+
+        Returns:
+            np.ndarray, shape=(size,), dtype=float32
+        """
+        out = np.zeros(self.size, dtype=np.float32)
+        head = env.snake[0]
+        food = env.food
+        for write, offset in self._plan:
+            write(env, head, food, out, offset, steps_since_eat)
+        return out
+
+    # ------------------------------------------------------------------
+    # Writers: fill out[offset:offset + size]
+    # ------------------------------------------------------------------
+
+    def _danger(self, env, head, food, out, offset, steps_since_eat) -> None:
+        occupancy = env.occupancy
+        hx, hy = head
+        for i, move in enumerate(_DANGER_MOVES[env.direction]):
+            dx, dy = _DELTAS[move]
+            x, y = hx + dx, hy + dy
+            if not (0 <= x < self.grid_width and 0 <= y < self.grid_height) or occupancy[y, x]:
+                out[offset + i] = 1.0
+
+    def _direction(self, env, head, food, out, offset, steps_since_eat) -> None:
+        out[offset + _DIRECTION_SLOT[env.direction]] = 1.0
+
+    def _food_direction(self, env, head, food, out, offset, steps_since_eat) -> None:
+        out[offset] = food[0] < head[0]
+        out[offset + 1] = food[0] > head[0]
+        out[offset + 2] = food[1] < head[1]
+        out[offset + 3] = food[1] > head[1]
+
+    def _lidar(self, env, head, food, out, offset, steps_since_eat) -> None:
+        hx, hy = head
+        field = getattr(env, "distance_field", None)
+        if field is not None:
+            distance, hit_wall = field.lidar(hx, hy)
+            food_seen = food_on_rays(food[0] - hx, food[1] - hy, distance)
+        else:
+            # The head is on the board too, but no ray passes through its own start
+            tables = self._ray_tables
+            if tables is None:
+                tables = self._ray_tables = LidarRayTables(self.grid_width, self.grid_height)
+            distance, hit_wall, food_seen = tables.cast(
+                tables.load(env.occupancy), [head], [food]
+            )
+            distance, hit_wall, food_seen = distance[0], hit_wall[0], food_seen[0]
+        out[offset:offset + 8] = distance / max(self.grid_width, self.grid_height)
+        out[offset + 8:offset + 16] = hit_wall
+        out[offset + 16:offset + 24] = food_seen
+
+    def _length(self, env, head, food, out, offset, steps_since_eat) -> None:
+        out[offset] = len(env.snake) / (self.grid_width * self.grid_height)
+
+    def _hunger(self, env, head, food, out, offset, steps_since_eat) -> None:
+        out[offset] = min(steps_since_eat / self.hunger_timeout, 1.0)
+
+    def _food_delta(self, env, head, food, out, offset, steps_since_eat) -> None:
+        out[offset] = (food[0] - head[0]) / self.grid_width
+        out[offset + 1] = (food[1] - head[1]) / self.grid_height
+
+    def _position(self, env, head, food, out, offset, steps_since_eat) -> None:
+        out[offset] = head[0] / self.grid_width
+        out[offset + 1] = head[1] / self.grid_height
+        out[offset + 2] = food[0] / self.grid_width
+        out[offset + 3] = food[1] / self.grid_height
+
+    def _grid(self, env, head, food, out, offset, steps_since_eat) -> None:
+        n_cells = self.grid_width * self.grid_height
+        out[offset:offset + n_cells] = env.occupancy.ravel()
+        out[offset + food[1] * self.grid_width + food[0]] = 2.0
+
+    def _space(self, env, head, food, out, offset, steps_since_eat) -> None:
+        areas = move_areas(env.occupancy, head, env.direction)
+        n_cells = self.grid_width * self.grid_height
+        out[offset] = areas.straight / n_cells
+        out[offset + 1] = areas.right / n_cells
+        out[offset + 2] = areas.left / n_cells
+
+
+class FeatureWrapper(gym.Wrapper):
+    """
+    Replaces the Dict observation with fused features read from env state.
+
+    Optionally applies LidarHungerWrapper's hunger rules: a small penalty on
+    every step without food and truncation after `hunger_timeout` such
+    steps.
+
+    Output: Box(shape=(extractor.size,), dtype=float32)
+    """
+
+    def __init__(
+        self,
+        env: gym.Env,
+        features: Union[str, Sequence[str]] = "compact11",
+        step_penalty: float = 0.0,
+        hunger_timeout: Optional[int] = None,
+    ):
+        """
+        Args:
+            env: Snake environment (best created with obs_mode="none")
+            features: Feature spec (see parse_feature_spec)
+            step_penalty: Subtracted from the reward on steps without food
+                (LidarHungerWrapper uses 0.001)
+            hunger_timeout: Truncate after this many steps without food;
+                also normalizes the "hunger" feature (default scale: 500)
+        """
+        super().__init__(env)
+        game = env.unwrapped
+        if not hasattr(game, "occupancy"):
+            raise ValueError("FeatureWrapper needs a SnakeEnv (reads snake, food and occupancy)")
+
+        self.extractor = FeatureExtractor(
+            features, game.grid_width, game.grid_height,
+            hunger_timeout=hunger_timeout or 500,
+        )
+        self.step_penalty = step_penalty
+        self.hunger_timeout = hunger_timeout
+        self.steps_since_eat = 0
+        self._game = game
+
+        self.observation_space = spaces.Box(
+            low=self.extractor.low,
+            high=self.extractor.high,
+            shape=(self.extractor.size,),
+            dtype=np.float32,
+        )
+
+    def reset(self, **kwargs):
+        _, info = self.env.reset(**kwargs)
+        self.steps_since_eat = 0
+        return self.extractor(self._game, 0), info
+
+    def step(self, action):
+        _, reward, terminated, truncated, info = self.env.step(action)
+
+        if reward > 0:
+            self.steps_since_eat = 0
+        else:
+            self.steps_since_eat += 1
+            reward -= self.step_penalty
+        if (
+            self.hunger_timeout is not None
+            and not terminated
+            and self.steps_since_eat > self.hunger_timeout
+        ):
+            truncated = True
+
+        return self.extractor(self._game, self.steps_since_eat), reward, terminated, truncated, info
+
+
+def make_feature_env(
+    features: Union[str, Sequence[str]] = "compact11",
+    jit: bool = False,
+    step_penalty: float = 0.0,
+    hunger_timeout: Optional[int] = None,
+    **env_kwargs: Any,
+) -> FeatureWrapper:
+    """
+    Create a Snake env that skips Dict observations, wrapped in FeatureWrapper.
+
+    Args:
+        features: Feature spec (see parse_feature_spec)
+        jit: Use the Numba step kernel (opt-in, see make_snake_env)
+        step_penalty, hunger_timeout: See FeatureWrapper
+        **env_kwargs: SnakeEnv arguments (obs_mode is forced to "none")
+    """
+    env = make_snake_env(jit=jit, **{**env_kwargs, "obs_mode": "none"})
+    return FeatureWrapper(env, features, step_penalty=step_penalty, hunger_timeout=hunger_timeout)
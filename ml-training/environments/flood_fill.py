@@ -0,0 +1,157 @@
+"""
+Reachable-Area Engine for Snake Grids
+
+Labels the 4-connected regions of free cells with a run-based two-pass
+algorithm (no SciPy):
+
+    1. Horizontal runs of free cells are found per row with one NumPy diff
+       and painted into a run-id grid with np.repeat.
+    2. Runs that touch vertically are collected as deduplicated
+       (upper, lower) pairs and merged with union-find, a Python loop over
+       O(number of runs) pairs instead of a queue over every cell.
+    3. Region sizes are summed per root and the label grid is a lookup of
+       the run-id grid.
+
+Work is proportional to the number of runs rather than cells, and a
+single labeling answers every area query on the same board. That is what
+`move_areas()` uses: the areas reachable after moving straight, left or
+right all come from one pass (the "space" feature in features.py).
+
+Obstacles are whatever is nonzero in the occupancy grid (the whole body,
+tail included, as in LidarHungerWrapper's accessible-area heuristic).
+"""
+
+import numpy as np
+from typing import NamedTuple, Tuple
+
+# Direction deltas: 0=UP, 1=DOWN, 2=LEFT, 3=RIGHT
+_DELTAS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+# Absolute direction of (straight, left, right) for each current direction
+# (same convention as Compact11Wrapper._relative_dirs)
+RELATIVE_MOVES = {
+    0: (0, 2, 3),  # UP: straight=UP, left=LEFT, right=RIGHT
+    1: (1, 3, 2),  # DOWN: straight=DOWN, left=RIGHT, right=LEFT
+    2: (2, 1, 0),  # LEFT: straight=LEFT, left=DOWN, right=UP
+    3: (3, 0, 1),  # RIGHT: straight=RIGHT, left=UP, right=DOWN
+}
+
+
+class Regions(NamedTuple):
+    """Connected free regions of a board."""
+    labels: np.ndarray  # (H, W) int32, region id per free cell, -1 for obstacles
+    sizes: np.ndarray   # (n_regions,) int64, cells per region
+
+
+class MoveAreas(NamedTuple):
+    """Cells reachable after each relative move (0 = move is blocked)."""
+    straight: int
+    left: int
+    right: int
+
+
+def label_regions(occupancy: np.ndarray) -> Regions:
+    """
+    Label the 4-connected regions of free (zero) cells.
+
+    Args:
+        occupancy: (H, W) array, nonzero = obstacle
+
+    Returns:
+        Regions(labels, sizes)
+    """
+    free = np.asarray(occupancy) == 0
+    grid_h, grid_w = free.shape
+
+    # 1. Runs: +1 where a run starts, -1 one past where it ends; paint
+    #    each free cell with the id of its run
+    edges = np.zeros((grid_h, grid_w + 2), dtype=np.int8)
+    edges[:, 1:-1] = free
+    steps = np.diff(edges, axis=1)
+    run_row, run_start = np.nonzero(steps == 1)
+    run_end = np.nonzero(steps == -1)[1]
+    lengths = run_end - run_start
+    n_runs = len(lengths)
+
+    run_ids = np.full(grid_h * grid_w + 1, n_runs, dtype=np.int64)
+    if n_runs:
+        offsets = np.cumsum(lengths) - lengths
+        cells = (
+            np.repeat(run_row * grid_w + run_start - offsets, lengths)
+            + np.arange(lengths.sum())
+        )
+        run_ids[cells] = np.repeat(np.arange(n_runs), lengths)
+    run_ids = run_ids[:-1].reshape(grid_h, grid_w)
+
+    # 2. Runs touching vertically: one (upper, lower) pair per shared
+    #    column, deduplicated, then merged with union-find
+    touching = (run_ids[:-1] < n_runs) & (run_ids[1:] < n_runs)
+    pairs = np.unique(run_ids[:-1][touching] * n_runs + run_ids[1:][touching])
+    parent = list(range(n_runs))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    upper, lower = np.divmod(pairs, max(n_runs, 1))
+    for a, b in zip(upper.tolist(), lower.tolist()):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    # 3. Compact region ids, sizes and the label grid
+    region_ids: dict = {}
+    run_region = [region_ids.setdefault(find(i), len(region_ids)) for i in range(n_runs)]
+    run_region = np.array(run_region + [-1], dtype=np.int32)
+    sizes = np.bincount(run_region[:-1], weights=lengths, minlength=len(region_ids)).astype(np.int64)
+    return Regions(run_region[run_ids], sizes)
+
+
+def accessible_area(occupancy: np.ndarray, head: Tuple[int, int]) -> int:
+    """
+    Cells reachable from the head, counting the head itself.
+
+    Same count as a BFS from the head that treats every occupied cell
+    (other than the start) as a wall.
+    """
+    regions = label_regions(occupancy)
+    grid_h, grid_w = regions.labels.shape
+    hx, hy = int(head[0]), int(head[1])
+
+    seen = set()
+    for dx, dy in _DELTAS:
+        x, y = hx + dx, hy + dy
+        if 0 <= x < grid_w and 0 <= y < grid_h and regions.labels[y, x] >= 0:
+            seen.add(int(regions.labels[y, x]))
+    return 1 + int(sum(regions.sizes[label] for label in seen))
+
+
+def move_areas(
+    occupancy: np.ndarray,
+    head: Tuple[int, int],
+    direction: int,
+) -> MoveAreas:
+    """
+    Reachable area after moving straight, left or right, from one labeling.
+
+    The area of a move is the size of the free region the new head enters
+    (new head included); a move into a wall or the body has area 0.
+
+    Args:
+        occupancy: (H, W) array, nonzero = obstacle
+        head: Current HEAD position (x, y)
+        direction: Current direction (0=UP, 1=DOWN, 2=LEFT, 3=RIGHT)
+    """
+    regions = label_regions(occupancy)
+    grid_h, grid_w = regions.labels.shape
+    hx, hy = int(head[0]), int(head[1])
+
+    areas = []
+    for move in RELATIVE_MOVES[direction]:
+        dx, dy = _DELTAS[move]
+        x, y = hx + dx, hy + dy
+        label = regions.labels[y, x] if 0 <= x < grid_w and 0 <= y < grid_h else -1
+        areas.append(int(regions.sizes[label]) if label >= 0 else 0)
+    return MoveAreas(*areas)
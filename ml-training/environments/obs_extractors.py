@@ -0,0 +1,92 @@
+"""
+Policy-Side Unpacking of Compact Snake Observations
+
+Compact11Wrapper and GridFlattenWrapper can emit uint8 or bit-packed
+observations (`dtype="uint8"`, `packed_bits=True`), so SB3 replay buffers
+store 1 byte (or 1 bit) per feature instead of 4. `UnpackObsExtractor`
+turns such a batch back into the exact float32 features of the default
+wrapper, on the policy's device, as the first step of the network:
+
+    policy_kwargs = dict(
+        features_extractor_class=UnpackObsExtractor,
+        features_extractor_kwargs=dict(layout="grid", grid_width=20, grid_height=20,
+                                       packed_bits=True),
+        net_arch=[256, 256],
+    )
+
+The extractor has no parameters or buffers, so `q_net.state_dict()` (and
+the browser weight export) is the same as with the default FlattenExtractor.
+
+Memory per transition (obs + next_obs in DQN's buffer), 20x20 grid:
+    GridFlatten float32: 3232 B   uint8: 808 B   packed_bits: 108 B
+"""
+
+import gymnasium as gym
+import torch as th
+from stable_baselines3.common.torch_layers import BaseFeaturesExtractor
+
+LAYOUTS = ("compact11", "grid")
+
+
+class UnpackObsExtractor(BaseFeaturesExtractor):
+    """
+    Unpack uint8 / bit-packed Compact11 or GridFlatten observations.
+
+    Output: float32 features identical to the wrapper's default
+    (dtype="float32") observation: 11 for "compact11", 4 + W*H for "grid".
+    """
+
+    def __init__(
+        self,
+        observation_space: gym.spaces.Box,
+        layout: str = "compact11",
+        grid_width: int = 0,
+        grid_height: int = 0,
+        packed_bits: bool = False,
+    ):
+        """
+        Args:
+            observation_space: The wrapper's observation space
+            layout: "compact11" or "grid"
+            grid_width, grid_height: Board size (required for "grid")
+            packed_bits: Observations were made with packed_bits=True
+        """
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout: {layout!r} (expected one of {LAYOUTS})")
+        if layout == "grid" and (grid_width <= 0 or grid_height <= 0):
+            raise ValueError('layout="grid" requires grid_width and grid_height')
+
+        n_features = 11 if layout == "compact11" else 4 + grid_width * grid_height
+        super().__init__(observation_space, n_features)
+        self.layout = layout
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.packed_bits = packed_bits
+        self._n_bits = 11 if layout == "compact11" else grid_width * grid_height
+
+    def forward(self, observations: th.Tensor) -> th.Tensor:
+        # SB3 hands over uint8 observations already converted to float
+        if self.layout == "compact11":
+            if self.packed_bits:
+                return self._unpack_bits(observations)
+            return observations.float()
+
+        coords = observations[:, :4].float()
+        if self.packed_bits:
+            cells = self._unpack_bits(observations[:, 4:])
+            # The food cell is not in the bit plane: restore it as 2
+            food_cell = (coords[:, 3] * self.grid_width + coords[:, 2]).long()
+            cells.scatter_(1, food_cell[:, None], 2.0)
+        else:
+            cells = observations[:, 4:].float()
+
+        scale = th.tensor(
+            [self.grid_width, self.grid_height] * 2, dtype=th.float32, device=observations.device
+        )
+        return th.cat([coords / scale, cells], dim=1)
+
+    def _unpack_bits(self, packed: th.Tensor) -> th.Tensor:
+        """np.packbits inverse (big-endian bit order), first n_bits columns."""
+        shifts = th.arange(7, -1, -1, device=packed.device, dtype=th.uint8)
+        bits = (packed.to(th.uint8)[:, :, None] >> shifts) & 1
+        return bits.reshape(len(packed), -1)[:, :self._n_bits].float()
@@ -0,0 +1,297 @@
+"""
+Compact Episode Recording and Deterministic Replay for SnakeEnv
+
+SnakeEnv is fully determined by its reset seed and the action stream, so an
+episode is stored as seed + 2 bits per action instead of full observations
+(a 1000-step episode is ~300 bytes). Periodic CRC32 checksums of the game
+state catch replays that diverge (e.g. after a rule change).
+
+File format (append-only, little-endian). A file is a sequence of records,
+each starting with a 1-byte tag:
+
+    b"S"  episode start: grid_width u16, grid_height u16, max_steps u32,
+          max_snake_length u32, flags u8 (bit 0 = legacy_food_spawn),
+          seed u64, checksum_interval u16
+    b"A"  action chunk: count u16, then ceil(count / 4) bytes
+          (action i of the chunk in bits 2*(i%4) of byte i//4)
+    b"C"  checksum: step u32, crc32 u32 (state after `step` actions)
+    b"E"  episode end: n_steps u32, score i32, flags u8
+          (bit 0 = terminated, bit 1 = truncated)
+
+Usage:
+    >>> env = EpisodeRecorder(LidarHungerWrapper(SnakeEnv()), "eval.snakelog")
+    >>> ...play episodes as usual...
+    >>> env.close()
+    >>> replayer = EpisodeReplayer("eval.snakelog")
+    >>> state = replayer.frame(episode=3, step=250)   # SnakeState at step 250
+"""
+
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Union
+
+import gymnasium as gym
+import numpy as np
+
+from environments.snake_env import SnakeEnv, SnakeState
+
+_START = struct.Struct("<HHIIBQH")
+_CHUNK = struct.Struct("<H")
+_CHECKSUM = struct.Struct("<II")
+_END = struct.Struct("<IiB")
+
+_MAX_CHUNK = 4096
+
+
+def pack_actions(actions: np.ndarray) -> bytes:
+    """Pack actions (values 0-3) at 2 bits each."""
+    actions = np.asarray(actions, dtype=np.uint8)
+    padded = np.zeros((len(actions) + 3) // 4 * 4, dtype=np.uint8)
+    padded[:len(actions)] = actions
+    quads = padded.reshape(-1, 4)
+    return (quads[:, 0] | (quads[:, 1] << 2) | (quads[:, 2] << 4) | (quads[:, 3] << 6)).tobytes()
+
+
+def unpack_actions(data: bytes, count: int) -> np.ndarray:
+    """Inverse of pack_actions()."""
+    packed = np.frombuffer(data, dtype=np.uint8)
+    return ((packed[:, None] >> np.array([0, 2, 4, 6], dtype=np.uint8)) & 3).ravel()[:count]
+
+
+def state_checksum(state: SnakeState) -> int:
+    """CRC32 of the game-relevant part of a SnakeState."""
+    header = struct.pack(
+        "<hhBIiB", state.food[0], state.food[1], state.direction,
+        state.current_step, state.score, state.game_over,
+    )
+    body = np.array(state.snake, dtype=np.int16).tobytes()
+    return zlib.crc32(body, zlib.crc32(header))
+
+
+class EpisodeRecord(NamedTuple):
+    """One recorded episode as parsed by EpisodeReplayer."""
+    config: Dict[str, int]
+    seed: int
+    actions: np.ndarray
+    checksums: Dict[int, int]
+    score: Optional[int]
+    terminated: bool
+    truncated: bool
+
+
+class EpisodeRecorder(gym.Wrapper):
+    """
+    Record every episode of a SnakeEnv (possibly wrapped) to a binary log.
+
+    Place it anywhere above SnakeEnv; it records the actions passed to step().
+    If reset() is called without a seed, a random seed is drawn and passed to
+    the env so the episode can still be replayed.
+    """
+
+    def __init__(
+        self,
+        env: gym.Env,
+        path: Union[str, Path],
+        checksum_interval: int = 100,
+    ):
+        """
+        Args:
+            env: Environment whose `unwrapped` is a SnakeEnv
+            path: Log file; episodes are appended
+            checksum_interval: Steps between state checksums (0 = none)
+        """
+        super().__init__(env)
+        if not isinstance(env.unwrapped, SnakeEnv):
+            raise TypeError("EpisodeRecorder requires a SnakeEnv underneath")
+
+        self.path = Path(path)
+        self.checksum_interval = checksum_interval
+        self._file = open(self.path, "ab")
+        self._seed_rng = np.random.default_rng()
+        self._actions: List[int] = []
+        self._recording = False
+
+    def reset(self, *, seed: Optional[int] = None, **kwargs):
+        self._end_episode(terminated=False, truncated=False)
+        if seed is None:
+            seed = int(self._seed_rng.integers(2 ** 63))
+
+        obs, info = self.env.reset(seed=seed, **kwargs)
+
+        raw = self.env.unwrapped
+        self._file.write(b"S" + _START.pack(
+            raw.grid_width, raw.grid_height, raw.max_steps, raw.max_snake_length,
+            int(raw.legacy_food_spawn), seed, self.checksum_interval,
+        ))
+        self._recording = True
+        self._n_steps = 0
+        if self.checksum_interval:
+            self._write_checksum()
+        return obs, info
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        if self._recording:
+            self._actions.append(int(action))
+            self._n_steps += 1
+            if self.checksum_interval and self._n_steps % self.checksum_interval == 0:
+                self._write_checksum()
+            elif len(self._actions) >= _MAX_CHUNK:
+                self._flush_actions()
+            if terminated or truncated:
+                self._end_episode(terminated, truncated)
+        return obs, reward, terminated, truncated, info
+
+    def close(self):
+        self._end_episode(terminated=False, truncated=False)
+        self._file.close()
+        super().close()
+
+    def _flush_actions(self) -> None:
+        if self._actions:
+            self._file.write(b"A" + _CHUNK.pack(len(self._actions)) + pack_actions(self._actions))
+            self._actions = []
+
+    def _write_checksum(self) -> None:
+        self._flush_actions()
+        state = self.env.unwrapped.get_state()
+        self._file.write(b"C" + _CHECKSUM.pack(self._n_steps, state_checksum(state)))
+
+    def _end_episode(self, terminated: bool, truncated: bool) -> None:
+        if not self._recording:
+            return
+        self._flush_actions()
+        score = self.env.unwrapped.score
+        self._file.write(b"E" + _END.pack(self._n_steps, score, int(terminated) | (int(truncated) << 1)))
+        self._file.flush()
+        self._recording = False
+
+
+class EpisodeReplayer:
+    """
+    Reconstruct any frame of a recorded episode deterministically.
+
+    Replays keep a SnakeState keyframe every `keyframe_interval` steps, so
+    jumping to step K costs at most `keyframe_interval` env steps once an
+    episode has been visited.
+    """
+
+    def __init__(self, path: Union[str, Path], keyframe_interval: int = 100):
+        self.path = Path(path)
+        self.keyframe_interval = keyframe_interval
+        self.episodes: List[EpisodeRecord] = self._parse(self.path.read_bytes())
+        self._keyframes: Dict[int, Dict[int, SnakeState]] = {}
+        self._env: Optional[SnakeEnv] = None
+        self._env_config: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.episodes)
+
+    def make_env(self, episode: int) -> SnakeEnv:
+        """Create a SnakeEnv configured like the recorded one (not reset)."""
+        config = self.episodes[episode].config
+        return SnakeEnv(obs_mode="none", **config)
+
+    def frame(self, episode: int, step: int) -> SnakeState:
+        """Game state after the first `step` actions of an episode."""
+        record = self.episodes[episode]
+        if not 0 <= step <= len(record.actions):
+            raise IndexError(f"Episode {episode} has {len(record.actions)} steps, got step {step}")
+
+        env = self._env_for(episode)
+        keyframes = self._keyframes.setdefault(episode, {})
+        start = step - step % self.keyframe_interval
+        while start > 0 and start not in keyframes:
+            start -= self.keyframe_interval
+
+        if start == 0 and 0 not in keyframes:
+            env.reset(seed=record.seed)
+            keyframes[0] = env.get_state()
+        else:
+            env.set_state(keyframes[start])
+
+        for t in range(start, step):
+            env.step(int(record.actions[t]))
+            if (t + 1) % self.keyframe_interval == 0:
+                keyframes.setdefault(t + 1, env.get_state())
+        return env.get_state()
+
+    def verify(self, episode: int) -> bool:
+        """Replay an episode and check every recorded checksum."""
+        record = self.episodes[episode]
+        env = self._env_for(episode)
+        env.reset(seed=record.seed)
+        for t in range(len(record.actions) + 1):
+            if t > 0:
+                env.step(int(record.actions[t - 1]))
+            expected = record.checksums.get(t)
+            if expected is not None and expected != state_checksum(env.get_state()):
+                return False
+        return record.score is None or record.score == env.score
+
+    def _env_for(self, episode: int) -> SnakeEnv:
+        config = self.episodes[episode].config
+        if self._env is None or self._env_config != config:
+            self._env = self.make_env(episode)
+            self._env_config = config
+        return self._env
+
+    @staticmethod
+    def _parse(data: bytes) -> List[EpisodeRecord]:
+        episodes: List[EpisodeRecord] = []
+        current = None
+        pos = 0
+        while pos < len(data):
+            tag = data[pos:pos + 1]
+            pos += 1
+            if tag == b"S":
+                width, height, max_steps, max_len, flags, seed, _ = _START.unpack_from(data, pos)
+                pos += _START.size
+                current = {
+                    "config": {
+                        "grid_width": width,
+                        "grid_height": height,
+                        "max_steps": max_steps,
+                        "max_snake_length": max_len,
+                        "legacy_food_spawn": bool(flags & 1),
+                    },
+                    "seed": seed,
+                    "actions": [],
+                    "checksums": {},
+                }
+            elif tag == b"A":
+                (count,) = _CHUNK.unpack_from(data, pos)
+                pos += _CHUNK.size
+                n_bytes = (count + 3) // 4
+                current["actions"].append(unpack_actions(data[pos:pos + n_bytes], count))
+                pos += n_bytes
+            elif tag == b"C":
+                step, crc = _CHECKSUM.unpack_from(data, pos)
+                pos += _CHECKSUM.size
+                current["checksums"][step] = crc
+            elif tag == b"E":
+                _, score, flags = _END.unpack_from(data, pos)
+                pos += _END.size
+                episodes.append(EpisodeReplayer._make_record(current, score, flags))
+                current = None
+            else:
+                raise ValueError(f"Corrupt episode log at byte {pos - 1}: tag {tag!r}")
+
+        if current is not None:
+            # Writer still running or crashed mid-episode: keep what we have
+            episodes.append(EpisodeReplayer._make_record(current, None, 0))
+        return episodes
+
+    @staticmethod
+    def _make_record(current: dict, score: Optional[int], flags: int) -> EpisodeRecord:
+        actions = current["actions"]
+        return EpisodeRecord(
+            config=current["config"],
+            seed=current["seed"],
+            actions=np.concatenate(actions) if actions else np.zeros(0, dtype=np.uint8),
+            checksums=current["checksums"],
+            score=score,
+            terminated=bool(flags & 1),
+            truncated=bool(flags & 2),
+        )
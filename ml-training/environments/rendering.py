@@ -0,0 +1,57 @@
+"""
+RGB Frame Rendering for Snake Grids
+
+Paints a board as an (H * cell_size, W * cell_size, 3) uint8 image. The
+grid is first colored at one pixel per cell with a palette lookup, then
+upscaled by writing it through a broadcast view of the output, so a frame
+costs a few array operations regardless of snake length.
+
+Palette indices:
+    0 = empty, 1 = body, 2 = head, 3 = food
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+
+EMPTY, BODY, HEAD, FOOD = 0, 1, 2, 3
+
+PALETTE = np.array([
+    [24, 24, 32],     # empty
+    [46, 160, 67],    # body
+    [129, 230, 124],  # head
+    [230, 72, 72],    # food
+], dtype=np.uint8)
+
+
+def render_rgb(
+    occupancy: np.ndarray,
+    head: Tuple[int, int],
+    food: Tuple[int, int],
+    cell_size: int = 16,
+    palette: np.ndarray = PALETTE,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Render one frame.
+
+    Args:
+        occupancy: (H, W) array, nonzero where the snake body is
+        head: HEAD position (x, y)
+        food: Food position (x, y)
+        cell_size: Pixels per grid cell
+        palette: (4, 3) uint8 colors indexed as described in the module doc
+        out: Optional preallocated (H * cell_size, W * cell_size, 3) uint8 buffer
+
+    Returns:
+        np.ndarray, shape=(H * cell_size, W * cell_size, 3), dtype=uint8
+    """
+    grid_h, grid_w = occupancy.shape
+    labels = (occupancy != 0).view(np.uint8)
+    cells = palette[labels]
+    cells[food[1], food[0]] = palette[FOOD]
+    cells[head[1], head[0]] = palette[HEAD]
+
+    if out is None:
+        out = np.empty((grid_h * cell_size, grid_w * cell_size, 3), dtype=np.uint8)
+    out.reshape(grid_h, cell_size, grid_w, cell_size, 3)[:] = cells[:, None, :, None, :]
+    return out
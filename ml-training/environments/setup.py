@@ -10,5 +10,11 @@ setup(
         "gymnasium>=0.29.0",
         "numpy>=1.20.0",
     ],
+    extras_require={
+        # SnakeVecEnv and the batched Vec* wrappers
+        "sb3": ["stable-baselines3>=2.0.0"],
+        # JitSnakeEnv step kernel (make_snake_env(jit=True))
+        "jit": ["numba>=0.58.0"],
+    },
     python_requires=">=3.9",
 )
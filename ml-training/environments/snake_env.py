@@ -20,17 +20,58 @@ Observation Space (Dict):
     - snake_length: int
         Current snake length (number of valid segments).
 
+    With `snake_encoding="chain"` or `"bitmap"`, the `snake` key is replaced
+    by `head` (shape=(2,), int32) plus `body_chain` / `body_bitmap` (uint8),
+    which stay exact for snakes longer than max_snake_length
+    (see environments/encoding.py).
+
 Action Space: Discrete(4)
     0 = UP
     1 = DOWN
     2 = LEFT
     3 = RIGHT
+
+Observation Modes (obs_mode):
+    - "copy" (default): every observation is a fresh Dict of fresh arrays.
+    - "inplace": the same Dict and read-only array views are returned every
+        step and updated in place (only the head/tail delta is written).
+        Applies to the padded `snake` array; chain/bitmap encodings are
+        small and always built fresh.
+        Only use it when the consumer reads the observation before the next
+        step (e.g. a feature wrapper), never when it stores observations.
+    - "none": no observation is built; reset/step return None. For wrappers
+        that read the internal state (snake, occupancy, food) directly.
 """
 
 import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
-from typing import Optional, Tuple, Dict, Any
+from collections import deque
+from typing import Optional, Tuple, Dict, Any, NamedTuple
+
+from environments.bitboard import SnakeBitboard
+from environments.distance_field import DistanceField
+from environments.encoding import SNAKE_ENCODINGS, bitmap_bytes, chain_bytes, pack_chain
+from environments.rendering import render_rgb
+
+
+class SnakeState(NamedTuple):
+    """
+    Immutable snapshot of a SnakeEnv game (see SnakeEnv.get_state).
+
+    Everything is stored as tuples/bytes, so a snapshot can be shared
+    between branches of a search tree without copying.
+    """
+    snake: Tuple[Tuple[int, int], ...]
+    food: Tuple[int, int]
+    direction: int
+    current_step: int
+    score: int
+    game_over: bool
+    occupied: bytes
+    free_cells: Tuple[int, ...]
+    free_pos: Tuple[int, ...]
+    rng_state: Dict[str, Any]
 
 
 class SnakeEnv(gym.Env):
@@ -40,14 +81,44 @@ class SnakeEnv(gym.Env):
     This environment provides RAW game state. Use wrappers for feature extraction.
     See module docstring for observation space details.
 
+    Internal state:
+        - snake: deque of (x, y) tuples, snake[0] is the HEAD
+        - occupancy: np.ndarray, shape=(grid_height, grid_width), dtype=uint8
+            1 where a snake segment is. Updated in place as the head is
+            added and the tail removed, so every step costs O(1).
+        - free-cell index: swap-remove array of empty cells plus a
+            position map, so food spawns in O(1) instead of O(W*H).
+        - bitboard (optional, `bitboard=True`, grids up to 64x64):
+            SnakeBitboard kept in sync with the body, giving bit-operation
+            collision checks, free-cell counts and 8-direction ray distances.
+        - distance field (optional, `distance_field=True`): DistanceField
+            with each cell's distance to the nearest obstacle in the 8 LIDAR
+            directions, updated incrementally along the lines through the
+            head and tail cells.
+
+    Food spawning:
+        Both modes draw `rng.integers(0, n_free)` once per apple. By default
+        the draw indexes the free-cell array; with `legacy_food_spawn=True`
+        it indexes the free cells enumerated x-major (for x, for y), which
+        reproduces the food positions of seeds recorded before the index.
+
+    Rendering:
+        "ansi" returns ASCII art; "rgb_array" returns an
+        (H * cell_size, W * cell_size, 3) uint8 frame (see rendering.py).
+
     Example:
         >>> env = SnakeEnv()
         >>> obs, info = env.reset()
         >>> print(obs["snake"][0])  # Snake HEAD position
         >>> print(obs["food"])       # Food position
+
+    Snapshots (for tree search / planning):
+        >>> root = env.get_state()
+        >>> env.step(0)              # explore one branch...
+        >>> env.set_state(root)      # ...and rewind, RNG included
     """
 
-    metadata = {"render_modes": ["human", "ansi"], "render_fps": 10}
+    metadata = {"render_modes": ["human", "ansi", "rgb_array"], "render_fps": 10}
 
     def __init__(
         self,
@@ -56,27 +127,65 @@ class SnakeEnv(gym.Env):
         grid_height: int = 20,
         max_steps: int = 1000,
         max_snake_length: int = 100,
+        legacy_food_spawn: bool = False,
+        obs_mode: str = "copy",
+        bitboard: bool = False,
+        distance_field: bool = False,
+        snake_encoding: str = "padded",
+        cell_size: int = 16,
     ):
         super().__init__()
 
+        if obs_mode not in ("copy", "inplace", "none"):
+            raise ValueError(f"Unknown obs_mode: {obs_mode!r}")
+        if snake_encoding not in SNAKE_ENCODINGS:
+            raise ValueError(f"Unknown snake_encoding: {snake_encoding!r}")
+
         self.render_mode = render_mode
         self.grid_width = grid_width
         self.grid_height = grid_height
         self.max_steps = max_steps
         self.max_snake_length = max_snake_length
+        self.legacy_food_spawn = legacy_food_spawn
+        self.obs_mode = obs_mode
+        self.snake_encoding = snake_encoding
+        self.cell_size = cell_size
         self.current_step = 0
 
         # Action space: 0=UP, 1=DOWN, 2=LEFT, 3=RIGHT
         self.action_space = spaces.Discrete(4)
 
         # Observation space: Dict with raw game state
+        n_cells = grid_width * grid_height
+        if snake_encoding == "padded":
+            body_spaces = {
+                "snake": spaces.Box(
+                    low=-1,
+                    high=max(grid_width, grid_height),
+                    shape=(max_snake_length, 2),
+                    dtype=np.int32
+                ),
+            }
+            max_length = max_snake_length
+        else:
+            body_key, n_bytes = (
+                ("body_chain", chain_bytes(n_cells)) if snake_encoding == "chain"
+                else ("body_bitmap", bitmap_bytes(n_cells))
+            )
+            body_spaces = {
+                "head": spaces.Box(
+                    low=0,
+                    high=max(grid_width, grid_height),
+                    shape=(2,),
+                    dtype=np.int32
+                ),
+                body_key: spaces.Box(low=0, high=255, shape=(n_bytes,), dtype=np.uint8),
+            }
+            max_length = n_cells
+        self._body_bytes = chain_bytes(n_cells)
+
         self.observation_space = spaces.Dict({
-            "snake": spaces.Box(
-                low=-1,
-                high=max(grid_width, grid_height),
-                shape=(max_snake_length, 2),
-                dtype=np.int32
-            ),
+            **body_spaces,
             "food": spaces.Box(
                 low=0,
                 high=max(grid_width, grid_height),
@@ -90,7 +199,7 @@ class SnakeEnv(gym.Env):
                 shape=(2,),
                 dtype=np.int32
             ),
-            "snake_length": spaces.Discrete(max_snake_length + 1),
+            "snake_length": spaces.Discrete(max_length + 1),
         })
 
         # Direction mapping
@@ -109,12 +218,53 @@ class SnakeEnv(gym.Env):
         }
 
         # Game state
-        self.snake: list = []
+        self.snake: deque = deque()
+        # Occupancy bitmap (cell index = y * grid_width + x); `occupancy`
+        # is a NumPy view sharing the same memory
+        self._occupied = bytearray(grid_width * grid_height)
+        self.occupancy = np.frombuffer(self._occupied, dtype=np.uint8).reshape(
+            grid_height, grid_width
+        )
+        # Free-cell index: _free_cells[_free_pos[cell]] == cell for empty cells
+        self._free_cells: list = []
+        self._free_pos: list = []
+        self.bitboard: Optional[SnakeBitboard] = (
+            SnakeBitboard(grid_width, grid_height) if bitboard else None
+        )
+        self.distance_field: Optional[DistanceField] = (
+            DistanceField(grid_width, grid_height) if distance_field else None
+        )
+        # Chain encoding: 2 bits per link, link 0 in the lowest bits
+        self._chain: int = 0
         self.food: Tuple[int, int] = (0, 0)
         self.direction: int = 3  # Start moving RIGHT
         self.score: int = 0
         self.game_over: bool = False
 
+        # Observation buffers. The snake window slides down a backing buffer
+        # one row per step (new head written above the old one), so the
+        # head-first `snake` observation never has to be shifted; it is
+        # re-based once every `span` steps.
+        self._snake_span = max(grid_width * grid_height, max_snake_length) + 1
+        self._snake_start = self._snake_span
+        self._snake_buf: Optional[np.ndarray] = None
+        if obs_mode != "none" and snake_encoding == "padded":
+            self._snake_buf = np.full((2 * self._snake_span, 2), -1, dtype=np.int32)
+            self._snake_view = self._snake_buf.view()
+            self._snake_view.flags.writeable = False
+            self._food_buf = np.zeros(2, dtype=np.int32)
+            food_view = self._food_buf.view()
+            food_view.flags.writeable = False
+            grid_size = np.array([grid_width, grid_height], dtype=np.int32)
+            grid_size.flags.writeable = False
+            self._obs = {
+                "snake": None,
+                "food": food_view,
+                "direction": self.direction,
+                "grid_size": grid_size,
+                "snake_length": 0,
+            }
+
         # Random generator
         self._np_random: Optional[np.random.Generator] = None
 
@@ -135,11 +285,22 @@ class SnakeEnv(gym.Env):
         # Initialize snake in center
         start_x = self.grid_width // 2
         start_y = self.grid_height // 2
-        self.snake = [
+        self.snake = deque([
             (start_x, start_y),
             (start_x - 1, start_y),
             (start_x - 2, start_y),
-        ]
+        ])
+        self.occupancy.fill(0)
+        if self.bitboard is not None:
+            self.bitboard.clear_all()
+        if self.distance_field is not None:
+            self.distance_field.clear_all()
+        self._free_cells = list(range(self.grid_width * self.grid_height))
+        self._free_pos = list(range(self.grid_width * self.grid_height))
+        for x, y in self.snake:
+            self._occupy(y * self.grid_width + x)
+        self._chain = pack_chain(self.snake)
+        self._reset_snake_buffer()
 
         # Spawn food
         self._spawn_food()
@@ -167,23 +328,100 @@ class SnakeEnv(gym.Env):
             self.game_over = True
             return self._get_obs(), -10.0, True, False, self._get_info()
 
-        # Move snake
-        self.snake.insert(0, new_head)
+        # Move snake: drop the tail first (unless eating), so the head may
+        # enter the cell the tail just left
+        ate = new_head == self.food
+        if not ate:
+            tail_x, tail_y = self.snake.pop()
+            self._release(tail_y * self.grid_width + tail_x)
+        self.snake.appendleft(new_head)
+        self._occupy(new_head[1] * self.grid_width + new_head[0])
+        if self._snake_buf is not None:
+            self._push_snake_head(new_head, ate)
+        if self.snake_encoding == "chain":
+            # New first link points from the new head back to the old head
+            n_bits = 2 * (len(self.snake) - 1)
+            self._chain = (
+                (self._chain << 2) | self._opposite_action[self.direction]
+            ) & ((1 << n_bits) - 1)
 
         # Check food
         reward = 0.0
-        if new_head == self.food:
+        if ate:
             self.score += 10
             reward = 10.0
             self._spawn_food()
-        else:
-            self.snake.pop()
 
         # Check truncation
         truncated = self.current_step >= self.max_steps
 
         return self._get_obs(), reward, False, truncated, self._get_info()
 
+    def get_state(self) -> SnakeState:
+        """
+        Capture the full game state, including the food RNG.
+
+        Returns:
+            SnakeState that set_state() restores exactly: stepping the
+            restored env with the same actions replays the same game.
+            Raises RuntimeError before the first reset() (no game yet).
+        """
+        if self._np_random is None:
+            raise RuntimeError("get_state() called before reset()")
+        return SnakeState(
+            snake=tuple(self.snake),
+            food=self.food,
+            direction=self.direction,
+            current_step=self.current_step,
+            score=self.score,
+            game_over=self.game_over,
+            occupied=bytes(self._occupied),
+            free_cells=tuple(self._free_cells),
+            free_pos=tuple(self._free_pos),
+            rng_state=self._np_random.bit_generator.state,
+        )
+
+    def set_state(self, state: SnakeState) -> None:
+        """Restore a snapshot taken by get_state() (same grid size required)."""
+        self.snake = deque(state.snake)
+        self.food = state.food
+        self.direction = state.direction
+        self.current_step = state.current_step
+        self.score = state.score
+        self.game_over = state.game_over
+        self._occupied[:] = state.occupied
+        self._free_cells = list(state.free_cells)
+        self._free_pos = list(state.free_pos)
+        if self._np_random is None:
+            self._np_random = np.random.default_rng()
+        self._np_random.bit_generator.state = state.rng_state
+        if self.bitboard is not None:
+            self.bitboard.clear_all()
+            for x, y in self.snake:
+                self.bitboard.set(x, y)
+        if self.distance_field is not None:
+            self.distance_field.rebuild(self.occupancy)
+        self._chain = pack_chain(self.snake)
+        self._reset_snake_buffer()
+
+    def clone(self) -> "SnakeEnv":
+        """Create an independent env of the same class in the same state as this one."""
+        env = type(self)(
+            render_mode=self.render_mode,
+            grid_width=self.grid_width,
+            grid_height=self.grid_height,
+            max_steps=self.max_steps,
+            max_snake_length=self.max_snake_length,
+            legacy_food_spawn=self.legacy_food_spawn,
+            obs_mode=self.obs_mode,
+            bitboard=self.bitboard is not None,
+            distance_field=self.distance_field is not None,
+            snake_encoding=self.snake_encoding,
+            cell_size=self.cell_size,
+        )
+        env.set_state(self.get_state())
+        return env
+
     def _check_collision(self, pos: Tuple[int, int]) -> bool:
         """Check if position collides with wall or snake body."""
         x, y = pos
@@ -193,42 +431,132 @@ class SnakeEnv(gym.Env):
             return True
 
         # Self collision (exclude tail as it will move)
-        if pos in self.snake[:-1]:
+        if self._occupied[y * self.grid_width + x] and pos != self.snake[-1]:
             return True
 
         return False
 
+    def _occupy(self, cell: int) -> None:
+        """Mark cell as snake and swap-remove it from the free-cell index."""
+        self._occupied[cell] = 1
+        if self.bitboard is not None:
+            y, x = divmod(cell, self.grid_width)
+            self.bitboard.set(x, y)
+        if self.distance_field is not None:
+            y, x = divmod(cell, self.grid_width)
+            self.distance_field.set(x, y)
+        pos = self._free_pos[cell]
+        last = self._free_cells.pop()
+        if last != cell:
+            self._free_cells[pos] = last
+            self._free_pos[last] = pos
+        self._free_pos[cell] = -1
+
+    def _release(self, cell: int) -> None:
+        """Mark cell as empty and append it to the free-cell index."""
+        self._occupied[cell] = 0
+        if self.bitboard is not None:
+            y, x = divmod(cell, self.grid_width)
+            self.bitboard.clear(x, y)
+        if self.distance_field is not None:
+            y, x = divmod(cell, self.grid_width)
+            self.distance_field.clear(x, y)
+        self._free_pos[cell] = len(self._free_cells)
+        self._free_cells.append(cell)
+
     def _spawn_food(self) -> None:
         """Spawn food at random empty position."""
-        occupied = set(self.snake)
-        available = [
-            (x, y)
-            for x in range(self.grid_width)
-            for y in range(self.grid_height)
-            if (x, y) not in occupied
-        ]
-
-        if available:
-            idx = self._np_random.integers(0, len(available))
-            self.food = available[idx]
-
-    def _get_obs(self) -> Dict[str, Any]:
+        n_free = len(self._free_cells)
+        if not n_free:
+            return
+
+        idx = self._np_random.integers(0, n_free)
+        if self.legacy_food_spawn:
+            # Free cells enumerated x-major, as the original list comprehension did
+            cell_xy = np.flatnonzero(self.occupancy.T.ravel() == 0)[idx]
+            x, y = divmod(int(cell_xy), self.grid_height)
+            self.food = (x, y)
+        else:
+            y, x = divmod(self._free_cells[idx], self.grid_width)
+            self.food = (x, y)
+
+    def _reset_snake_buffer(self) -> None:
+        """Write the current body into a freshly cleared snake buffer."""
+        if self._snake_buf is None:
+            return
+        self._snake_buf.fill(-1)
+        self._snake_start = self._snake_span
+        if self.snake:
+            start = self._snake_start
+            self._snake_buf[start:start + len(self.snake)] = list(self.snake)
+
+    def _push_snake_head(self, head: Tuple[int, int], grew: bool) -> None:
+        """Apply one step's head/tail delta to the snake buffer."""
+        buf = self._snake_buf
+        start = self._snake_start
+        if not grew:
+            buf[start + len(self.snake) - 1] = -1  # old tail
+
+        if start == 0:
+            # Re-base: everything past the tail is already (-1, -1)
+            span = self._snake_span
+            buf[span:] = buf[:span]
+            buf[:span] = -1
+            start = span
+
+        start -= 1
+        buf[start, 0] = head[0]
+        buf[start, 1] = head[1]
+        self._snake_start = start
+
+    def _get_obs(self) -> Optional[Dict[str, Any]]:
         """
         Get current observation as Dict.
 
         Returns:
             Dict with keys: snake, food, direction, grid_size, snake_length.
             Note: snake[0] is always the HEAD.
+            None when obs_mode is "none".
         """
-        # Build snake array with padding
-        snake_arr = np.full((self.max_snake_length, 2), -1, dtype=np.int32)
-        for i, (x, y) in enumerate(self.snake):
-            if i >= self.max_snake_length:
-                break
-            snake_arr[i] = [x, y]
+        if self.obs_mode == "none":
+            return None
+        if self.snake_encoding != "padded":
+            return self._get_encoded_obs()
+
+        start = self._snake_start
+        snake_view = self._snake_view[start:start + self.max_snake_length]
+
+        if self.obs_mode == "copy":
+            return {
+                "snake": snake_view.copy(),
+                "food": np.array(self.food, dtype=np.int32),
+                "direction": self.direction,
+                "grid_size": np.array([self.grid_width, self.grid_height], dtype=np.int32),
+                "snake_length": len(self.snake),
+            }
+
+        obs = self._obs
+        self._food_buf[0] = self.food[0]
+        self._food_buf[1] = self.food[1]
+        obs["snake"] = snake_view
+        obs["direction"] = self.direction
+        obs["snake_length"] = len(self.snake)
+        return obs
+
+    def _get_encoded_obs(self) -> Dict[str, Any]:
+        """Observation for the "chain" / "bitmap" snake encodings."""
+        if self.snake_encoding == "chain":
+            body_key = "body_chain"
+            body = np.frombuffer(
+                self._chain.to_bytes(self._body_bytes, "little"), dtype=np.uint8
+            ).copy()
+        else:
+            body_key = "body_bitmap"
+            body = np.packbits(self.occupancy)
 
         return {
-            "snake": snake_arr,
+            "head": np.array(self.snake[0], dtype=np.int32),
+            body_key: body,
             "food": np.array(self.food, dtype=np.int32),
             "direction": self.direction,
             "grid_size": np.array([self.grid_width, self.grid_height], dtype=np.int32),
@@ -242,12 +570,18 @@ class SnakeEnv(gym.Env):
             "snake_length": len(self.snake),
         }
 
-    def render(self) -> Optional[str]:
+    def render(self) -> Optional[Any]:
         """Render the environment."""
         if self.render_mode == "ansi":
             return self._render_ansi()
+        if self.render_mode == "rgb_array":
+            return self._render_rgb()
         return None
 
+    def _render_rgb(self) -> np.ndarray:
+        """Render as an (H * cell_size, W * cell_size, 3) uint8 image."""
+        return render_rgb(self.occupancy, self.snake[0], self.food, self.cell_size)
+
     def _render_ansi(self) -> str:
         """Render as ASCII art."""
         grid = [["." for _ in range(self.grid_width)] for _ in range(self.grid_height)]
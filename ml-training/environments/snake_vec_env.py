@@ -0,0 +1,330 @@
+"""
+Batched Snake Environment (Stable-Baselines3 VecEnv)
+
+Steps N independent Snake games at once with NumPy array operations,
+instead of looping over N `SnakeEnv` instances inside a DummyVecEnv.
+
+Game rules, rewards and observations are identical to `SnakeEnv`:
+sub-env i reset with seed `s` plays exactly the same game as
+`SnakeEnv().reset(seed=s)` given the same actions.
+
+Internal state (N = num_envs, C = grid_width * grid_height):
+    - board:    (N, C) uint8 occupancy, cell index = y * grid_width + x
+    - body:     (N, capacity, 2) int32 ring buffer of (x, y) segments;
+                vacated slots hold (-1, -1), so the padded `snake`
+                observation is a single gather
+    - head_ptr: (N,) position of the HEAD inside `body`
+                (segment k lives at `(head_ptr - k) % capacity`)
+    - free:     (N, C) int32 free-cell index + (N, C) position map + n_free,
+                updated with the same swap-remove order as SnakeEnv
+    - length, direction, food, steps, score: (N,) int arrays
+
+Observation Space (Dict, stacked along a leading N axis):
+    Same keys as `SnakeEnv`: snake (N, max_snake_length, 2), food (N, 2),
+    direction (N,), grid_size (N, 2), snake_length (N,).
+
+Auto-reset follows the SB3 VecEnv convention: when a game ends, its final
+observation is stored in `infos[i]["terminal_observation"]` and the returned
+observation is the first one of the next game. Auto-reset games keep drawing
+from the sub-env's RNG, so a seeded SnakeVecEnv is fully reproducible.
+
+Example:
+    >>> from stable_baselines3.common.vec_env import VecMonitor
+    >>> venv = VecMonitor(SnakeVecEnv(num_envs=256, grid_width=10, grid_height=10))
+    >>> venv.seed(42)
+    >>> obs = venv.reset()
+    >>> obs["snake"].shape   # (256, 100, 2)
+"""
+
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import VecEnv
+from typing import Any, Dict, List, Optional, Sequence
+
+# Action deltas: 0=UP, 1=DOWN, 2=LEFT, 3=RIGHT (same as SnakeEnv)
+_DX = np.array([0, 0, -1, 1], dtype=np.int32)
+_DY = np.array([-1, 1, 0, 0], dtype=np.int32)
+_OPPOSITE = np.array([1, 0, 3, 2], dtype=np.int64)
+
+
+class SnakeVecEnv(VecEnv):
+    """
+    N Snake games stepped together as NumPy arrays.
+
+    See module docstring for state layout and observation details.
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        grid_width: int = 20,
+        grid_height: int = 20,
+        max_steps: int = 1000,
+        max_snake_length: int = 100,
+        legacy_food_spawn: bool = False,
+    ):
+        self.render_mode = None
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.max_steps = max_steps
+        self.max_snake_length = max_snake_length
+        self.legacy_food_spawn = legacy_food_spawn
+
+        n_cells = grid_width * grid_height
+        self._n_cells = n_cells
+        self._capacity = max(n_cells, max_snake_length) + 1
+        self._env_idx = np.arange(num_envs)
+        self._segment_offsets = np.arange(max_snake_length)
+
+        # Game state (one row per env)
+        self.board = np.zeros((num_envs, n_cells), dtype=np.uint8)
+        self.body = np.full((num_envs, self._capacity, 2), -1, dtype=np.int32)
+        self.head_ptr = np.zeros(num_envs, dtype=np.int64)
+        self.length = np.zeros(num_envs, dtype=np.int64)
+        self.direction = np.full(num_envs, 3, dtype=np.int64)
+        self.food = np.zeros(num_envs, dtype=np.int64)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.free = np.zeros((num_envs, n_cells), dtype=np.int32)
+        self.free_pos = np.zeros((num_envs, n_cells), dtype=np.int32)
+        self.n_free = np.zeros(num_envs, dtype=np.int64)
+
+        self._rngs: List[np.random.Generator] = [
+            np.random.default_rng() for _ in range(num_envs)
+        ]
+        self._actions = np.zeros(num_envs, dtype=np.int64)
+        self._grid_size = np.array([grid_width, grid_height], dtype=np.int32)
+
+        observation_space = spaces.Dict({
+            "snake": spaces.Box(
+                low=-1,
+                high=max(grid_width, grid_height),
+                shape=(max_snake_length, 2),
+                dtype=np.int32
+            ),
+            "food": spaces.Box(
+                low=0,
+                high=max(grid_width, grid_height),
+                shape=(2,),
+                dtype=np.int32
+            ),
+            "direction": spaces.Discrete(4),
+            "grid_size": spaces.Box(
+                low=1,
+                high=max(grid_width, grid_height),
+                shape=(2,),
+                dtype=np.int32
+            ),
+            "snake_length": spaces.Discrete(max_snake_length + 1),
+        })
+        super().__init__(num_envs, observation_space, spaces.Discrete(4))
+
+    # ------------------------------------------------------------------
+    # VecEnv API
+    # ------------------------------------------------------------------
+
+    def reset(self) -> Dict[str, np.ndarray]:
+        """Reset every game, consuming seeds set via `seed()`."""
+        for i, seed in enumerate(self._seeds):
+            self._rngs[i] = np.random.default_rng(seed)
+        self._reset_games(self._env_idx)
+        self._reset_seeds()
+        self._reset_options()
+        self.reset_infos = self._get_infos(self._env_idx)
+        return self._get_obs()
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        n = self._env_idx
+        actions = self._actions
+
+        # Prevent 180-degree turns
+        turn = actions != _OPPOSITE[self.direction]
+        self.direction = np.where(turn, actions, self.direction)
+        self.steps += 1
+
+        # Calculate new head positions
+        head = self.body[n, self.head_ptr]
+        new_x = head[:, 0] + _DX[self.direction]
+        new_y = head[:, 1] + _DY[self.direction]
+        inside = (
+            (new_x >= 0) & (new_x < self.grid_width) &
+            (new_y >= 0) & (new_y < self.grid_height)
+        )
+        new_cell = np.where(inside, new_y * self.grid_width + new_x, 0)
+
+        # Collision: wall, or body excluding the tail (it moves away)
+        tail_ptr = (self.head_ptr - self.length + 1) % self._capacity
+        tail = self.body[n, tail_ptr]
+        tail_cell = tail[:, 1] * self.grid_width + tail[:, 0]
+        hit_body = (self.board[n, new_cell] != 0) & (new_cell != tail_cell)
+        crashed = ~inside | hit_body
+        alive = ~crashed
+        ate = alive & (new_cell == self.food)
+
+        # Move snakes: drop tail (unless eating), then add new head
+        moved = alive & ~ate
+        moved_idx = n[moved]
+        self._release(moved_idx, tail_cell[moved])
+        self.body[moved_idx, tail_ptr[moved]] = -1
+        alive_idx = n[alive]
+        self.head_ptr[alive] = (self.head_ptr[alive] + 1) % self._capacity
+        self.body[alive_idx, self.head_ptr[alive], 0] = new_x[alive]
+        self.body[alive_idx, self.head_ptr[alive], 1] = new_y[alive]
+        self._occupy(alive_idx, new_cell[alive])
+
+        self.length[ate] += 1
+        self.score[ate] += 10
+        for i in np.flatnonzero(ate):
+            self._spawn_food(i)
+
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        rewards[ate] = 10.0
+        rewards[crashed] = -10.0
+        truncated = alive & (self.steps >= self.max_steps)
+        dones = crashed | truncated
+
+        infos = self._get_infos(n)
+        done_idx = np.flatnonzero(dones)
+        if len(done_idx):
+            terminal_obs = self._get_obs(done_idx)
+            for row, i in enumerate(done_idx):
+                infos[i]["TimeLimit.truncated"] = bool(truncated[i])
+                infos[i]["terminal_observation"] = {
+                    key: value[row] for key, value in terminal_obs.items()
+                }
+            self._reset_games(done_idx)
+
+        return self._get_obs(), rewards, dones, infos
+
+    def reset_games(self, indices: Sequence[int]) -> Dict[str, np.ndarray]:
+        """
+        End the selected games early and start new ones (for wrappers with
+        their own episode limits). New games draw from each sub-env's RNG,
+        as auto-reset does.
+
+        Returns:
+            First observations of the new games, stacked in `indices` order
+        """
+        idx = np.asarray(indices, dtype=np.int64)
+        self._reset_games(idx)
+        return self._get_obs(idx)
+
+    def close(self) -> None:
+        """Clean up resources."""
+        pass
+
+    def get_attr(self, attr_name: str, indices=None) -> List[Any]:
+        """Return a (shared) attribute once per selected env."""
+        value = getattr(self, attr_name)
+        return [value for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name: str, value: Any, indices=None) -> None:
+        """Set a (shared) attribute; applies to every env."""
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name: str, *method_args, indices=None, **method_kwargs) -> List[Any]:
+        """Call a method of this batched env once per selected env."""
+        method = getattr(self, method_name)
+        return [method(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None) -> List[bool]:
+        """Games are not gym.Env instances, so they are never wrapped."""
+        return [False for _ in self._get_indices(indices)]
+
+    def get_images(self) -> Sequence[Optional[np.ndarray]]:
+        return [None for _ in range(self.num_envs)]
+
+    # ------------------------------------------------------------------
+    # Game logic
+    # ------------------------------------------------------------------
+
+    def _reset_games(self, idx: np.ndarray) -> None:
+        """Reset the selected games to the initial SnakeEnv state."""
+        start_x = self.grid_width // 2
+        start_y = self.grid_height // 2
+        row = start_y * self.grid_width
+
+        self.board[idx] = 0
+        self.free[idx] = np.arange(self._n_cells)
+        self.free_pos[idx] = np.arange(self._n_cells)
+        self.n_free[idx] = self._n_cells
+        self.body[idx] = -1
+        self.body[idx, 0] = (start_x - 2, start_y)  # tail
+        self.body[idx, 1] = (start_x - 1, start_y)
+        self.body[idx, 2] = (start_x, start_y)      # head
+        # Occupy head first, as SnakeEnv does
+        for offset in (0, -1, -2):
+            self._occupy(idx, np.full(len(idx), row + start_x + offset))
+        self.head_ptr[idx] = 2
+        self.length[idx] = 3
+        self.direction[idx] = 3  # RIGHT
+        self.steps[idx] = 0
+        self.score[idx] = 0
+
+        for i in idx:
+            self._spawn_food(i)
+
+    def _occupy(self, idx: np.ndarray, cells: np.ndarray) -> None:
+        """Mark one cell per selected game as snake (swap-remove from free index)."""
+        self.board[idx, cells] = 1
+        pos = self.free_pos[idx, cells]
+        self.n_free[idx] -= 1
+        last = self.free[idx, self.n_free[idx]]
+        self.free[idx, pos] = last
+        self.free_pos[idx, last] = pos
+        self.free_pos[idx, cells] = -1
+
+    def _release(self, idx: np.ndarray, cells: np.ndarray) -> None:
+        """Mark one cell per selected game as empty (append to free index)."""
+        self.board[idx, cells] = 0
+        self.free[idx, self.n_free[idx]] = cells
+        self.free_pos[idx, cells] = self.n_free[idx]
+        self.n_free[idx] += 1
+
+    def _spawn_food(self, i: int) -> None:
+        """Spawn food at random empty position (same draw as SnakeEnv)."""
+        n_free = int(self.n_free[i])
+        if not n_free:
+            return
+
+        k = self._rngs[i].integers(0, n_free)
+        if self.legacy_food_spawn:
+            # SnakeEnv legacy mode enumerates free cells x-major: for x, for y
+            board = self.board[i].reshape(self.grid_height, self.grid_width)
+            x, y = divmod(int(np.flatnonzero(board.T.ravel() == 0)[k]), self.grid_height)
+            self.food[i] = y * self.grid_width + x
+        else:
+            self.food[i] = self.free[i, k]
+
+    def _get_obs(self, idx: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """Build the stacked Dict observation (snake[:, 0] is the HEAD)."""
+        if idx is None:
+            idx = self._env_idx
+
+        # Gather from the flattened ring buffer (much faster than 2-D fancy indexing)
+        ptr = self.head_ptr[idx, None] - self._segment_offsets
+        ptr[ptr < 0] += self._capacity
+        ptr += (idx * self._capacity)[:, None]
+        snake = np.take(self.body.reshape(-1, 2), ptr, axis=0)
+
+        food = np.empty((len(idx), 2), dtype=np.int32)
+        food[:, 0] = self.food[idx] % self.grid_width
+        food[:, 1] = self.food[idx] // self.grid_width
+
+        return {
+            "snake": snake,
+            "food": food,
+            "direction": self.direction[idx],
+            "grid_size": np.tile(self._grid_size, (len(idx), 1)),
+            "snake_length": self.length[idx],
+        }
+
+    def _get_infos(self, idx: np.ndarray) -> List[Dict[str, Any]]:
+        """Get additional info for the selected games."""
+        return [
+            {"score": int(self.score[i]), "snake_length": int(self.length[i])}
+            for i in idx
+        ]
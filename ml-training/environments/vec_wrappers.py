@@ -0,0 +1,332 @@
+"""
+Batched Feature Wrappers for Snake VecEnvs
+
+VecEnvWrapper counterparts of Compact11Wrapper, GridFlattenWrapper,
+ImageWrapper and LidarHungerWrapper. They take the stacked Dict observation
+of N games (from SnakeVecEnv, or a DummyVecEnv/SubprocVecEnv of SnakeEnv)
+and build the (N, 11), (N, 4 + W*H), (N, H, W, 3) and (N, 28) arrays with
+array ops only: body cells are written with one fancy-index scatter over
+the valid (env, segment) pairs, with no Python loop over envs or segments.
+
+Each row is identical to what the single-env wrapper returns for the same
+sub-observation.
+
+Output buffers: every wrapper preallocates two output arrays and
+alternates between them ("ping-pong"). The observation returned by one
+step therefore stays valid while the next step is built, which SB3 relies
+on (`_last_obs` is kept across a step). Keep a copy if an observation must
+outlive two steps. Terminal observations in `infos` are transformed into
+fresh arrays.
+
+Only the "padded" body encoding (the `snake` key) is supported.
+
+Example:
+    >>> from stable_baselines3.common.vec_env import VecMonitor
+    >>> venv = VecCompact11(SnakeVecEnv(num_envs=1024, grid_width=10, grid_height=10))
+    >>> venv = VecMonitor(venv)
+    >>> obs = venv.reset()        # (1024, 11) float32
+"""
+
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import VecEnv, VecEnvWrapper
+from typing import Any, Dict, Optional
+
+from environments.lidar import LidarRayTables
+from environments.snake_vec_env import SnakeVecEnv
+
+# Action deltas: 0=UP, 1=DOWN, 2=LEFT, 3=RIGHT
+_DX = np.array([0, 0, -1, 1], dtype=np.int64)
+_DY = np.array([-1, 1, 0, 0], dtype=np.int64)
+
+# (straight, right, left) absolute direction per current direction
+# (same as Compact11Wrapper._relative_dirs)
+_RELATIVE_DIRS = np.array([
+    [0, 3, 2],  # UP
+    [1, 2, 3],  # DOWN
+    [2, 0, 1],  # LEFT
+    [3, 1, 0],  # RIGHT
+], dtype=np.int64)
+
+# Direction -> one-hot column: LEFT=3, RIGHT=4, UP=5, DOWN=6
+_DIRECTION_COLUMN = np.array([5, 6, 3, 4], dtype=np.int64)
+
+
+class _SnakeObsVecWrapper(VecEnvWrapper):
+    """
+    Base class: ping-pong output buffers and terminal-observation handling.
+
+    Subclasses set `observation_space` and implement `_fill(obs, out)`.
+    """
+
+    def __init__(self, venv: VecEnv, observation_space: spaces.Box):
+        if "snake" not in venv.observation_space.spaces:
+            raise ValueError(
+                f"{type(self).__name__} needs the padded body encoding ('snake' key)"
+            )
+        super().__init__(venv, observation_space=observation_space)
+
+        grid_space = venv.observation_space["grid_size"]
+        self.grid_width = int(grid_space.high[0])
+        self.grid_height = int(grid_space.high[1])
+
+        shape = (self.num_envs,) + observation_space.shape
+        self._buffers = [np.zeros(shape, dtype=observation_space.dtype) for _ in range(2)]
+        self._next = 0
+
+    def reset(self) -> np.ndarray:
+        return self._transform(self.venv.reset())
+
+    def step_wait(self):
+        obs, rewards, dones, infos = self.venv.step_wait()
+        for info in infos:
+            terminal = info.get("terminal_observation")
+            if isinstance(terminal, dict):
+                batch = {key: np.asarray(value)[None] for key, value in terminal.items()}
+                out = np.zeros((1,) + self.observation_space.shape, dtype=self.observation_space.dtype)
+                info["terminal_observation"] = self._fill(batch, out)[0]
+        return self._transform(obs), rewards, dones, infos
+
+    def _transform(self, obs: Dict[str, np.ndarray]) -> np.ndarray:
+        """Fill the next ping-pong buffer."""
+        out = self._buffers[self._next]
+        self._next ^= 1
+        return self._fill(obs, out)
+
+    def _fill(self, obs: Dict[str, np.ndarray], out: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    @staticmethod
+    def _body_cells(obs: Dict[str, np.ndarray], skip_head: bool = False):
+        """
+        Valid body segments of every game, flattened.
+
+        Args:
+            skip_head: Leave out segment 0 (the head)
+
+        Returns:
+            rows: (M,) env index of each segment
+            xs, ys: (M,) segment positions
+        """
+        snake = obs["snake"]
+        length = np.asarray(obs["snake_length"]).reshape(-1, 1)
+        segment = np.arange(snake.shape[1])
+        valid = (segment < length) & (snake[:, :, 0] >= 0) & (snake[:, :, 1] >= 0)
+        if skip_head:
+            valid &= segment >= 1
+        rows, segments = np.nonzero(valid)
+        return rows, snake[rows, segments, 0], snake[rows, segments, 1]
+
+
+class VecCompact11(_SnakeObsVecWrapper):
+    """
+    Batched Compact11Wrapper: (N, 11) float32 features.
+
+    See Compact11Wrapper for the feature layout.
+    """
+
+    def __init__(self, venv: VecEnv):
+        super().__init__(
+            venv,
+            spaces.Box(low=0.0, high=1.0, shape=(11,), dtype=np.float32),
+        )
+        # Occupancy scratch board with one spare column for off-board lookups
+        self._board = np.zeros((self.num_envs, self.grid_width * self.grid_height + 1), dtype=bool)
+
+    def _fill(self, obs: Dict[str, np.ndarray], out: np.ndarray) -> np.ndarray:
+        n = len(out)
+        env_idx = np.arange(n)
+        snake = obs["snake"]
+        grid_size = obs["grid_size"]
+        grid_w, grid_h = grid_size[:, 0:1], grid_size[:, 1:2]
+        head_x, head_y = snake[:, 0, 0], snake[:, 0, 1]
+        direction = np.asarray(obs["direction"]).reshape(n)
+        food = obs["food"]
+
+        board = self._board[:n] if n <= len(self._board) else np.zeros((n, self._board.shape[1]), dtype=bool)
+        off_board = board.shape[1] - 1
+        board[:] = False
+        rows, xs, ys = self._body_cells(obs)
+        board[rows, ys * grid_w[rows, 0] + xs] = True
+
+        # === Danger (0-2): straight, right, left ===
+        moves = _RELATIVE_DIRS[direction]                         # (N, 3)
+        next_x = head_x[:, None] + _DX[moves]
+        next_y = head_y[:, None] + _DY[moves]
+        inside = (next_x >= 0) & (next_x < grid_w) & (next_y >= 0) & (next_y < grid_h)
+        cells = np.where(inside, next_y * grid_w + next_x, off_board)
+        out[:, 0:3] = ~inside | board[env_idx[:, None], cells]
+
+        # === Direction one-hot (3-6) ===
+        out[:, 3:7] = 0.0
+        out[env_idx, _DIRECTION_COLUMN[direction]] = 1.0
+
+        # === Food relative position (7-10) ===
+        out[:, 7] = food[:, 0] < head_x
+        out[:, 8] = food[:, 0] > head_x
+        out[:, 9] = food[:, 1] < head_y
+        out[:, 10] = food[:, 1] > head_y
+        return out
+
+
+class VecGridFlatten(_SnakeObsVecWrapper):
+    """
+    Batched GridFlattenWrapper: (N, 4 + W*H) float32.
+
+    First 4 columns: head_x, head_y, food_x, food_y (normalized); the rest
+    is the flattened grid (0=empty, 1=snake, 2=food).
+    """
+
+    def __init__(self, venv: VecEnv):
+        grid_space = venv.observation_space["grid_size"]
+        obs_size = 4 + int(grid_space.high[0]) * int(grid_space.high[1])
+        super().__init__(
+            venv,
+            spaces.Box(low=0.0, high=2.0, shape=(obs_size,), dtype=np.float32),
+        )
+
+    def _fill(self, obs: Dict[str, np.ndarray], out: np.ndarray) -> np.ndarray:
+        n = len(out)
+        env_idx = np.arange(n)
+        snake = obs["snake"]
+        food = obs["food"]
+        grid_w = obs["grid_size"][:, 0]
+        grid_h = obs["grid_size"][:, 1]
+
+        out[:, 0] = snake[:, 0, 0] / grid_w
+        out[:, 1] = snake[:, 0, 1] / grid_h
+        out[:, 2] = food[:, 0] / grid_w
+        out[:, 3] = food[:, 1] / grid_h
+
+        out[:, 4:] = 0.0
+        rows, xs, ys = self._body_cells(obs)
+        out[rows, 4 + ys * grid_w[rows] + xs] = 1.0
+        out[env_idx, 4 + food[:, 1] * grid_w + food[:, 0]] = 2.0
+        return out
+
+
+class VecImage(_SnakeObsVecWrapper):
+    """
+    Batched ImageWrapper: (N, H, W, 3) uint8.
+
+    Channel 0: body (255), channel 1: head (255), channel 2: food (255).
+    """
+
+    def __init__(self, venv: VecEnv):
+        grid_space = venv.observation_space["grid_size"]
+        shape = (int(grid_space.high[1]), int(grid_space.high[0]), 3)
+        super().__init__(
+            venv,
+            spaces.Box(low=0, high=255, shape=shape, dtype=np.uint8),
+        )
+
+    def _fill(self, obs: Dict[str, Any], out: np.ndarray) -> np.ndarray:
+        n = len(out)
+        env_idx = np.arange(n)
+        snake = obs["snake"]
+        food = obs["food"]
+
+        out[:] = 0
+        rows, xs, ys = self._body_cells(obs)
+        out[rows, ys, xs, 0] = 255
+        out[env_idx, snake[:, 0, 1], snake[:, 0, 0], 1] = 255
+        out[env_idx, food[:, 1], food[:, 0], 2] = 255
+        return out
+
+
+class VecLidarHunger(_SnakeObsVecWrapper):
+    """
+    Batched LidarHungerWrapper ("table" engine): (N, 28) float32 features.
+
+    See LidarHungerWrapper for the feature layout. The 8 rays of all N games
+    are cast with one LidarRayTables gather. The hunger rules are applied
+    per game: -0.001 on steps without food, and a game that goes more than
+    500 steps without eating is truncated (`TimeLimit.truncated`) and
+    restarted via SnakeVecEnv.reset_games().
+
+    Needs a SnakeVecEnv directly underneath, since starving games must be
+    reset early.
+    """
+
+    STARVATION_STEPS = 500
+
+    def __init__(self, venv: VecEnv):
+        if not isinstance(venv, SnakeVecEnv):
+            raise ValueError(
+                f"VecLidarHunger needs a SnakeVecEnv, got {type(venv).__name__}"
+            )
+        super().__init__(
+            venv,
+            spaces.Box(low=-1.0, high=1.0, shape=(28,), dtype=np.float32),
+        )
+        self._tables = LidarRayTables(self.grid_width, self.grid_height)
+        self.steps_since_eat = np.zeros(self.num_envs, dtype=np.int64)
+
+    def reset(self) -> np.ndarray:
+        self.steps_since_eat[:] = 0
+        return super().reset()
+
+    def step_wait(self):
+        obs, rewards, dones, infos = self.venv.step_wait()
+
+        ate = rewards > 0
+        self.steps_since_eat[ate] = 0
+        self.steps_since_eat[~ate] += 1
+        rewards[~ate] -= 0.001
+
+        # Finished games: features with this step's hunger
+        done_idx = np.flatnonzero(dones)
+        if len(done_idx):
+            terminal = {
+                key: np.stack([infos[i]["terminal_observation"][key] for i in done_idx])
+                for key in obs
+            }
+            features = self._features(terminal, self.steps_since_eat[done_idx])
+            for row, i in enumerate(done_idx):
+                infos[i]["terminal_observation"] = features[row]
+
+        # Starving games: truncate and start new ones
+        starved = np.flatnonzero(~dones & (self.steps_since_eat > self.STARVATION_STEPS))
+        if len(starved):
+            terminal = {key: value[starved] for key, value in obs.items()}
+            features = self._features(terminal, self.steps_since_eat[starved])
+            for row, i in enumerate(starved):
+                infos[i]["TimeLimit.truncated"] = True
+                infos[i]["terminal_observation"] = features[row]
+            for key, value in self.venv.reset_games(starved).items():
+                obs[key][starved] = value
+            dones = dones.copy()
+            dones[starved] = True
+
+        self.steps_since_eat[dones] = 0
+        return self._transform(obs), rewards, dones, infos
+
+    def _fill(self, obs: Dict[str, np.ndarray], out: np.ndarray) -> np.ndarray:
+        return self._features(obs, self.steps_since_eat, out)
+
+    def _features(
+        self,
+        obs: Dict[str, np.ndarray],
+        steps_since_eat: np.ndarray,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """LidarHungerWrapper features of a batch with the given hunger counters."""
+        n = len(steps_since_eat)
+        if out is None:
+            out = np.zeros((n, 28), dtype=np.float32)
+        heads = obs["snake"][:, 0]
+        food = obs["food"]
+        grid_w = obs["grid_size"][:, 0]
+        grid_h = obs["grid_size"][:, 1]
+
+        # Body (excluding head) as obstacles, like LidarHungerWrapper
+        grid = self._tables.grid(n)
+        rows, xs, ys = self._body_cells(obs, skip_head=True)
+        grid[rows, ys * self.grid_width + xs] = 1
+        self._tables.features(grid, heads, food, out)
+
+        out[:, 24] = obs["snake_length"] / (grid_w * grid_h)
+        out[:, 25] = np.minimum(steps_since_eat / self.STARVATION_STEPS, 1.0)
+        out[:, 26] = (food[:, 0] - heads[:, 0]) / grid_w
+        out[:, 27] = (food[:, 1] - heads[:, 1]) / grid_h
+        return out
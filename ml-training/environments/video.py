@@ -0,0 +1,156 @@
+"""
+Offline Video Export for Recorded Snake Episodes
+
+Turns an episode log written by EpisodeRecorder into GIF / MP4 / WebP clips.
+Frames are regenerated by replaying seed + actions and painting each state
+with the rgb_array renderer, so nothing but the tiny log has to be stored.
+Each episode is rendered and encoded in its own worker process.
+
+Requires `imageio` (GIF / WebP via Pillow, MP4 via `imageio-ffmpeg`):
+    pip install imageio imageio-ffmpeg
+
+Usage:
+    >>> paths = export_episodes("eval.snakelog", "output/videos", fmt="mp4")
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from environments.recording import EpisodeRecord, EpisodeReplayer
+from environments.snake_env import SnakeEnv
+
+VIDEO_FORMATS = ("gif", "mp4", "webp")
+
+
+def iter_frames(
+    record: EpisodeRecord,
+    cell_size: int = 8,
+    stride: int = 1,
+) -> Iterator[np.ndarray]:
+    """
+    Replay a recorded episode and yield rendered frames.
+
+    Args:
+        record: Episode from EpisodeReplayer.episodes
+        cell_size: Pixels per grid cell
+        stride: Yield every `stride`-th state (the final state is always yielded)
+
+    Yields:
+        np.ndarray, shape=(H * cell_size, W * cell_size, 3), dtype=uint8
+    """
+    env = SnakeEnv(render_mode="rgb_array", obs_mode="none", cell_size=cell_size, **record.config)
+    env.reset(seed=record.seed)
+    n_steps = len(record.actions)
+
+    yield env.render()
+    for t, action in enumerate(record.actions.tolist(), start=1):
+        env.step(action)
+        if t % stride == 0 or t == n_steps:
+            yield env.render()
+
+
+def write_video(
+    frames: Iterator[np.ndarray],
+    path: Union[str, Path],
+    fps: int = 15,
+) -> Path:
+    """
+    Encode frames to GIF / MP4 / WebP, chosen by the file extension.
+
+    Args:
+        frames: RGB uint8 frames of identical shape
+        path: Output file (.gif, .mp4 or .webp)
+        fps: Playback frames per second
+
+    Returns:
+        Path of the written file
+    """
+    try:
+        import imageio.v2 as imageio
+    except ImportError:
+        raise ImportError(
+            "imageio not installed. Run: pip install imageio imageio-ffmpeg"
+        )
+
+    path = Path(path)
+    fmt = path.suffix.lstrip(".").lower()
+    if fmt not in VIDEO_FORMATS:
+        raise ValueError(f"Unknown video format: {fmt!r} (expected one of {VIDEO_FORMATS})")
+
+    if fmt == "gif":
+        # Pillow's GIF writer takes frame duration in ms; loop forever
+        writer = imageio.get_writer(path, mode="I", duration=1000 / fps, loop=0)
+    elif fmt == "mp4":
+        # macro_block_size=1: frames need not be padded to multiples of 16
+        writer = imageio.get_writer(path, fps=fps, macro_block_size=1)
+    else:
+        writer = imageio.get_writer(path, mode="I", fps=fps)
+
+    with writer:
+        for frame in frames:
+            writer.append_data(frame)
+    return path
+
+
+def _export_one(
+    record: EpisodeRecord,
+    path: Path,
+    cell_size: int,
+    stride: int,
+    fps: int,
+) -> Path:
+    """Worker entry point: render and encode one episode."""
+    return write_video(iter_frames(record, cell_size, stride), path, fps)
+
+
+def export_episodes(
+    log_path: Union[str, Path],
+    out_dir: Union[str, Path],
+    episodes: Optional[Sequence[int]] = None,
+    fmt: str = "gif",
+    cell_size: int = 8,
+    fps: int = 15,
+    stride: int = 1,
+    workers: Optional[int] = None,
+) -> List[Path]:
+    """
+    Export recorded episodes to video files in parallel.
+
+    Args:
+        log_path: Episode log written by EpisodeRecorder
+        out_dir: Directory for the clips (created if missing)
+        episodes: Episode indices to export (default: all)
+        fmt: "gif", "mp4" or "webp"
+        cell_size: Pixels per grid cell
+        fps: Playback frames per second
+        stride: Keep every `stride`-th frame (speeds up long games)
+        workers: Worker processes (default: CPU count; 0 = encode in this process)
+
+    Returns:
+        Output paths, in the order of `episodes`
+    """
+    if fmt not in VIDEO_FORMATS:
+        raise ValueError(f"Unknown video format: {fmt!r} (expected one of {VIDEO_FORMATS})")
+    if stride < 1:
+        raise ValueError(f"stride must be >= 1, got {stride}")
+
+    replayer = EpisodeReplayer(log_path)
+    if episodes is None:
+        episodes = range(len(replayer))
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    stem = Path(log_path).stem
+    jobs = [
+        (replayer.episodes[i], out_dir / f"{stem}_ep{i:04d}.{fmt}", cell_size, stride, fps)
+        for i in episodes
+    ]
+    if workers == 0:
+        return [_export_one(*job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_export_one, *job) for job in jobs]
+        return [future.result() for future in futures]
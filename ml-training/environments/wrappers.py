@@ -8,7 +8,19 @@ for various training strategies.
 import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Optional, Tuple
+
+from environments.encoding import snake_head, snake_segments
+from environments.flood_fill import accessible_area
+from environments.lidar import LidarRayTables, food_on_rays
+
+
+OBS_DTYPES = ("float32", "uint8")
+
+
+def _check_obs_dtype(dtype: str) -> None:
+    if dtype not in OBS_DTYPES:
+        raise ValueError(f"Unknown dtype: {dtype!r} (expected one of {OBS_DTYPES})")
 
 
 class LidarHungerWrapper(gym.Wrapper):
@@ -31,6 +43,18 @@ class LidarHungerWrapper(gym.Wrapper):
         [27]    Food distance Y (normalized, signed: -1 to 1)
     
     Output: Box(shape=(28,), dtype=float32)
+
+    LIDAR engines (`engine`):
+        - "table":    precomputed ray index tables + one NumPy gather over
+                      the body cells (see environments/lidar.py)
+        - "bitboard": the env's SnakeBitboard (needs SnakeEnv(bitboard=True));
+                      rays see the full, untruncated body
+        - "field":    the env's incrementally updated DistanceField (needs
+                      SnakeEnv(distance_field=True)); O(1) lookups, full body
+        - "raycast":  reference implementation, walks each ray cell by cell
+        - "auto" (default): "bitboard" or "field" if the env keeps one,
+                      else "table"
+    "table" and "raycast" give identical features.
     """
     
     # 8 directions: UP, DOWN, LEFT, RIGHT, UP-LEFT, UP-RIGHT, DOWN-LEFT, DOWN-RIGHT
@@ -51,6 +75,7 @@ class LidarHungerWrapper(gym.Wrapper):
         base_hunger_penalty: float = -0.01,
         hunger_increment: float = -0.01,
         max_hunger_penalty: float = -0.5,
+        engine: str = "auto",
     ):
         """
         Args:
@@ -58,6 +83,7 @@ class LidarHungerWrapper(gym.Wrapper):
             base_hunger_penalty: Initial hunger penalty (default: -0.01)
             hunger_increment: How much penalty increases when not approaching food (default: -0.01)
             max_hunger_penalty: Maximum hunger penalty cap (default: -0.5)
+            engine: LIDAR engine: "auto", "table", "bitboard", "field" or "raycast"
         """
         super().__init__(env)
         
@@ -68,6 +94,22 @@ class LidarHungerWrapper(gym.Wrapper):
         # State tracking
         self.current_hunger_penalty = base_hunger_penalty
         self.prev_food_distance = None
+
+        # LIDAR engine
+        bitboard = getattr(env.unwrapped, "bitboard", None)
+        field = getattr(env.unwrapped, "distance_field", None)
+        if engine == "auto":
+            engine = "bitboard" if bitboard is not None else "field" if field is not None else "table"
+        if engine not in ("table", "bitboard", "field", "raycast"):
+            raise ValueError(f"Unknown LIDAR engine: {engine!r}")
+        if engine == "bitboard" and bitboard is None:
+            raise ValueError('engine="bitboard" requires SnakeEnv(bitboard=True)')
+        if engine == "field" and field is None:
+            raise ValueError('engine="field" requires SnakeEnv(distance_field=True)')
+        self.engine = engine
+        self._bitboard = bitboard
+        self._field = field
+        self._ray_tables = None  # built on first use, once the grid size is known
         
         # Observation space: 28 features
         self.observation_space = spaces.Box(
@@ -124,53 +166,26 @@ class LidarHungerWrapper(gym.Wrapper):
     
     def _calculate_food_distance(self, obs: Dict[str, Any]) -> float:
         """Calculate Manhattan distance to food."""
-        head = obs["snake"][0]
+        head = snake_head(obs)
         food = obs["food"]
         return abs(head[0] - food[0]) + abs(head[1] - food[1])
 
     def _calculate_accessible_area(self, obs: Dict[str, Any]) -> int:
-        """Calculate number of accessible cells from head using logical Flood Fill."""
-        snake = obs["snake"]
-        grid_size = obs["grid_size"]
-        w, h = grid_size
-        head = snake[0]
-        
-        # Create a set of obstacles (snake body)
+        """Calculate number of accessible cells from head (run-based flood fill)."""
+        snake = snake_segments(obs)
+        grid_w, grid_h = int(obs["grid_size"][0]), int(obs["grid_size"][1])
+
         # Note: Tail might move, but for safety we consider it an obstacle in this heuristic
-        obstacles = set(tuple(p) for p in snake)
-        
-        # BFS
-        queue = [tuple(head)]
-        visited = {tuple(head)}
-        count = 0
-        
-        while queue:
-            curr = queue.pop(0)
-            count += 1
-            
-            cx, cy = curr
-            for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                nx, ny = cx + dx, cy + dy
-                
-                # Check bounds
-                if not (0 <= nx < w and 0 <= ny < h):
-                    continue
-                
-                # Check obstacles
-                if (nx, ny) in obstacles:
-                    continue
-                    
-                if (nx, ny) not in visited:
-                    visited.add((nx, ny))
-                    queue.append((nx, ny))
-                    
-        # The count includes the head itself, so available empty space is count - 1
-        # But we compare against snake_length, so total area (including head) is a fine metric for "volume"
-        return count
-    
+        occupancy = np.zeros((grid_h, grid_w), dtype=np.uint8)
+        occupancy[snake[:, 1], snake[:, 0]] = 1
+
+        # Count includes the head itself: total area (including head) is a
+        # fine metric for "volume" when compared against snake_length
+        return accessible_area(occupancy, snake[0])
+
     def _extract_features(self, obs: Dict[str, Any]) -> np.ndarray:
         """Extract 28-dimensional feature vector."""
-        snake = obs["snake"]
+        snake = snake_segments(obs)
         food = obs["food"]
         grid_size = obs["grid_size"]
         snake_length = obs["snake_length"]
@@ -178,10 +193,88 @@ class LidarHungerWrapper(gym.Wrapper):
         grid_w, grid_h = grid_size[0], grid_size[1]
         max_distance = max(grid_w, grid_h)
         head = snake[0]
+
+        if self.engine == "table":
+            features = self._table_lidar(snake, food, grid_w, grid_h)
+        elif self.engine == "bitboard":
+            features = self._bitboard_lidar(head, food, max_distance)
+        elif self.engine == "field":
+            features = self._field_lidar(head, food, max_distance)
+        else:
+            features = self._raycast_lidar(snake, food, grid_w, grid_h, max_distance)
         
+        # === Additional features ===
+        # Snake length (normalized)
+        max_possible_length = grid_w * grid_h
+        features[24] = snake_length / max_possible_length
+        
+        # Hunger (Timeout Ratio)
+        # 0 = Just ate, 1 = About to die (timeout)
+        features[25] = min(self.steps_since_eat / 500.0, 1.0)
+        
+        # Food relative position (normalized, signed)
+        features[26] = (food[0] - head[0]) / grid_w  # X
+        features[27] = (food[1] - head[1]) / grid_h  # Y
+        
+        return features
+
+    def _table_lidar(self, snake: np.ndarray, food: np.ndarray, grid_w: int, grid_h: int) -> np.ndarray:
+        """Fill LIDAR features [0-23] with one gather over precomputed ray tables."""
+        tables = self._ray_tables
+        if tables is None or (tables.grid_width, tables.grid_height) != (grid_w, grid_h):
+            tables = self._ray_tables = LidarRayTables(int(grid_w), int(grid_h))
+
+        # Body (excluding head) as obstacles, like _raycast_lidar's set
+        grid = tables.grid(1)
+        body = snake[1:]
+        grid[0, body[:, 1] * grid_w + body[:, 0]] = 1
+
+        features = np.zeros((1, 28), dtype=np.float32)
+        tables.features(grid, snake[None, 0], food[None], out=features)
+        return features[0]
+
+    def _field_lidar(self, head: np.ndarray, food: np.ndarray, max_distance: int) -> np.ndarray:
+        """Fill LIDAR features [0-23] from the env's DistanceField."""
+        hx, hy = int(head[0]), int(head[1])
+        distance, hit_wall = self._field.lidar(hx, hy)
+        features = np.zeros(28, dtype=np.float32)
+        features[0:8] = distance / max_distance
+        features[8:16] = hit_wall
+        features[16:24] = food_on_rays(int(food[0]) - hx, int(food[1]) - hy, distance)
+        return features
+
+    def _bitboard_lidar(self, head: np.ndarray, food: np.ndarray, max_distance: int) -> np.ndarray:
+        """Fill LIDAR features [0-23] from the env's bitboard."""
+        hx, hy = int(head[0]), int(head[1])
+        food_dx, food_dy = int(food[0]) - hx, int(food[1]) - hy
+        features = np.zeros(28, dtype=np.float32)
+
+        for i, (dx, dy) in enumerate(self.DIRECTIONS):
+            distance, hit_wall = self._bitboard.ray(hx, hy, dx, dy)
+            features[i] = distance / max_distance
+            features[8 + i] = 1.0 if hit_wall else 0.0
+
+            # Food on this ray: food = head + k * (dx, dy) with 0 < k <= distance
+            k = food_dx * dx if dx else food_dy * dy
+            if 0 < k <= distance and food_dx == k * dx and food_dy == k * dy:
+                features[16 + i] = 1.0
+
+        return features
+
+    def _raycast_lidar(
+        self,
+        snake: np.ndarray,
+        food: np.ndarray,
+        grid_w: int,
+        grid_h: int,
+        max_distance: int,
+    ) -> np.ndarray:
+        """Fill LIDAR features [0-23] by walking each ray cell by cell."""
+        head = snake[0]
+
         # Build snake body set (excluding head for collision check)
         snake_body = set()
-        for i in range(1, snake_length):
+        for i in range(1, len(snake)):
             x, y = snake[i]
             if x >= 0:
                 snake_body.add((x, y))
@@ -202,20 +295,7 @@ class LidarHungerWrapper(gym.Wrapper):
             
             # Food in this direction?
             features[16 + i] = 1.0 if found_food else 0.0
-        
-        # === Additional features ===
-        # Snake length (normalized)
-        max_possible_length = grid_w * grid_h
-        features[24] = snake_length / max_possible_length
-        
-        # Hunger (Timeout Ratio)
-        # 0 = Just ate, 1 = About to die (timeout)
-        features[25] = min(self.steps_since_eat / 500.0, 1.0)
-        
-        # Food relative position (normalized, signed)
-        features[26] = (food[0] - head[0]) / grid_w  # X
-        features[27] = (food[1] - head[1]) / grid_h  # Y
-        
+
         return features
     
     def _cast_ray(
@@ -281,16 +361,32 @@ class Compact11Wrapper(gym.ObservationWrapper):
             - food_down: 1 if food.y > head.y
 
     Output: Box(shape=(11,), dtype=float32)
+        - dtype="uint8": the same 0/1 values as Box(shape=(11,), dtype=uint8)
+        - packed_bits=True: the 11 flags np.packbits-ed into Box(shape=(2,),
+          dtype=uint8); unpack on the policy side with
+          environments.obs_extractors.UnpackObsExtractor
     """
 
-    def __init__(self, env: gym.Env):
+    def __init__(self, env: gym.Env, dtype: str = "float32", packed_bits: bool = False):
+        """
+        Args:
+            env: The Snake environment to wrap
+            dtype: "float32" (default) or "uint8"
+            packed_bits: Pack the 11 binary features into 2 bytes (implies uint8)
+        """
         super().__init__(env)
-        self.observation_space = spaces.Box(
-            low=0.0,
-            high=1.0,
-            shape=(11,),
-            dtype=np.float32
-        )
+        _check_obs_dtype(dtype)
+        self.packed_bits = packed_bits
+        self._dtype = np.uint8 if packed_bits or dtype == "uint8" else np.float32
+        if packed_bits:
+            self.observation_space = spaces.Box(low=0, high=255, shape=(2,), dtype=np.uint8)
+        else:
+            self.observation_space = spaces.Box(
+                low=0.0,
+                high=1.0,
+                shape=(11,),
+                dtype=self._dtype
+            )
 
         # Direction deltas: UP, DOWN, LEFT, RIGHT
         self._direction_delta = {
@@ -311,18 +407,17 @@ class Compact11Wrapper(gym.ObservationWrapper):
 
     def observation(self, obs: Dict[str, Any]) -> np.ndarray:
         """Transform Dict observation to 11-dim feature vector."""
-        snake = obs["snake"]
+        snake = snake_segments(obs)
         food = obs["food"]
         direction = obs["direction"]
         grid_size = obs["grid_size"]
-        snake_length = obs["snake_length"]
 
         # Get valid snake segments (head is at index 0)
         head = snake[0]
-        valid_snake = set(tuple(snake[i]) for i in range(snake_length))
+        valid_snake = set(tuple(segment) for segment in snake)
 
         # Initialize feature vector
-        features = np.zeros(11, dtype=np.float32)
+        features = np.zeros(11, dtype=self._dtype)
 
         # === Danger detection (features 0-2) ===
         rel_dirs = self._relative_dirs[direction]
@@ -352,9 +447,59 @@ class Compact11Wrapper(gym.ObservationWrapper):
         features[9] = 1.0 if food[1] < head[1] else 0.0  # food_up
         features[10] = 1.0 if food[1] > head[1] else 0.0  # food_down
 
+        if self.packed_bits:
+            return np.packbits(features)
         return features
 
 
+class _BodyDelta:
+    """
+    Tracks the painted body between observations for incremental wrappers.
+
+    A normal step moves the visible body by one: the new head is pushed at
+    the front, and at most one visible tail segment falls off (none when the
+    snake grew without hitting max_snake_length). `update()` recognises that
+    case and returns the cells to repaint; anything else (reset, death step,
+    set_state, the unordered "bitmap" encoding) asks for a full repaint.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget the previous observation (next update() repaints fully)."""
+        self.head: Optional[Tuple[int, int]] = None
+        self.tail: Optional[Tuple[int, int]] = None
+        self.food: Optional[Tuple[int, int]] = None
+        self.length = 0
+
+    def update(self, obs: Dict[str, Any], snake: np.ndarray):
+        """
+        Record the new observation and describe what changed.
+
+        Returns:
+            None if the grid must be repainted, else (old_head, old_food,
+            removed_tail) where removed_tail is None if no cell was vacated
+        """
+        old_head, old_tail, old_food, old_length = self.head, self.tail, self.food, self.length
+        length = len(snake)
+        self.head = (int(snake[0, 0]), int(snake[0, 1]))
+        self.tail = (int(snake[-1, 0]), int(snake[-1, 1]))
+        self.food = (int(obs["food"][0]), int(obs["food"][1]))
+        self.length = length
+
+        if (
+            old_head is None
+            or "body_bitmap" in obs
+            or length < 2
+            or self.head == old_head
+            or (int(snake[1, 0]), int(snake[1, 1])) != old_head
+            or length not in (old_length, old_length + 1)
+        ):
+            return None
+        return old_head, old_food, old_tail if length == old_length else None
+
+
 class GridFlattenWrapper(gym.ObservationWrapper):
     """
     Transform raw Snake observation into flattened grid representation.
@@ -362,45 +507,114 @@ class GridFlattenWrapper(gym.ObservationWrapper):
     Output: Box(shape=(4 + grid_w * grid_h,), dtype=float32)
         - First 4: head_x, head_y, food_x, food_y (normalized)
         - Rest: flattened grid (0=empty, 1=snake, 2=food)
+
+    Compact dtypes (unpack on the policy side with
+    environments.obs_extractors.UnpackObsExtractor):
+        - dtype="uint8": same layout as uint8, but the first 4 values are
+          the raw integer coordinates (not normalized)
+        - packed_bits=True: 4 raw coordinates + the snake cells as
+          np.packbits-ed bits, Box(shape=(4 + ceil(W*H / 8),), dtype=uint8);
+          the food cell is restored from its coordinates
+
+    With `incremental=True` the grid is kept between steps and only the
+    cells that changed (new head, vacated tail, old and new food) are
+    rewritten. The returned array is then the wrapper's own buffer and is
+    overwritten by the next step; copy it if it must be kept. reset()
+    switches to a second buffer, so the last observation of an episode
+    (a VecEnv's `terminal_observation`) survives the reset.
     """
 
-    def __init__(self, env: gym.Env):
+    def __init__(
+        self,
+        env: gym.Env,
+        incremental: bool = False,
+        dtype: str = "float32",
+        packed_bits: bool = False,
+    ):
+        """
+        Args:
+            env: The Snake environment to wrap
+            incremental: Update the previous grid in place instead of
+                repainting it every step
+            dtype: "float32" (default) or "uint8"
+            packed_bits: Store snake cells as bits (implies uint8; not
+                combinable with incremental)
+        """
         super().__init__(env)
+        _check_obs_dtype(dtype)
+        if incremental and packed_bits:
+            raise ValueError("incremental=True does not support packed_bits=True")
 
         # Get grid size from wrapped env
         grid_space = env.observation_space["grid_size"]
         self.grid_width = int(grid_space.high[0])
         self.grid_height = int(grid_space.high[1])
+        self.packed_bits = packed_bits
+        self._dtype = np.uint8 if packed_bits or dtype == "uint8" else np.float32
 
-        obs_size = 4 + (self.grid_width * self.grid_height)
-        self.observation_space = spaces.Box(
-            low=0.0,
-            high=2.0,
-            shape=(obs_size,),
-            dtype=np.float32
-        )
+        n_cells = self.grid_width * self.grid_height
+        if packed_bits:
+            self.observation_space = spaces.Box(
+                low=0, high=255, shape=(4 + (n_cells + 7) // 8,), dtype=np.uint8
+            )
+        elif self._dtype == np.uint8:
+            self.observation_space = spaces.Box(
+                low=0,
+                high=max(2, self.grid_width, self.grid_height),
+                shape=(4 + n_cells,),
+                dtype=np.uint8
+            )
+        else:
+            self.observation_space = spaces.Box(
+                low=0.0,
+                high=2.0,
+                shape=(4 + n_cells,),
+                dtype=np.float32
+            )
+
+        self.incremental = incremental
+        self._delta = _BodyDelta()
+        self._features: Optional[np.ndarray] = None
+        self._spare: Optional[np.ndarray] = None
+
+    def reset(self, **kwargs):
+        self._delta.clear()
+        # Ping-pong: keep the previous episode's last observation intact
+        self._features, self._spare = self._spare, self._features
+        return super().reset(**kwargs)
 
     def observation(self, obs: Dict[str, Any]) -> np.ndarray:
         """Transform Dict observation to flattened grid."""
-        snake = obs["snake"]
+        if self.incremental:
+            return self._update(obs)
+
+        snake = snake_segments(obs)
         food = obs["food"]
         grid_size = obs["grid_size"]
-        snake_length = obs["snake_length"]
 
         grid_w, grid_h = grid_size[0], grid_size[1]
-        head = snake[0]
+        features = np.zeros(4 + grid_w * grid_h, dtype=self._dtype)
+        self._paint(features, snake, food, grid_w, grid_h)
+        if self.packed_bits:
+            return np.concatenate([features[:4], np.packbits(features[4:] == 1)])
+        return features
 
-        features = np.zeros(4 + grid_w * grid_h, dtype=np.float32)
+    def _write_positions(self, features: np.ndarray, head, food, grid_w: int, grid_h: int) -> None:
+        """Head and food positions: normalized (float32) or raw coordinates (uint8)."""
+        if self._dtype == np.uint8:
+            features[0:4] = (head[0], head[1], food[0], food[1])
+        else:
+            features[0] = head[0] / grid_w
+            features[1] = head[1] / grid_h
+            features[2] = food[0] / grid_w
+            features[3] = food[1] / grid_h
 
-        # Normalized head and food positions
-        features[0] = head[0] / grid_w
-        features[1] = head[1] / grid_h
-        features[2] = food[0] / grid_w
-        features[3] = food[1] / grid_h
+    def _paint(self, features: np.ndarray, snake: np.ndarray, food: np.ndarray, grid_w: int, grid_h: int) -> None:
+        """Write the full observation into a zeroed features array."""
+        self._write_positions(features, snake[0], food, grid_w, grid_h)
 
         # Flattened grid
-        for i in range(snake_length):
-            x, y = snake[i]
+        for x, y in snake:
             if x >= 0 and y >= 0:
                 idx = 4 + y * grid_w + x
                 features[idx] = 1.0
@@ -408,6 +622,33 @@ class GridFlattenWrapper(gym.ObservationWrapper):
         food_idx = 4 + food[1] * grid_w + food[0]
         features[food_idx] = 2.0
 
+    def _update(self, obs: Dict[str, Any]) -> np.ndarray:
+        """Incremental observation(): patch the previous grid in place."""
+        snake = snake_segments(obs)
+        food = obs["food"]
+        grid_w, grid_h = int(obs["grid_size"][0]), int(obs["grid_size"][1])
+        features = self._features
+        if features is None or len(features) != 4 + grid_w * grid_h:
+            features = self._features = np.zeros(4 + grid_w * grid_h, dtype=self._dtype)
+
+        change = self._delta.update(obs, snake)
+        if change is None:
+            features[:] = 0.0
+            self._paint(features, snake, food, grid_w, grid_h)
+            return features
+
+        old_head, old_food, removed_tail = change
+        hx, hy = self._delta.head
+        fx, fy = self._delta.food
+        self._write_positions(features, (hx, hy), (fx, fy), grid_w, grid_h)
+
+        # Order matters: the new head may enter the vacated tail cell or the
+        # old food cell, and new food may spawn on the vacated tail cell
+        features[4 + old_food[1] * grid_w + old_food[0]] = 0.0
+        if removed_tail is not None:
+            features[4 + removed_tail[1] * grid_w + removed_tail[0]] = 0.0
+        features[4 + hy * grid_w + hx] = 1.0
+        features[4 + fy * grid_w + fx] = 2.0
         return features
 
 
@@ -419,9 +660,19 @@ class ImageWrapper(gym.ObservationWrapper):
         - Channel 0: Snake body (255 where snake exists)
         - Channel 1: Snake head (255 at head position)
         - Channel 2: Food (255 at food position)
+
+    With `incremental=True` the image is kept between steps and only the
+    changed pixels are rewritten (see GridFlattenWrapper); the returned
+    array is the wrapper's own buffer, switched on reset().
     """
 
-    def __init__(self, env: gym.Env):
+    def __init__(self, env: gym.Env, incremental: bool = False):
+        """
+        Args:
+            env: The Snake environment to wrap
+            incremental: Update the previous image in place instead of
+                repainting it every step
+        """
         super().__init__(env)
 
         grid_space = env.observation_space["grid_size"]
@@ -435,17 +686,31 @@ class ImageWrapper(gym.ObservationWrapper):
             dtype=np.uint8
         )
 
+        self.incremental = incremental
+        self._delta = _BodyDelta()
+        self._img = np.zeros((self.grid_height, self.grid_width, 3), dtype=np.uint8)
+        self._spare = np.zeros_like(self._img)
+
+    def reset(self, **kwargs):
+        self._delta.clear()
+        # Ping-pong: keep the previous episode's last observation intact
+        self._img, self._spare = self._spare, self._img
+        return super().reset(**kwargs)
+
     def observation(self, obs: Dict[str, Any]) -> np.ndarray:
         """Transform Dict observation to RGB image."""
-        snake = obs["snake"]
-        food = obs["food"]
-        snake_length = obs["snake_length"]
+        if self.incremental:
+            return self._update(obs)
 
         img = np.zeros((self.grid_height, self.grid_width, 3), dtype=np.uint8)
+        self._paint(img, snake_segments(obs), obs["food"])
+        return img
+
+    def _paint(self, img: np.ndarray, snake: np.ndarray, food: np.ndarray) -> None:
+        """Draw the full observation into a zeroed image."""
 
         # Channel 0: Snake body
-        for i in range(snake_length):
-            x, y = snake[i]
+        for x, y in snake:
             if x >= 0 and y >= 0:
                 img[y, x, 0] = 255
 
@@ -456,4 +721,259 @@ class ImageWrapper(gym.ObservationWrapper):
         # Channel 2: Food
         img[food[1], food[0], 2] = 255
 
+    def _update(self, obs: Dict[str, Any]) -> np.ndarray:
+        """Incremental observation(): patch the previous image in place."""
+        snake = snake_segments(obs)
+        img = self._img
+
+        change = self._delta.update(obs, snake)
+        if change is None:
+            img[:] = 0
+            self._paint(img, snake, obs["food"])
+            return img
+
+        old_head, old_food, removed_tail = change
+        hx, hy = self._delta.head
+        fx, fy = self._delta.food
+        if removed_tail is not None:
+            img[removed_tail[1], removed_tail[0], 0] = 0
+        img[hy, hx, 0] = 255
+        img[old_head[1], old_head[0], 1] = 0
+        img[hy, hx, 1] = 255
+        img[old_food[1], old_food[0], 2] = 0
+        img[fy, fx, 2] = 255
         return img
+
+
+class EgocentricWrapper(gym.ObservationWrapper):
+    """
+    Fixed-size egocentric view: a K x K window centered on the head and
+    rotated so the current direction points up, plus a coarse G x G map of
+    the whole board (rotated the same way).
+
+    The output size does not depend on the board, so a network trained on
+    10x10 can be run on 30x30, and the per-step cost stays constant: the
+    occupancy grid and the per-block body counts are kept between steps and
+    only the new head and the vacated tail are updated (as in the
+    incremental GridFlattenWrapper), so a step costs O(K*K + G*G). Resets
+    and other non-contiguous changes rebuild both in O(W*H).
+
+    Output: Box(shape=(2*K*K + 2*G*G,), dtype=float32)
+        [0 : K*K]           window obstacles (1 = body or wall, head at center)
+        [K*K : 2*K*K]       window food (1 at the food cell if inside)
+        [2*K*K : +G*G]      coarse map: fraction of each block occupied by body
+        [2*K*K+G*G : +G*G]  coarse map: 1 in the block holding the food
+
+    The window is a slice of a padded occupancy grid whose border is
+    pre-filled with walls, so cells past the edge read as obstacles.
+    """
+
+    # np.rot90 turns per direction (UP, DOWN, LEFT, RIGHT) so the heading is up
+    _ROTATIONS = (0, 2, -1, 1)
+
+    def __init__(self, env: gym.Env, view_size: int = 11, global_size: int = 4):
+        """
+        Args:
+            env: The Snake environment to wrap
+            view_size: Window side K (odd)
+            global_size: Coarse map side G (0 disables the map)
+        """
+        super().__init__(env)
+        if view_size < 1 or view_size % 2 == 0:
+            raise ValueError(f"view_size must be a positive odd number, got {view_size}")
+        if global_size < 0:
+            raise ValueError(f"global_size must be >= 0, got {global_size}")
+
+        self.view_size = view_size
+        self.global_size = global_size
+        self._radius = view_size // 2
+        self._board_shape: Tuple[int, int] = (0, 0)
+        self._delta = _BodyDelta()
+
+        size = 2 * view_size * view_size + 2 * global_size * global_size
+        self.observation_space = spaces.Box(
+            low=0.0,
+            high=1.0,
+            shape=(size,),
+            dtype=np.float32
+        )
+
+    def _prepare(self, grid_w: int, grid_h: int) -> None:
+        """(Re)build the padded grid and pooling matrices for a board size."""
+        r, g = self._radius, self.global_size
+        self._board_shape = (grid_w, grid_h)
+        self._padded = np.ones((grid_h + 2 * r, grid_w + 2 * r), dtype=np.float32)
+        self._board = self._padded[r:r + grid_h, r:r + grid_w]
+
+        # Block counts as two matmuls, (G, H) @ board @ (W, G), on full rebuilds
+        if g:
+            rows = np.arange(grid_h) * g // grid_h
+            cols = np.arange(grid_w) * g // grid_w
+            pool_y = (rows[None, :] == np.arange(g)[:, None]).astype(np.float32)
+            pool_x = (cols[:, None] == np.arange(g)[None, :]).astype(np.float32)
+            self._pool_y = pool_y
+            self._pool_x = pool_x
+            # Cells per block (boards smaller than G leave some blocks empty)
+            self._block_area = np.maximum(pool_y.sum(axis=1)[:, None] * pool_x.sum(axis=0)[None, :], 1)
+            self._block_y = rows
+            self._block_x = cols
+            self._block_counts = np.zeros((g, g), dtype=np.float32)
+
+    def reset(self, **kwargs):
+        self._delta.clear()
+        return super().reset(**kwargs)
+
+    def _update_board(self, obs: Dict[str, Any], snake: np.ndarray) -> None:
+        """Bring the occupancy grid and block counts up to date with obs."""
+        grid_w, grid_h = int(obs["grid_size"][0]), int(obs["grid_size"][1])
+        change = self._delta.update(obs, snake)
+        if self._board_shape != (grid_w, grid_h):
+            self._prepare(grid_w, grid_h)
+            change = None
+
+        board = self._board
+        if change is None:
+            board[:] = 0.0
+            body = snake[snake[:, 0] >= 0]
+            board[body[:, 1], body[:, 0]] = 1.0
+            if self.global_size:
+                self._block_counts[:] = self._pool_y @ board @ self._pool_x
+            return
+
+        # Tail first: the new head may enter the vacated tail cell
+        _, _, removed_tail = change
+        hx, hy = self._delta.head
+        if removed_tail is not None:
+            tx, ty = removed_tail
+            board[ty, tx] = 0.0
+            if self.global_size:
+                self._block_counts[self._block_y[ty], self._block_x[tx]] -= 1.0
+        board[hy, hx] = 1.0
+        if self.global_size:
+            self._block_counts[self._block_y[hy], self._block_x[hx]] += 1.0
+
+    def observation(self, obs: Dict[str, Any]) -> np.ndarray:
+        """Transform Dict observation to the egocentric view."""
+        snake = snake_segments(obs)
+        food = obs["food"]
+        self._update_board(obs, snake)
+
+        k, g, r = self.view_size, self.global_size, self._radius
+        turns = self._ROTATIONS[int(obs["direction"])]
+        hx, hy = int(snake[0][0]), int(snake[0][1])
+        fx, fy = int(food[0]), int(food[1])
+
+        features = np.zeros(self.observation_space.shape[0], dtype=np.float32)
+
+        # Window: padded[hy : hy + K, hx : hx + K] is centered on the head
+        window = self._padded[hy:hy + k, hx:hx + k]
+        features[:k * k] = np.rot90(window, turns).ravel()
+        if abs(fx - hx) <= r and abs(fy - hy) <= r:
+            food_window = np.zeros((k, k), dtype=np.float32)
+            food_window[fy - hy + r, fx - hx + r] = 1.0
+            features[k * k:2 * k * k] = np.rot90(food_window, turns).ravel()
+
+        # Coarse global map
+        if g:
+            offset = 2 * k * k
+            density = self._block_counts / self._block_area
+            features[offset:offset + g * g] = np.rot90(density, turns).ravel()
+            food_map = np.zeros((g, g), dtype=np.float32)
+            food_map[self._block_y[fy], self._block_x[fx]] = 1.0
+            features[offset + g * g:] = np.rot90(food_map, turns).ravel()
+
+        return features
+
+
+class FrameStackWrapper(gym.ObservationWrapper):
+    """
+    Stack the last k observations of a Box-observation wrapper (e.g.
+    ImageWrapper, GridFlattenWrapper) along the last axis, oldest first:
+    (N,) -> (k*N,), (H, W, C) -> (H, W, k*C).
+
+    Frames live in a preallocated ring of 2k slots and each frame is
+    written twice (slots i and i + k), so the last k frames are always the
+    contiguous slots i+1 .. i+k and the stack is returned as a view. A step
+    costs two frame writes instead of shifting k frames. The returned view
+    is overwritten by the next step; copy it if it must be kept. reset()
+    switches to a second ring, so the last stack of an episode (a VecEnv's
+    `terminal_observation`, which is kept by reference) survives the reset.
+
+    With `delta=True` the stack holds the newest frame plus the k - 1
+    differences between consecutive frames:
+        [f(t-k+2) - f(t-k+1), ..., f(t) - f(t-1), f(t)]
+    For Snake only a few cells change per step, so the differences are
+    almost all zero. Uint8 frames are stored as int16 in this mode.
+    """
+
+    def __init__(self, env: gym.Env, n_frames: int = 4, delta: bool = False):
+        """
+        Args:
+            env: Wrapped env with a Box observation space
+            n_frames: Number of frames k to stack
+            delta: Store frame differences instead of older frames
+        """
+        super().__init__(env)
+        if n_frames < 1:
+            raise ValueError(f"n_frames must be >= 1, got {n_frames}")
+        space = env.observation_space
+        if not isinstance(space, spaces.Box) or not space.shape:
+            raise ValueError("FrameStackWrapper needs a Box observation space")
+
+        self.n_frames = n_frames
+        self.delta = delta
+        self._channels = space.shape[-1]
+        dtype = np.int16 if delta and space.dtype == np.uint8 else space.dtype
+
+        low = np.asarray(space.low, dtype=np.float64)
+        high = np.asarray(space.high, dtype=np.float64)
+        if delta:
+            stack_low = [low - high] * (n_frames - 1) + [low]
+            stack_high = [high - low] * (n_frames - 1) + [high]
+        else:
+            stack_low, stack_high = [low] * n_frames, [high] * n_frames
+        self.observation_space = spaces.Box(
+            low=np.concatenate(stack_low, axis=-1).astype(dtype),
+            high=np.concatenate(stack_high, axis=-1).astype(dtype),
+            dtype=dtype,
+        )
+
+        ring_shape = space.shape[:-1] + (2 * n_frames * self._channels,)
+        self._ring = np.zeros(ring_shape, dtype=dtype)
+        self._spare = np.zeros(ring_shape, dtype=dtype)
+        self._newest: Optional[int] = None
+
+    def reset(self, **kwargs):
+        self._newest = None
+        # Ping-pong: keep the previous episode's last stack intact
+        self._ring, self._spare = self._spare, self._ring
+        return super().reset(**kwargs)
+
+    def _slot(self, i: int) -> np.ndarray:
+        c = self._channels
+        return self._ring[..., i * c:(i + 1) * c]
+
+    def _write(self, i: int, value: np.ndarray) -> None:
+        """Write a frame to slot i and its mirror slot i + k."""
+        self._slot(i)[...] = value
+        self._slot(i + self.n_frames)[...] = value
+
+    def observation(self, frame: np.ndarray) -> np.ndarray:
+        """Push a frame and return the stacked view."""
+        k = self.n_frames
+        if self._newest is None:
+            # First frame of an episode: pad the history with it
+            self._ring[...] = 0 if self.delta else np.concatenate([frame] * (2 * k), axis=-1)
+            self._newest = k - 1
+            self._write(self._newest, frame)
+        else:
+            previous = self._newest
+            self._newest = (previous + 1) % k
+            if self.delta and k > 1:
+                # The previous newest slot becomes the difference to this frame
+                self._write(previous, frame.astype(self._ring.dtype) - self._slot(previous))
+            self._write(self._newest, frame)
+
+        c = self._channels
+        start = (self._newest + 1) * c
+        return self._ring[..., start:start + k * c]
@@ -74,7 +74,8 @@ class BaseRLTrainer(ABC):
         total_timesteps: int = 100_000,
         n_envs: int = 4,
         callbacks: Optional[list[BaseCallback]] = None,
-        progress_bar: bool = True
+        progress_bar: bool = True,
+        vec_env: str = "dummy"
     ):
         """
         統一訓練流程
@@ -84,16 +85,19 @@ class BaseRLTrainer(ABC):
             n_envs: 並行環境數量
             callbacks: 訓練回調
             progress_bar: 是否顯示進度條
+            vec_env: 向量化後端 "dummy" / "subproc" / "shm" / "auto"
+                （見 shm_vec_env.py）
         """
-        from stable_baselines3.common.env_util import make_vec_env
+        from shm_vec_env import make_backend_vec_env
 
         print(f"=== Training {self.env_id} ===")
         print(f"Total timesteps: {total_timesteps:,}")
         print(f"Parallel envs: {n_envs}")
+        print(f"Vec env: {vec_env}")
         print()
 
         # 建立向量化環境
-        env = make_vec_env(self.env_id, n_envs=n_envs)
+        env = make_backend_vec_env(self.env_id, n_envs=n_envs, vec_env=vec_env)
 
         # 建立模型
         if self.model is not None:
@@ -0,0 +1,256 @@
+"""
+Sampling Profiler for Training Runs
+
+在真正的訓練中，對指定的 timesteps 區間取樣呼叫堆疊，
+捕捉 micro-benchmark 看不到的交互作用（Monitor 開銷、callback 頻率等）。
+
+背景執行緒每 interval 秒讀取一次訓練執行緒的堆疊（sys._current_frames），
+不需要插樁，訓練程式碼完全不變。取樣期間會調低 GIL 切換間隔，
+否則取樣點會偏向 torch 等釋放 GIL 的 C 呼叫，純 Python 的環境程式碼幾乎取樣不到。
+輸出：
+- <name>.collapsed: collapsed stacks（flamegraph.pl / speedscope 可讀）
+- <name>.speedscope.json: speedscope 格式（https://www.speedscope.app）
+
+結束時印出熱點路徑（HOT_PATHS）佔取樣數的比例。
+注意：只取樣主進程，SubprocVecEnv 子進程中的環境不在其中。
+
+使用方式：
+    >>> callback = ProfilerCallback(output_dir="output/logs", start=10_000, n_steps=20_000)
+    >>> model.learn(total_timesteps=100_000, callback=callback)
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from stable_baselines3.common.callbacks import BaseCallback
+
+# 熱點名稱 -> 函式 qualname 後綴
+HOT_PATHS: Dict[str, Tuple[str, ...]] = {
+    "snake_env_step": ("SnakeEnv.step", "SnakeVecEnv.step_wait"),
+    "feature_extraction": (
+        "Wrapper.observation",
+        "LidarHungerWrapper._extract_features",
+        "FeatureExtractor.__call__",
+        "VecCompact11._fill",
+        "VecGridFlatten._fill",
+        "VecImage._fill",
+        "VecLidarHunger._features",
+    ),
+    "stairs_get_state_dict": ("StairsEnv._get_state_dict",),
+    "sb3_train": ("DQN.train", "PPO.train"),
+}
+
+# 取樣期間的 GIL 切換間隔（秒）：取樣執行緒醒來後最多等這麼久就能讀到堆疊
+_SAMPLING_SWITCH_INTERVAL = 1e-5
+
+# (qualname, file, line)
+Frame = Tuple[str, str, int]
+
+
+class StackSampler:
+    """
+    以固定間隔取樣單一執行緒的呼叫堆疊
+
+    Args:
+        interval: 取樣間隔（秒）
+    """
+
+    def __init__(self, interval: float = 0.005):
+        if interval <= 0:
+            raise ValueError(f"interval must be > 0, got {interval}")
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self.duration = 0.0
+        self._frames: Dict[object, Frame] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        """開始取樣呼叫此方法的執行緒"""
+        if self.running:
+            return
+        self._target = threading.get_ident()
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, _SAMPLING_SWITCH_INTERVAL))
+        self._stop.clear()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止取樣"""
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        sys.setswitchinterval(self._switch_interval)
+        self.duration += time.perf_counter() - self._started
+
+    def _frame(self, code) -> Frame:
+        frame = self._frames.get(code)
+        if frame is None:
+            name = getattr(code, "co_qualname", code.co_name)
+            frame = self._frames[code] = (name, code.co_filename, code.co_firstlineno)
+        return frame
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                stack.append(self._frame(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                # 由外而內（root 在前）
+                self.counts[tuple(reversed(stack))] += 1
+
+    # ------------------------------------------------------------------
+    # 輸出
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _label(frame: Frame) -> str:
+        name, filename, line = frame
+        return f"{name} ({Path(filename).name}:{line})".replace(";", ",")
+
+    def collapsed(self) -> str:
+        """collapsed stacks：每行 `root;...;leaf count`"""
+        lines = [
+            ";".join(self._label(frame) for frame in stack) + f" {count}"
+            for stack, count in self.counts.most_common()
+        ]
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str) -> dict:
+        """speedscope 的 sampled profile（相同堆疊合併，權重為秒）"""
+        index: Dict[Frame, int] = {}
+        samples: List[List[int]] = []
+        weights: List[float] = []
+        for stack, count in self.counts.most_common():
+            samples.append([index.setdefault(frame, len(index)) for frame in stack])
+            weights.append(count * self.interval)
+        frames = [
+            {"name": frame[0], "file": frame[1], "line": frame[2]}
+            for frame in sorted(index, key=index.get)
+        ]
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "ml-training/shared/profiler.py",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+    def hot_path_shares(self, hot_paths: Dict[str, Tuple[str, ...]] = HOT_PATHS) -> Dict[str, float]:
+        """
+        各熱點的 inclusive 取樣比例
+
+        Returns:
+            熱點名稱 -> 堆疊中含有該函式的取樣比例（0-1）
+        """
+        total = sum(self.counts.values())
+        shares = {}
+        for label, suffixes in hot_paths.items():
+            hits = sum(
+                count for stack, count in self.counts.items()
+                if any(frame[0].endswith(suffixes) for frame in stack)
+            )
+            shares[label] = hits / total if total else 0.0
+        return shares
+
+    def write(self, output_dir: Union[str, Path], name: str) -> Tuple[Path, Path]:
+        """
+        寫出 collapsed 與 speedscope 檔案
+
+        Returns:
+            (collapsed 路徑, speedscope 路徑)
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        collapsed_path = output_dir / f"{name}.collapsed"
+        speedscope_path = output_dir / f"{name}.speedscope.json"
+        collapsed_path.write_text(self.collapsed())
+        with open(speedscope_path, "w") as f:
+            json.dump(self.speedscope(name), f)
+        return collapsed_path, speedscope_path
+
+
+class ProfilerCallback(BaseCallback):
+    """
+    在 [start, start + n_steps) timesteps 區間取樣訓練執行緒
+
+    區間結束（或訓練提前結束）時寫出 profile_<時間戳>.collapsed / .speedscope.json
+
+    Args:
+        output_dir: 輸出目錄（例如 output/logs）
+        start: 開始取樣的 timestep（跳過暖機）
+        n_steps: 取樣的 timesteps 數
+        interval: 取樣間隔（秒）
+        verbose: 是否印出摘要
+    """
+
+    def __init__(
+        self,
+        output_dir: Union[str, Path],
+        start: int = 10_000,
+        n_steps: int = 20_000,
+        interval: float = 0.005,
+        verbose: int = 1,
+    ):
+        super().__init__(verbose)
+        if start < 0 or n_steps <= 0:
+            raise ValueError(f"Invalid profile window: start={start}, n_steps={n_steps}")
+        self.output_dir = Path(output_dir)
+        self.start = start
+        self.n_steps = n_steps
+        self.sampler = StackSampler(interval)
+        self.name = f"profile_{time.strftime('%Y%m%d_%H%M%S')}"
+        self._done = False
+
+    def _on_training_start(self) -> None:
+        # 接續訓練時 num_timesteps 不從 0 開始，區間以本次訓練起點計算
+        self._offset = self.num_timesteps
+
+    def _on_step(self) -> bool:
+        if self._done:
+            return True
+        elapsed = self.num_timesteps - self._offset
+        if not self.sampler.running and elapsed >= self.start:
+            self.sampler.start()
+        elif self.sampler.running and elapsed >= self.start + self.n_steps:
+            self._finish()
+        return True
+
+    def _on_training_end(self) -> None:
+        if self.sampler.running:
+            self._finish()
+
+    def _finish(self) -> None:
+        self.sampler.stop()
+        self._done = True
+        collapsed_path, speedscope_path = self.sampler.write(self.output_dir, self.name)
+        if self.verbose:
+            n_samples = sum(self.sampler.counts.values())
+            print(f"\n[Profile] {n_samples:,} samples over {self.sampler.duration:.1f}s")
+            for label, share in self.sampler.hot_path_shares().items():
+                print(f"  {label:<24} {share:6.1%}")
+            print(f"  {collapsed_path}")
+            print(f"  {speedscope_path}")
@@ -0,0 +1,265 @@
+"""
+Shared-Memory Subprocess VecEnv
+
+每個環境跑在自己的子進程，觀測值直接寫入共享記憶體，
+主進程不必 pickle / unpickle 每一步的觀測陣列，管道只傳 reward、done、info
+
+另提供向量化後端選擇：
+- "dummy": 單進程逐一執行（DummyVecEnv）
+- "subproc": 每個環境一個子進程（SubprocVecEnv）
+- "shm": 子進程 + 共享記憶體觀測（ShmSubprocVecEnv，僅支援 Box 觀測空間）
+- "auto": 依單步耗時自動選擇
+
+使用方式：
+    >>> env = make_backend_vec_env("Stairs-v0", n_envs=4, vec_env="auto")
+"""
+
+import multiprocessing as mp
+import os
+import time
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, Optional, Type
+
+import gymnasium as gym
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.env_util import is_wrapped, make_vec_env
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv, VecEnv
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper, VecEnvObs, VecEnvStepReturn
+from stable_baselines3.common.vec_env.patch_gym import _patch_env
+
+VEC_BACKENDS = ("auto", "dummy", "subproc", "shm")
+
+# 單步耗時超過此值（秒）才值得跨進程：管道來回約數十微秒
+SUBPROC_MIN_STEP_SECONDS = 2e-4
+
+
+def _shm_worker(
+    remote: mp.connection.Connection,
+    parent_remote: mp.connection.Connection,
+    env_fn_wrapper: CloudpickleWrapper,
+) -> None:
+    parent_remote.close()
+    env = _patch_env(env_fn_wrapper.var())
+    # 共享記憶體在主進程取得觀測空間後才配置，由 "attach" 指令接上
+    shm: Optional[SharedMemory] = None
+    obs_view: Optional[np.ndarray] = None
+    reset_info: Optional[Dict[str, Any]] = {}
+    while True:
+        try:
+            cmd, data = remote.recv()
+            if cmd == "attach":
+                name, index, obs_shape, obs_dtype = data
+                shm = SharedMemory(name=name)
+                obs_view = np.ndarray((index + 1,) + obs_shape, dtype=obs_dtype, buffer=shm.buf)[index]
+                remote.send(None)
+            elif cmd == "step":
+                observation, reward, terminated, truncated, info = env.step(data)
+                done = terminated or truncated
+                info["TimeLimit.truncated"] = truncated and not terminated
+                if done:
+                    # 終局觀測走管道（僅回合結束時），新回合的觀測寫入共享記憶體
+                    info["terminal_observation"] = observation
+                    observation, reset_info = env.reset()
+                obs_view[...] = observation
+                remote.send((reward, done, info, reset_info))
+            elif cmd == "reset":
+                maybe_options = {"options": data[1]} if data[1] else {}
+                observation, reset_info = env.reset(seed=data[0], **maybe_options)
+                obs_view[...] = observation
+                remote.send(reset_info)
+            elif cmd == "render":
+                remote.send(env.render())
+            elif cmd == "close":
+                env.close()
+                if shm is not None:
+                    obs_view = None
+                    shm.close()
+                remote.close()
+                break
+            elif cmd == "get_spaces":
+                remote.send((env.observation_space, env.action_space))
+            elif cmd == "env_method":
+                method = env.get_wrapper_attr(data[0])
+                remote.send(method(*data[1], **data[2]))
+            elif cmd == "get_attr":
+                remote.send(env.get_wrapper_attr(data))
+            elif cmd == "has_attr":
+                try:
+                    env.get_wrapper_attr(data)
+                    remote.send(True)
+                except AttributeError:
+                    remote.send(False)
+            elif cmd == "set_attr":
+                remote.send(setattr(env, data[0], data[1]))
+            elif cmd == "is_wrapped":
+                remote.send(is_wrapped(env, data))
+            else:
+                raise NotImplementedError(f"`{cmd}` is not implemented in the worker")
+        except (EOFError, KeyboardInterrupt):
+            break
+
+
+class ShmSubprocVecEnv(SubprocVecEnv):
+    """
+    SubprocVecEnv 的共享記憶體版本
+
+    觀測值緩衝區形狀為 (n_envs, *obs_shape)，環境 i 只寫第 i 列；
+    step / reset 回傳的是該緩衝區的複本。其餘方法（get_attr、env_method 等）
+    沿用 SubprocVecEnv。
+
+    空間資訊向第 0 個子進程取得（get_spaces），主進程不會另外建立環境；
+    之後才配置共享記憶體並讓各子進程接上。
+    """
+
+    def __init__(self, env_fns: List[Callable[[], gym.Env]], start_method: Optional[str] = None):
+        """
+        Args:
+            env_fns: 建立環境的函式（每個子進程一個）
+            start_method: multiprocessing 啟動方式（預設同 SubprocVecEnv）
+        """
+        self.waiting = False
+        self.closed = False
+        self._shm: Optional[SharedMemory] = None
+        n_envs = len(env_fns)
+
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(start_method)
+
+        self.remotes, self.work_remotes = zip(*[ctx.Pipe() for _ in range(n_envs)])
+        self.processes = []
+        for work_remote, remote, env_fn in zip(self.work_remotes, self.remotes, env_fns):
+            args = (work_remote, remote, CloudpickleWrapper(env_fn))
+            # daemon=True: 主進程崩潰時不會卡住
+            process = ctx.Process(target=_shm_worker, args=args, daemon=True)
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+        self.remotes[0].send(("get_spaces", None))
+        observation_space, action_space = self.remotes[0].recv()
+        if not isinstance(observation_space, spaces.Box):
+            SubprocVecEnv.close(self)
+            raise ValueError(
+                f"ShmSubprocVecEnv 僅支援 Box 觀測空間，收到 {type(observation_space).__name__}"
+            )
+
+        obs_shape = observation_space.shape
+        obs_dtype = np.dtype(observation_space.dtype)
+        n_bytes = n_envs * int(np.prod(obs_shape)) * obs_dtype.itemsize
+        self._shm = SharedMemory(create=True, size=max(n_bytes, 1))
+        self._obs = np.ndarray((n_envs,) + obs_shape, dtype=obs_dtype, buffer=self._shm.buf)
+        for index, remote in enumerate(self.remotes):
+            remote.send(("attach", (self._shm.name, index, obs_shape, obs_dtype)))
+        for remote in self.remotes:
+            remote.recv()
+
+        VecEnv.__init__(self, n_envs, observation_space, action_space)
+
+    def step_wait(self) -> VecEnvStepReturn:
+        # recv 完成時各子進程已寫好自己的那一列
+        results = [remote.recv() for remote in self.remotes]
+        self.waiting = False
+        rews, dones, infos, self.reset_infos = zip(*results)
+        return self._obs.copy(), np.stack(rews), np.stack(dones), infos
+
+    def reset(self) -> VecEnvObs:
+        for env_idx, remote in enumerate(self.remotes):
+            remote.send(("reset", (self._seeds[env_idx], self._options[env_idx])))
+        self.reset_infos = [remote.recv() for remote in self.remotes]
+        self._reset_seeds()
+        self._reset_options()
+        return self._obs.copy()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        super().close()
+        if self._shm is not None:
+            self._obs = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+def measure_step_seconds(env: gym.Env, n_steps: int = 200) -> float:
+    """
+    以隨機動作量測單一環境的平均單步耗時
+
+    Args:
+        env: 要量測的環境（會被 reset）
+        n_steps: 量測步數
+
+    Returns:
+        平均每步秒數
+    """
+    env.reset(seed=0)
+    start = time.perf_counter()
+    for _ in range(n_steps):
+        _, _, terminated, truncated, _ = env.step(env.action_space.sample())
+        if terminated or truncated:
+            env.reset()
+    elapsed = time.perf_counter() - start
+    return elapsed / n_steps
+
+
+def select_vec_backend(env_fn: Callable[[], gym.Env], n_envs: int) -> str:
+    """
+    依環境成本選擇向量化後端
+
+    單環境、單核心，或單步比跨進程通訊還便宜時用 "dummy"；
+    否則 Box 觀測用 "shm"，其他觀測空間用 "subproc"
+
+    Args:
+        env_fn: 建立環境的函式
+        n_envs: 環境數量
+
+    Returns:
+        "dummy"、"subproc" 或 "shm"
+    """
+    if n_envs < 2 or (os.cpu_count() or 1) < 2:
+        return "dummy"
+    env = env_fn()
+    step_seconds = measure_step_seconds(env)
+    is_box = isinstance(env.observation_space, spaces.Box)
+    env.close()
+    if step_seconds < SUBPROC_MIN_STEP_SECONDS:
+        return "dummy"
+    return "shm" if is_box else "subproc"
+
+
+def make_backend_vec_env(
+    env_id: str,
+    n_envs: int = 4,
+    vec_env: str = "auto",
+    seed: Optional[int] = None,
+    env_kwargs: Optional[Dict[str, Any]] = None,
+) -> VecEnv:
+    """
+    以指定後端建立向量化環境（包含 Monitor，同 SB3 make_vec_env）
+
+    Args:
+        env_id: Gymnasium 環境 ID
+        n_envs: 環境數量
+        vec_env: "auto"、"dummy"、"subproc" 或 "shm"
+        seed: 隨機種子
+        env_kwargs: 傳給 gym.make 的參數
+
+    Returns:
+        VecEnv
+    """
+    if vec_env not in VEC_BACKENDS:
+        raise ValueError(f"未知的向量化後端: {vec_env!r}（可用: {VEC_BACKENDS}）")
+    if vec_env == "auto":
+        vec_env = select_vec_backend(lambda: gym.make(env_id, **(env_kwargs or {})), n_envs)
+        print(f"Vec env backend (auto): {vec_env}")
+
+    vec_env_cls: Dict[str, Type[VecEnv]] = {
+        "dummy": DummyVecEnv,
+        "subproc": SubprocVecEnv,
+        "shm": ShmSubprocVecEnv,
+    }
+    return make_vec_env(
+        env_id, n_envs=n_envs, seed=seed, env_kwargs=env_kwargs, vec_env_cls=vec_env_cls[vec_env]
+    )
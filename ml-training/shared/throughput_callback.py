@@ -0,0 +1,246 @@
+"""
+Training Throughput Callback
+
+記錄訓練吞吐量與時間分配，找出時間花在哪裡：
+- env_steps_per_sec: 每秒環境步數
+- grad_updates_per_sec: 每秒梯度更新次數（model._n_updates）
+- env_s: 環境 step 時間（VecEnv.step，含子進程通訊）
+- policy_s: rollout 中其餘時間（策略推論、寫入 replay/rollout buffer 等）
+- optimization_s: rollout 之間的時間（model.train()，即優化）
+- callbacks_s: 內層 callbacks 的時間
+- peak_rss_mb: 主進程的峰值記憶體
+- workers_peak_rss_mb: SubprocVecEnv 子進程峰值記憶體的總和
+  （讀 /proc/<pid>/status 的 VmHWM，僅 Linux；沒有子進程時為 None）
+
+每 log_freq 步寫一行 JSONL，並可同時寫入 TensorBoard。
+每步只多兩次 perf_counter 呼叫，額外開銷固定且很低。
+
+使用方式：
+    >>> callback = ThroughputCallback(
+    ...     [eval_callback],
+    ...     log_path="output/logs/throughput.jsonl",
+    ...     tensorboard_dir="output/logs",
+    ... )
+    >>> model.learn(total_timesteps=1_000_000, callback=callback)
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from stable_baselines3.common.callbacks import BaseCallback, CallbackList
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """主進程峰值 RSS（MB）；Linux 的 ru_maxrss 單位是 KB，macOS 是 bytes"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _process_peak_rss_mb(pid: int) -> Optional[float]:
+    """
+    執行中進程的峰值 RSS（MB），讀 /proc/<pid>/status 的 VmHWM
+
+    RUSAGE_CHILDREN 只計入已結束的子進程，量不到訓練中的 env workers
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024  # kB
+    except OSError:  # 非 Linux，或進程已結束
+        pass
+    return None
+
+
+def _worker_processes(env: Any) -> List[Any]:
+    """VecEnv（可能被 VecEnvWrapper 包住）的子進程；單進程 VecEnv 回傳空 list"""
+    while not hasattr(env, "processes") and hasattr(env, "venv"):
+        env = env.venv
+    return list(getattr(env, "processes", []))
+
+
+class ThroughputCallback(CallbackList):
+    """
+    吞吐量與時間分配記錄器
+
+    包住其他 callbacks（同 CallbackList），以便量測它們花的時間；
+    訓練期間會暫時替換 training_env.step 以量測環境時間，訓練結束後還原。
+
+    Args:
+        callbacks: 要包住的 callbacks
+        log_path: JSONL 輸出路徑（None 則不寫檔）
+        tensorboard_dir: TensorBoard 輸出目錄（None 則不寫）
+        log_freq: 每幾個 timesteps 記錄一次
+        verbose: 是否印出每次記錄
+    """
+
+    def __init__(
+        self,
+        callbacks: Optional[List[BaseCallback]] = None,
+        log_path: Optional[Union[str, Path]] = None,
+        tensorboard_dir: Optional[Union[str, Path]] = None,
+        log_freq: int = 10_000,
+        verbose: int = 0,
+    ):
+        super().__init__(list(callbacks or []))
+        if log_freq <= 0:
+            raise ValueError(f"log_freq must be > 0, got {log_freq}")
+        self.verbose = verbose
+        self.log_path = Path(log_path) if log_path else None
+        self.tensorboard_dir = tensorboard_dir
+        self.log_freq = log_freq
+        self.records: List[Dict[str, Any]] = []
+
+        self._file = None
+        self._writer = None
+        self._env = None
+
+    # ------------------------------------------------------------------
+    # 計時
+    # ------------------------------------------------------------------
+
+    def _reset_window(self, now: float) -> None:
+        self._window_start = now
+        self._window_timesteps = self.num_timesteps
+        self._window_updates = getattr(self.model, "_n_updates", 0)
+        self._env_time = 0.0
+        self._rollout_time = 0.0
+        self._optim_time = 0.0
+        self._callback_time = 0.0
+
+    def _timed_step(self, actions):
+        start = time.perf_counter()
+        result = self._env_step(actions)
+        self._env_time += time.perf_counter() - start
+        return result
+
+    def _on_training_start(self) -> None:
+        if self.log_path is not None:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.log_path, "a")
+        if self.tensorboard_dir is not None:
+            try:
+                from torch.utils.tensorboard import SummaryWriter
+            except ImportError:
+                raise ImportError(
+                    "TensorBoard not installed. Run: pip install tensorboard"
+                )
+            self._writer = SummaryWriter(str(self.tensorboard_dir))
+
+        # 以實例屬性覆蓋 step，SB3 的 collect_rollouts 會呼叫到它
+        self._env = self.training_env
+        self._env_step = self._env.step
+        self._workers = _worker_processes(self._env)
+        self._env.step = self._timed_step
+
+        now = time.perf_counter()
+        self._reset_window(now)
+        self._rollout_start = None
+        self._last_rollout_end = None
+        super()._on_training_start()
+
+    def _on_rollout_start(self) -> None:
+        now = time.perf_counter()
+        if self._last_rollout_end is not None:
+            self._optim_time += now - self._last_rollout_end
+        self._rollout_start = now
+        super()._on_rollout_start()
+
+    def _on_step(self) -> bool:
+        start = time.perf_counter()
+        continue_training = super()._on_step()
+        now = time.perf_counter()
+        self._callback_time += now - start
+
+        if self.num_timesteps - self._window_timesteps >= self.log_freq:
+            self._log(now)
+        return continue_training
+
+    def _on_rollout_end(self) -> None:
+        super()._on_rollout_end()
+        now = time.perf_counter()
+        if self._rollout_start is not None:
+            self._rollout_time += now - self._rollout_start
+        self._rollout_start = None
+        self._last_rollout_end = now
+
+    def _on_training_end(self) -> None:
+        # 提前停止時 rollout 可能還沒結束（SB3 不會呼叫 on_rollout_end）
+        now = time.perf_counter()
+        if self._rollout_start is None and self._last_rollout_end is not None:
+            self._optim_time += now - self._last_rollout_end
+        self._last_rollout_end = None
+        if self.num_timesteps > self._window_timesteps:
+            self._log(now)
+        super()._on_training_end()
+
+        del self._env.step
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    # ------------------------------------------------------------------
+    # 輸出
+    # ------------------------------------------------------------------
+
+    def _workers_peak_rss_mb(self) -> Optional[float]:
+        peaks = [_process_peak_rss_mb(process.pid) for process in self._workers]
+        peaks = [peak for peak in peaks if peak is not None]
+        return sum(peaks) if peaks else None
+
+    def _log(self, now: float) -> None:
+        """結算目前視窗並輸出"""
+        # 進行中的 rollout 先結算到現在
+        if self._rollout_start is not None:
+            self._rollout_time += now - self._rollout_start
+            self._rollout_start = now
+
+        wall = max(now - self._window_start, 1e-9)
+        steps = self.num_timesteps - self._window_timesteps
+        updates = getattr(self.model, "_n_updates", 0) - self._window_updates
+        policy_time = max(self._rollout_time - self._env_time - self._callback_time, 0.0)
+
+        record = {
+            "timesteps": self.num_timesteps,
+            "wall_s": round(wall, 4),
+            "env_steps_per_sec": round(steps / wall, 1),
+            "grad_updates_per_sec": round(updates / wall, 1),
+            "env_s": round(self._env_time, 4),
+            "policy_s": round(policy_time, 4),
+            "optimization_s": round(self._optim_time, 4),
+            "callbacks_s": round(self._callback_time, 4),
+            "peak_rss_mb": _peak_rss_mb(),
+            "workers_peak_rss_mb": self._workers_peak_rss_mb(),
+        }
+        self.records.append(record)
+
+        if self._file is not None:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+        if self._writer is not None:
+            for key in ("env_steps_per_sec", "grad_updates_per_sec", "peak_rss_mb", "workers_peak_rss_mb"):
+                if record[key] is not None:
+                    self._writer.add_scalar(f"throughput/{key}", record[key], self.num_timesteps)
+            for key in ("env_s", "policy_s", "optimization_s", "callbacks_s"):
+                self._writer.add_scalar(f"time_fraction/{key[:-2]}", record[key] / wall, self.num_timesteps)
+        if self.verbose:
+            print(f"[Throughput @ {self.num_timesteps:,}] "
+                  f"{record['env_steps_per_sec']:.0f} steps/s | "
+                  f"{record['grad_updates_per_sec']:.0f} updates/s | "
+                  f"env {self._env_time / wall:.0%} policy {policy_time / wall:.0%} "
+                  f"optim {self._optim_time / wall:.0%} callbacks {self._callback_time / wall:.0%}")
+
+        self._reset_window(now)
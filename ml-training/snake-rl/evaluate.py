@@ -7,6 +7,7 @@ Usage:
     python evaluate.py                    # Evaluate default model
     python evaluate.py --model custom.zip # Evaluate specific model
     python evaluate.py --episodes 100     # Run 100 evaluation episodes
+    python evaluate.py --record eval.snakelog  # Archive episodes for replay (see watch.py --replay)
 """
 
 import sys
@@ -20,7 +21,7 @@ from stable_baselines3 import DQN
 SCRIPT_DIR = Path(__file__).resolve().parent
 sys.path.insert(0, str(SCRIPT_DIR.parent))
 
-from environments import SnakeEnv, Compact11Wrapper
+from environments import SnakeEnv, Compact11Wrapper, EpisodeRecorder
 
 
 def make_env() -> Compact11Wrapper:
@@ -30,7 +31,12 @@ def make_env() -> Compact11Wrapper:
     return env
 
 
-def evaluate(model_path: Path, n_episodes: int = 50, verbose: bool = True) -> dict:
+def evaluate(
+    model_path: Path,
+    n_episodes: int = 50,
+    verbose: bool = True,
+    record_path: Path = None,
+) -> dict:
     """
     Evaluate model across multiple random seeds.
     
@@ -42,6 +48,8 @@ def evaluate(model_path: Path, n_episodes: int = 50, verbose: bool = True) -> di
     
     model = DQN.load(str(model_path))
     env = make_env()
+    if record_path:
+        env = EpisodeRecorder(env, record_path)
     
     scores = []
     for episode in range(n_episodes):
@@ -59,6 +67,8 @@ def evaluate(model_path: Path, n_episodes: int = 50, verbose: bool = True) -> di
         
         if verbose and (episode + 1) % 10 == 0:
             print(f"  Episode {episode + 1}/{n_episodes}: Score = {score}")
+
+    env.close()
     
     results = {
         "mean": np.mean(scores),
@@ -79,6 +89,8 @@ def main():
                         help="Number of evaluation episodes (default: 50)")
     parser.add_argument("--quiet", action="store_true",
                         help="Suppress per-episode output")
+    parser.add_argument("--record", type=str, default=None,
+                        help="Append episodes (seed + actions) to this log file")
     
     args = parser.parse_args()
     
@@ -94,7 +106,8 @@ def main():
     print(f"  Episodes: {args.episodes}")
     print("=" * 60)
     
-    results = evaluate(model_path, args.episodes, verbose=not args.quiet)
+    record_path = Path(args.record) if args.record else None
+    results = evaluate(model_path, args.episodes, verbose=not args.quiet, record_path=record_path)
     
     print("\n" + "=" * 60)
     print("Results")
@@ -102,6 +115,8 @@ def main():
     print(f"  Mean Score: {results['mean']:.1f} ± {results['std']:.1f}")
     print(f"  Min: {results['min']}, Max: {results['max']}")
     print(f"  Apples (avg): {results['mean'] / 10:.1f}")
+    if record_path:
+        print(f"  Recorded: {record_path}")
 
 
 if __name__ == "__main__":
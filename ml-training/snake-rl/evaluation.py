@@ -0,0 +1,433 @@
+"""
+Batched Multi-Seed Evaluation
+
+Plays one episode per seed with all seeds in lockstep: every tick the
+observations of the still-running episodes are stacked and the policy
+runs one batched forward pass, instead of one `model.predict` per step
+per episode. Finished episodes drop out of the batch.
+
+With `workers > 0` the seeds are split into contiguous chunks that run in
+a process pool (each worker keeps its own envs between evaluations and
+gets a pickled copy of the policy per call).
+
+Every episode is the same game as the sequential loop
+
+    obs, _ = env.reset(seed=seed)
+    while not done:
+        action, _ = model.predict(obs, deterministic=True)
+        obs, _, terminated, truncated, info = env.step(int(action))
+
+so scores and lengths are identical for the same seeds.
+
+`AsyncEvaluator` moves evaluation off the training loop: the callback
+hands a copy of the policy weights (state_dict) to a background process,
+which evaluates it, writes the best checkpoint and reports back; the
+callback picks up finished results on a later tick.
+
+`MultiSeedEvalCallback` is the SB3 callback the training scripts use on
+top of both evaluators.
+
+Usage:
+    >>> evaluator = SeedEvaluator(functools.partial(make_env, seed=999), workers=0)
+    >>> result = evaluator.evaluate(model.policy, seeds=[42, 179, 316])
+    >>> result.mean_score, result.max_score
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import gymnasium as gym
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback
+
+
+class EvalResult(NamedTuple):
+    """Per-seed results, in seed order."""
+    seeds: List[int]
+    scores: List[int]
+    lengths: List[int]
+
+    @property
+    def mean_score(self) -> float:
+        return float(np.mean(self.scores))
+
+    @property
+    def std_score(self) -> float:
+        return float(np.std(self.scores))
+
+    @property
+    def min_score(self) -> int:
+        return min(self.scores)
+
+    @property
+    def max_score(self) -> int:
+        return max(self.scores)
+
+    @property
+    def mean_length(self) -> float:
+        return float(np.mean(self.lengths))
+
+
+def eval_seeds(n_episodes: int) -> List[int]:
+    """The seeds MultiSeedEvalCallback uses: episode * 137 + 42."""
+    return [episode * 137 + 42 for episode in range(n_episodes)]
+
+
+def run_lockstep(
+    policy: Any,
+    envs: Sequence[gym.Env],
+    seeds: Sequence[int],
+    deterministic: bool = True,
+) -> Tuple[List[int], List[int]]:
+    """
+    Play one episode per seed, all in lockstep.
+
+    Args:
+        policy: Anything with SB3's predict(obs_batch, deterministic=...)
+            (e.g. model.policy or the model itself)
+        envs: At least len(seeds) envs; env i plays seeds[i]
+        seeds: Reset seed per episode
+        deterministic: Greedy actions
+
+    Returns:
+        scores, lengths: final info["score"] / info["snake_length"] per seed
+    """
+    if len(envs) < len(seeds):
+        raise ValueError(f"Need {len(seeds)} envs, got {len(envs)}")
+
+    obs = [env.reset(seed=int(seed))[0] for env, seed in zip(envs, seeds)]
+    scores = [0] * len(seeds)
+    lengths = [3] * len(seeds)
+    active = list(range(len(seeds)))
+
+    while active:
+        actions, _ = policy.predict(np.stack([obs[i] for i in active]), deterministic=deterministic)
+        running = []
+        for i, action in zip(active, actions):
+            obs[i], _, terminated, truncated, info = envs[i].step(int(action))
+            if terminated or truncated:
+                scores[i] = info.get("score", 0)
+                lengths[i] = info.get("snake_length", 3)
+            else:
+                running.append(i)
+        active = running
+
+    return scores, lengths
+
+
+# Worker-side state: env_fn and the envs built from it, reused between calls
+_worker_env_fn: Optional[Callable[[], gym.Env]] = None
+_worker_envs: List[gym.Env] = []
+
+
+def _init_worker(env_fn: Callable[[], gym.Env]) -> None:
+    global _worker_env_fn
+    import torch
+    torch.set_num_threads(1)
+    _worker_env_fn = env_fn
+
+
+def _run_chunk(args: Tuple[Any, List[int], bool]) -> Tuple[List[int], List[int]]:
+    policy, seeds, deterministic = args
+    while len(_worker_envs) < len(seeds):
+        _worker_envs.append(_worker_env_fn())
+    return run_lockstep(policy, _worker_envs, seeds, deterministic)
+
+
+class SeedEvaluator:
+    """
+    Reusable lockstep evaluator (keeps its envs and process pool).
+
+    Args:
+        env_fn: Creates one evaluation env (picklable if workers > 0; workers are spawned)
+        workers: Processes to spread the seeds over (0 = in-process)
+    """
+
+    def __init__(self, env_fn: Callable[[], gym.Env], workers: int = 0):
+        if workers < 0:
+            raise ValueError(f"workers must be >= 0, got {workers}")
+        self.env_fn = env_fn
+        self.workers = workers
+        self._envs: List[gym.Env] = []
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def evaluate(
+        self,
+        policy: Any,
+        seeds: Sequence[int],
+        deterministic: bool = True,
+    ) -> EvalResult:
+        """Play one episode per seed and collect the results."""
+        seeds = [int(seed) for seed in seeds]
+        if self.workers == 0 or len(seeds) < 2:
+            while len(self._envs) < len(seeds):
+                self._envs.append(self.env_fn())
+            scores, lengths = run_lockstep(policy, self._envs, seeds, deterministic)
+            return EvalResult(seeds, scores, lengths)
+
+        if self._pool is None:
+            # spawn: forking a process that already runs torch threads can deadlock
+            self._pool = ProcessPoolExecutor(
+                max_workers=min(self.workers, os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.env_fn,),
+            )
+        chunks = [list(chunk) for chunk in np.array_split(seeds, min(self.workers, len(seeds)))]
+        scores: List[int] = []
+        lengths: List[int] = []
+        for chunk_scores, chunk_lengths in self._pool.map(
+            _run_chunk, [(policy, chunk, deterministic) for chunk in chunks]
+        ):
+            scores.extend(chunk_scores)
+            lengths.extend(chunk_lengths)
+        return EvalResult(seeds, scores, lengths)
+
+    def close(self) -> None:
+        """Shut down the process pool and close the envs."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        for env in self._envs:
+            env.close()
+        self._envs = []
+
+
+class AsyncResult(NamedTuple):
+    """A finished background evaluation."""
+    step: int          # training step the weights were taken at
+    result: EvalResult
+    saved: bool        # the weights were written as the new best checkpoint
+
+
+# Background-evaluation worker state: a model loaded from the template
+_async_model: Any = None
+_async_best = -np.inf
+
+
+def _init_async_worker(env_fn: Callable[[], gym.Env], model_class: type, template_path: str) -> None:
+    global _async_model
+    _init_worker(env_fn)
+    _async_model = model_class.load(template_path, device="cpu")
+
+
+def _async_job(
+    state_dict: Dict[str, Any],
+    num_timesteps: int,
+    seeds: List[int],
+    step: int,
+    best_path: Optional[str],
+) -> AsyncResult:
+    global _async_best
+    _async_model.policy.load_state_dict(state_dict)
+    _async_model.num_timesteps = num_timesteps
+    scores, lengths = _run_chunk((_async_model.policy, seeds, True))
+    result = EvalResult(seeds, scores, lengths)
+
+    saved = False
+    if result.mean_score > _async_best:
+        _async_best = result.mean_score
+        if best_path:
+            _async_model.save(best_path)
+            saved = True
+    return AsyncResult(step, result, saved)
+
+
+class AsyncEvaluator:
+    """
+    Evaluate policy snapshots in one background process.
+
+    The model is saved once as a template (in a temporary directory); the
+    worker loads it (on CPU) and afterwards only receives state_dict copies
+    (and num_timesteps). Best checkpoints are full model zips, but apart
+    from the policy weights and num_timesteps they are copies of the
+    template: the rest of the saved state (exploration rate, learning-rate
+    progress, optimizer state, ...) is the one from start-up. They are
+    meant for evaluation and export, not for resuming training.
+
+    At most one evaluation is in flight: `submit()` returns False (and
+    does nothing) while the previous one is still running, so a slow
+    evaluation never queues up behind training.
+
+    Args:
+        env_fn: Creates one evaluation env (picklable; the worker is spawned)
+        model: The SB3 model being trained
+        best_path: Where the worker saves the best checkpoint (None = never)
+    """
+
+    def __init__(
+        self,
+        env_fn: Callable[[], gym.Env],
+        model: Any,
+        best_path: Optional[str] = None,
+    ):
+        self._tmp_dir = tempfile.mkdtemp(prefix="snake_eval_")
+        template_path = os.path.join(self._tmp_dir, "template.zip")
+        model.save(template_path)
+        self.best_path = best_path
+        self._model = model
+        self._pending: Optional[Future] = None
+        # spawn: forking a process that already runs torch threads can deadlock
+        self._pool = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_async_worker,
+            initargs=(env_fn, type(model), template_path),
+        )
+        # Start the worker (imports, template load) now, not at the first evaluation
+        self._pool.submit(int)
+
+    @property
+    def busy(self) -> bool:
+        return self._pending is not None and not self._pending.done()
+
+    def submit(self, seeds: Sequence[int], step: int) -> bool:
+        """Snapshot the current weights and start evaluating them."""
+        if self.busy:
+            return False
+        state_dict = {
+            key: value.detach().cpu().clone()
+            for key, value in self._model.policy.state_dict().items()
+        }
+        self._pending = self._pool.submit(
+            _async_job,
+            state_dict,
+            int(self._model.num_timesteps),
+            [int(seed) for seed in seeds],
+            step,
+            self.best_path,
+        )
+        return True
+
+    def poll(self) -> Optional[AsyncResult]:
+        """The finished evaluation, if any (each result is returned once)."""
+        if self._pending is None or not self._pending.done():
+            return None
+        future, self._pending = self._pending, None
+        return future.result()
+
+    def wait(self) -> Optional[AsyncResult]:
+        """Block until the running evaluation (if any) finishes."""
+        if self._pending is None:
+            return None
+        future, self._pending = self._pending, None
+        return future.result()
+
+    def close(self) -> None:
+        """Stop the worker process and remove the template."""
+        self._pool.shutdown(cancel_futures=True)
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+
+class MultiSeedEvalCallback(BaseCallback):
+    """
+    Evaluate using multiple random seeds for accurate performance measurement.
+    Stops training when average score reaches target.
+
+    All seeds are played in lockstep with one batched forward pass per tick
+    (SeedEvaluator); `eval_workers` spreads them over processes.
+
+    With `async_eval`, evaluation runs in a background process on a copy of
+    the weights (AsyncEvaluator), which also writes the best checkpoint
+    (only its policy weights and num_timesteps are current, see AsyncEvaluator).
+    Training keeps going meanwhile; results and the early-stop decision are
+    applied at the first callback tick after the evaluation finishes.
+
+    Args:
+        env_fn: Creates one evaluation env (picklable for workers / async_eval)
+        target_score: Mean score that stops training
+        n_eval_episodes: Seeds per evaluation
+        eval_freq: Evaluate every eval_freq callback calls
+        best_path: Where to save the best model (None = never)
+        eval_workers: Processes for SeedEvaluator (0 = in-process)
+        async_eval: Evaluate in a background process instead
+        verbose: Print each evaluation
+    """
+
+    def __init__(
+        self,
+        env_fn: Callable[[], gym.Env],
+        target_score: float = 200.0,
+        n_eval_episodes: int = 20,
+        eval_freq: int = 10000,
+        best_path: Optional[str] = None,
+        eval_workers: int = 0,
+        async_eval: bool = False,
+        verbose: int = 1,
+    ):
+        super().__init__(verbose)
+        self.env_fn = env_fn
+        self.evaluator = None if async_eval else SeedEvaluator(env_fn, workers=eval_workers)
+        self.async_evaluator: Optional[AsyncEvaluator] = None
+        self.async_eval = async_eval
+        self.target_score = target_score
+        self.n_eval_episodes = n_eval_episodes
+        self.eval_freq = eval_freq
+        self.best_path = best_path
+        self.best_mean_score = -np.inf
+        self.target_reached = False
+
+    def _on_training_start(self) -> None:
+        if self.async_eval:
+            self.async_evaluator = AsyncEvaluator(self.env_fn, self.model, best_path=self.best_path)
+
+    def _on_step(self) -> bool:
+        if self.async_evaluator is not None:
+            finished = self.async_evaluator.poll()
+            if finished is not None:
+                self._report_async(finished)
+            if self.target_reached:
+                return False
+
+        if self.n_calls % self.eval_freq != 0:
+            return True
+
+        # Evaluate with different seeds for each episode
+        seeds = eval_seeds(self.n_eval_episodes)
+        if self.async_evaluator is not None:
+            if not self.async_evaluator.submit(seeds, self.n_calls) and self.verbose:
+                print(f"\n[Eval @ {self.n_calls:,}] skipped: previous evaluation still running")
+            return True
+
+        result = self.evaluator.evaluate(self.model.policy, seeds)
+
+        # Save best model
+        if result.mean_score > self.best_mean_score and self.best_path:
+            self.model.save(self.best_path)
+
+        self._report(self.n_calls, result)
+        return not self.target_reached
+
+    def _report(self, step: int, result: EvalResult) -> None:
+        mean_score = result.mean_score
+        self.best_mean_score = max(self.best_mean_score, mean_score)
+
+        if self.verbose:
+            print(f"\n[Eval @ {step:,}] "
+                  f"Score: {mean_score:.1f} ± {result.std_score:.1f} | "
+                  f"Length: {result.mean_length:.1f} | "
+                  f"Min: {result.min_score} | Max: {result.max_score} | "
+                  f"Best: {self.best_mean_score:.1f}")
+
+        if mean_score >= self.target_score:
+            print(f"\n🎯 Target score {self.target_score} reached!")
+            self.target_reached = True
+
+    def _report_async(self, finished: AsyncResult) -> None:
+        self._report(finished.step, finished.result)
+        if finished.saved and self.verbose:
+            print(f"[Eval @ {finished.step:,}] New best checkpoint saved to {self.best_path}")
+
+    def _on_training_end(self) -> None:
+        if self.async_evaluator is not None:
+            # Report the evaluation still in flight, then stop the worker
+            finished = self.async_evaluator.wait()
+            if finished is not None:
+                self._report_async(finished)
+            self.async_evaluator.close()
+        else:
+            self.evaluator.close()
@@ -0,0 +1,68 @@
+"""
+Export recorded Snake episodes to video clips.
+
+Episodes are recorded with `python evaluate.py --record FILE` and rendered
+offline here, one worker process per episode.
+
+Usage:
+    python export_videos.py output/eval.snakelog                  # All episodes as GIF
+    python export_videos.py output/eval.snakelog --format mp4     # MP4 (needs imageio-ffmpeg)
+    python export_videos.py output/eval.snakelog --episodes 0 5 9 --stride 2
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Ensure environments package is importable
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR.parent))
+
+from environments.video import VIDEO_FORMATS, export_episodes
+
+OUTPUT_DIR = SCRIPT_DIR / "output" / "videos"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export recorded Snake episodes to video")
+    parser.add_argument("log", type=str,
+                        help="Episode log written by evaluate.py --record")
+    parser.add_argument("--out", type=str, default=str(OUTPUT_DIR),
+                        help=f"Output directory (default: {OUTPUT_DIR})")
+    parser.add_argument("--format", type=str, default="gif", choices=VIDEO_FORMATS,
+                        help="Video format (default: gif)")
+    parser.add_argument("--episodes", type=int, nargs="*", default=None,
+                        help="Episode indices to export (default: all)")
+    parser.add_argument("--cell-size", type=int, default=8,
+                        help="Pixels per grid cell (default: 8)")
+    parser.add_argument("--fps", type=int, default=15,
+                        help="Playback frames per second (default: 15)")
+    parser.add_argument("--stride", type=int, default=1,
+                        help="Keep every N-th frame (default: 1)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: CPU count, 0 = no pool)")
+
+    args = parser.parse_args()
+
+    log_path = Path(args.log)
+    if not log_path.exists():
+        print(f"❌ Episode log not found: {log_path}")
+        return
+
+    start = time.time()
+    paths = export_episodes(
+        log_path,
+        args.out,
+        episodes=args.episodes,
+        fmt=args.format,
+        cell_size=args.cell_size,
+        fps=args.fps,
+        stride=args.stride,
+        workers=args.workers,
+    )
+    print(f"✅ Exported {len(paths)} episodes to {args.out} in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,96 +9,81 @@ Usage:
     python train.py --target-score 300       # Train until avg 300 score
     python train.py --timesteps 100000       # Train for exactly 100K steps
     python train.py --deploy                 # Auto-deploy weights to frontend after training
+    python train.py --n-envs 16              # Collect from 16 batched games (SnakeVecEnv)
+    python train.py --features compact11     # Fused feature extractor (no Dict observations)
+    python train.py --jit                    # Numba step kernel (parity-checked at startup)
 """
 
 import sys
 import os
 import json
 import argparse
+import functools
 from pathlib import Path
+from typing import Optional
 
-import numpy as np
 from stable_baselines3 import DQN
-from stable_baselines3.common.callbacks import BaseCallback
 from stable_baselines3.common.monitor import Monitor
+from stable_baselines3.common.vec_env import DummyVecEnv, VecMonitor
 
 # Ensure environments package is importable
 SCRIPT_DIR = Path(__file__).resolve().parent
 sys.path.insert(0, str(SCRIPT_DIR.parent))
 
-from environments import SnakeEnv, Compact11Wrapper
+from environments import Compact11Wrapper, SnakeVecEnv
+from environments.features import make_feature_env
+from environments.snake_kernel import NUMBA_AVAILABLE, make_snake_env, verify_parity
+from environments.vec_wrappers import VecCompact11
+from evaluation import MultiSeedEvalCallback, SeedEvaluator
+from shared.profiler import ProfilerCallback
+from shared.throughput_callback import ThroughputCallback
 
 # Output directory (relative to this script)
 OUTPUT_DIR = SCRIPT_DIR / "output"
 
 
-class MultiSeedEvalCallback(BaseCallback):
-    """
-    Evaluate using multiple random seeds for accurate performance measurement.
-    Stops training when average score reaches target.
-    """
+def make_env(seed: int = 0, features: Optional[str] = None, jit: bool = False) -> Monitor:
+    """Create Snake environment with Compact11 feature wrapper.
 
-    def __init__(
-        self,
-        eval_env,
-        target_score: float = 200.0,
-        n_eval_episodes: int = 20,
-        eval_freq: int = 10000,
-        verbose: int = 1,
-    ):
-        super().__init__(verbose)
-        self.eval_env = eval_env
-        self.target_score = target_score
-        self.n_eval_episodes = n_eval_episodes
-        self.eval_freq = eval_freq
-        self.best_mean_score = -np.inf
-
-    def _on_step(self) -> bool:
-        if self.n_calls % self.eval_freq != 0:
-            return True
-
-        # Evaluate with different seeds for each episode
-        scores = []
-        for episode in range(self.n_eval_episodes):
-            seed = episode * 137 + 42  # Different seed per episode
-            obs, _ = self.eval_env.reset(seed=seed)
-            done = False
-            while not done:
-                action, _ = self.model.predict(obs, deterministic=True)
-                obs, _, terminated, truncated, info = self.eval_env.step(int(action))
-                done = terminated or truncated
-            scores.append(info.get("score", 0))
-
-        mean_score = np.mean(scores)
-        std_score = np.std(scores)
-        min_score = min(scores)
-        max_score = max(scores)
-
-        if mean_score > self.best_mean_score:
-            self.best_mean_score = mean_score
-
-        if self.verbose:
-            print(f"\n[Eval @ {self.n_calls:,}] "
-                  f"Mean: {mean_score:.1f} ± {std_score:.1f} | "
-                  f"Min: {min_score} | Max: {max_score} | "
-                  f"Best: {self.best_mean_score:.1f}")
-
-        if mean_score >= self.target_score:
-            print(f"\n🎯 Target score {self.target_score} reached!")
-            return False
-
-        return True
-
-
-def make_env(seed: int = 0) -> Compact11Wrapper:
-    """Create Snake environment with Compact11 feature wrapper."""
-    env = SnakeEnv(grid_width=10, grid_height=10, max_steps=500)
-    env = Compact11Wrapper(env)
+    With `jit`, uses the Numba step kernel (identical games, faster steps).
+    With `features` (a spec such as "compact11" or "lidar,length"), the fused
+    FeatureWrapper reads the game state directly instead of the Dict
+    observation + wrapper chain.
+    """
+    if features:
+        env = make_feature_env(features, jit=jit, grid_width=10, grid_height=10, max_steps=500)
+    else:
+        env = make_snake_env(jit=jit, grid_width=10, grid_height=10, max_steps=500)
+        env = Compact11Wrapper(env)
     env = Monitor(env)
     env.reset(seed=seed)
     return env
 
 
+def make_vec_env(n_envs: int, seed: int = 0, features: Optional[str] = None, jit: bool = False):
+    """Create n_envs batched Snake games with batched Compact11 features.
+
+    Fused feature specs read each game's state, so they run as a
+    DummyVecEnv of make_env() games instead (`jit` applies to those only).
+    """
+    if features:
+        return DummyVecEnv([
+            lambda i=i: make_env(seed=seed + i, features=features, jit=jit) for i in range(n_envs)
+        ])
+    venv = SnakeVecEnv(num_envs=n_envs, grid_width=10, grid_height=10, max_steps=500)
+    venv = VecMonitor(VecCompact11(venv))
+    venv.seed(seed)
+    return venv
+
+
+def check_jit() -> None:
+    """Guard for --jit: the Numba kernel must replay SnakeEnv games exactly."""
+    if not NUMBA_AVAILABLE:
+        raise SystemExit("--jit needs Numba. Run: pip install numba")
+    if not verify_parity(n_episodes=5, grid_width=10, grid_height=10, max_steps=500):
+        raise SystemExit("--jit: JitSnakeEnv diverges from SnakeEnv (see environments/snake_kernel.py)")
+
+
 def export_weights(model: DQN, output_path: Path) -> None:
     """Export Q-network weights to JSON for browser inference."""
     params = model.q_net.state_dict()
@@ -116,12 +101,20 @@ def train(args: argparse.Namespace) -> DQN:
     print("Snake RL Training")
     print(f"  Target Score: {args.target_score}")
     print(f"  Max Timesteps: {args.timesteps:,}")
+    print(f"  Parallel Envs: {args.n_envs}")
+    print(f"  Features: {args.features or 'Compact11Wrapper'}")
+    print(f"  Step Kernel: {'Numba' if args.jit else 'Python'}")
     print(f"  Output: {OUTPUT_DIR}")
     print("=" * 60)
 
     # Create environments
-    train_env = make_env(seed=42)
-    eval_env = make_env(seed=999)
+    if args.jit:
+        check_jit()
+    if args.n_envs > 1:
+        train_env = make_vec_env(args.n_envs, seed=42, features=args.features, jit=args.jit)
+    else:
+        train_env = make_env(seed=42, features=args.features, jit=args.jit)
+    eval_env_fn = functools.partial(make_env, seed=999, features=args.features, jit=args.jit)
 
     # Create DQN agent
     model = DQN(
@@ -145,18 +138,31 @@ def train(args: argparse.Namespace) -> DQN:
 
     # Callback for evaluation and early stopping
     eval_callback = MultiSeedEvalCallback(
-        eval_env=eval_env,
+        env_fn=eval_env_fn,
         target_score=args.target_score,
         n_eval_episodes=20,
-        eval_freq=10000,
+        eval_freq=max(10000 // args.n_envs, 1),  # callback runs once per batched step
+        eval_workers=args.eval_workers,
+        async_eval=args.async_eval,
         verbose=1,
     )
+    callbacks = [eval_callback]
+    if args.profile:
+        callbacks.append(ProfilerCallback(
+            OUTPUT_DIR / "logs", start=args.profile_start, n_steps=args.profile_steps
+        ))
+    if args.throughput:
+        callbacks = [ThroughputCallback(
+            callbacks,
+            log_path=OUTPUT_DIR / "logs" / "throughput.jsonl",
+            tensorboard_dir=OUTPUT_DIR / "logs" / "throughput",
+        )]
 
     # Train
     print("\nStarting training...")
     model.learn(
         total_timesteps=args.timesteps,
-        callback=eval_callback,
+        callback=callbacks,
         progress_bar=True,
     )
 
@@ -172,18 +178,12 @@ def train(args: argparse.Namespace) -> DQN:
 
     # Final evaluation
     print("\n--- Final Evaluation (50 episodes) ---")
-    scores = []
-    for seed in range(50):
-        obs, _ = eval_env.reset(seed=seed * 100)
-        done = False
-        while not done:
-            action, _ = model.predict(obs, deterministic=True)
-            obs, _, terminated, truncated, info = eval_env.step(int(action))
-            done = terminated or truncated
-        scores.append(info.get("score", 0))
-
-    print(f"Average: {np.mean(scores):.1f} ± {np.std(scores):.1f}")
-    print(f"Min: {min(scores)}, Max: {max(scores)}")
+    evaluator = SeedEvaluator(eval_env_fn, workers=args.eval_workers)
+    result = evaluator.evaluate(model.policy, [seed * 100 for seed in range(50)])
+    evaluator.close()
+
+    print(f"Average: {result.mean_score:.1f} ± {result.std_score:.1f}")
+    print(f"Min: {result.min_score}, Max: {result.max_score}")
 
     # Auto-deploy if requested
     if args.deploy:
@@ -216,6 +216,25 @@ def main():
                         help="Maximum training timesteps (default: 500000)")
     parser.add_argument("--deploy", action="store_true",
                         help="Auto-deploy weights to frontend after training")
+    parser.add_argument("--n-envs", type=int, default=1,
+                        help="Batched training games (SnakeVecEnv + VecCompact11) (default: 1)")
+    parser.add_argument("--features", type=str, default=None,
+                        help="Fused feature spec, e.g. 'compact11', 'compact11,space' or 'lidar,length,food_delta' "
+                             "(default: Compact11Wrapper)")
+    parser.add_argument("--jit", action="store_true",
+                        help="Step games with the Numba kernel (JitSnakeEnv), parity-checked at startup")
+    parser.add_argument("--eval-workers", type=int, default=0,
+                        help="Processes for multi-seed evaluation (default: 0 = in-process, batched)")
+    parser.add_argument("--async-eval", action="store_true",
+                        help="Evaluate in a background process while training continues")
+    parser.add_argument("--throughput", action="store_true",
+                        help="Log steps/sec and env/policy/optimization time to output/logs")
+    parser.add_argument("--profile", action="store_true",
+                        help="Sample call stacks over a window of timesteps (output/logs/profile_*)")
+    parser.add_argument("--profile-start", type=int, default=10_000,
+                        help="Timestep to start profiling at (default: 10000)")
+    parser.add_argument("--profile-steps", type=int, default=20_000,
+                        help="Timesteps to profile (default: 20000)")
     
     args = parser.parse_args()
     train(args)
@@ -10,96 +10,34 @@ Usage:
     python train_lidar.py                     # Default: 1M steps
     python train_lidar.py --timesteps 500000  # Train for 500K steps
     python train_lidar.py --deploy            # Auto-deploy after training
+    python train_lidar.py --n-envs 16         # Collect from 16 batched games (SnakeVecEnv)
 """
 
 import sys
 import os
 import json
 import argparse
+import functools
 from pathlib import Path
 
 import numpy as np
 from stable_baselines3 import DQN
-from stable_baselines3.common.callbacks import BaseCallback
 from stable_baselines3.common.monitor import Monitor
+from stable_baselines3.common.vec_env import VecMonitor
 
 # Ensure environments package is importable
 SCRIPT_DIR = Path(__file__).resolve().parent
 sys.path.insert(0, str(SCRIPT_DIR.parent))
 
-from environments import SnakeEnv, LidarHungerWrapper
+from environments import SnakeEnv, SnakeVecEnv, LidarHungerWrapper, VecLidarHunger
+from evaluation import MultiSeedEvalCallback, SeedEvaluator
+from shared.profiler import ProfilerCallback
+from shared.throughput_callback import ThroughputCallback
 
 # Output directory (relative to this script)
 OUTPUT_DIR = SCRIPT_DIR / "output"
 
 
-class MultiSeedEvalCallback(BaseCallback):
-    """
-    Evaluate using multiple random seeds for accurate performance measurement.
-    Logs detailed statistics and saves best model.
-    """
-
-    def __init__(
-        self,
-        eval_env,
-        target_score: float = 300.0,
-        n_eval_episodes: int = 20,
-        eval_freq: int = 10000,
-        save_path: Path = None,
-        verbose: int = 1,
-    ):
-        super().__init__(verbose)
-        self.eval_env = eval_env
-        self.target_score = target_score
-        self.n_eval_episodes = n_eval_episodes
-        self.eval_freq = eval_freq
-        self.save_path = save_path
-        self.best_mean_score = -np.inf
-
-    def _on_step(self) -> bool:
-        if self.n_calls % self.eval_freq != 0:
-            return True
-
-        # Evaluate with different seeds for each episode
-        scores = []
-        lengths = []
-        for episode in range(self.n_eval_episodes):
-            seed = episode * 137 + 42  # Different seed per episode
-            obs, _ = self.eval_env.reset(seed=seed)
-            done = False
-            while not done:
-                action, _ = self.model.predict(obs, deterministic=True)
-                obs, _, terminated, truncated, info = self.eval_env.step(int(action))
-                done = terminated or truncated
-            scores.append(info.get("score", 0))
-            lengths.append(info.get("snake_length", 3))
-
-        mean_score = np.mean(scores)
-        std_score = np.std(scores)
-        mean_length = np.mean(lengths)
-        min_score = min(scores)
-        max_score = max(scores)
-
-        # Save best model
-        if mean_score > self.best_mean_score:
-            self.best_mean_score = mean_score
-            if self.save_path:
-                self.model.save(str(self.save_path / "snake_lidar_best.zip"))
-
-        if self.verbose:
-            print(f"\n[Eval @ {self.n_calls:,}] "
-                  f"Score: {mean_score:.1f} ± {std_score:.1f} | "
-                  f"Length: {mean_length:.1f} | "
-                  f"Min: {min_score} | Max: {max_score} | "
-                  f"Best: {self.best_mean_score:.1f}")
-
-        if mean_score >= self.target_score:
-            print(f"\n🎯 Target score {self.target_score} reached!")
-            return False
-
-        return True
-
-
 def make_env(seed: int = 0, grid_size: int = 10) -> LidarHungerWrapper:
     """Create Snake environment with LidarHunger wrapper."""
     env = SnakeEnv(grid_width=grid_size, grid_height=grid_size, max_steps=500)
@@ -114,6 +52,14 @@ def make_env(seed: int = 0, grid_size: int = 10) -> LidarHungerWrapper:
     return env
 
 
+def make_vec_env(n_envs: int, seed: int = 0, grid_size: int = 10) -> VecMonitor:
+    """Create n_envs batched Snake games with batched LIDAR/hunger features."""
+    venv = SnakeVecEnv(num_envs=n_envs, grid_width=grid_size, grid_height=grid_size, max_steps=500)
+    venv = VecMonitor(VecLidarHunger(venv))
+    venv.seed(seed)
+    return venv
+
+
 def export_weights(model: DQN, output_path: Path) -> None:
     """Export Q-network weights to JSON for browser inference."""
     params = model.q_net.state_dict()
@@ -132,6 +78,7 @@ def train(args: argparse.Namespace) -> DQN:
     print(f"  Target Score: {args.target_score}")
     print(f"  Max Timesteps: {args.timesteps:,}")
     print(f"  Grid Size: {args.grid_size}x{args.grid_size}")
+    print(f"  Parallel Envs: {args.n_envs}")
     if args.load:
         print(f"  Continuing from: {args.load}")
     print(f"  Output: {OUTPUT_DIR}")
@@ -141,8 +88,11 @@ def train(args: argparse.Namespace) -> DQN:
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
     # 1. Setup Environment
-    train_env = make_env(seed=42, grid_size=args.grid_size)
-    eval_env = make_env(seed=999, grid_size=args.grid_size)
+    if args.n_envs > 1:
+        train_env = make_vec_env(args.n_envs, seed=42, grid_size=args.grid_size)
+    else:
+        train_env = make_env(seed=42, grid_size=args.grid_size)
+    eval_env_fn = functools.partial(make_env, seed=999, grid_size=args.grid_size)
 
     # 2. Setup Model
     if args.load:
@@ -205,13 +155,26 @@ def train(args: argparse.Namespace) -> DQN:
 
     # 3. Setup Callbacks
     eval_callback = MultiSeedEvalCallback(
-        eval_env=eval_env,
+        env_fn=eval_env_fn,
         target_score=args.target_score,
         n_eval_episodes=20,
-        eval_freq=10000,
-        save_path=OUTPUT_DIR,
+        eval_freq=max(10000 // args.n_envs, 1),  # callback runs once per batched step
+        best_path=str(OUTPUT_DIR / "snake_lidar_best.zip"),
+        eval_workers=args.eval_workers,
+        async_eval=args.async_eval,
         verbose=1,
     )
+    callbacks = [eval_callback]
+    if args.profile:
+        callbacks.append(ProfilerCallback(
+            OUTPUT_DIR / "logs", start=args.profile_start, n_steps=args.profile_steps
+        ))
+    if args.throughput:
+        callbacks = [ThroughputCallback(
+            callbacks,
+            log_path=OUTPUT_DIR / "logs" / "throughput.jsonl",
+            tensorboard_dir=OUTPUT_DIR / "logs" / "throughput",
+        )]
 
     # 4. Train
     print("\nStarting training...")
@@ -221,7 +184,7 @@ def train(args: argparse.Namespace) -> DQN:
     
     model.learn(
         total_timesteps=args.timesteps,
-        callback=eval_callback,
+        callback=callbacks,
         progress_bar=True,
         reset_num_timesteps=not args.load, # Don't reset timesteps if loading
     )
@@ -237,21 +200,13 @@ def train(args: argparse.Namespace) -> DQN:
 
     # 7. Final Evaluation
     print("\n--- Final Evaluation (50 episodes) ---")
-    scores = []
-    lengths = []
-    for seed in range(50):
-        obs, _ = eval_env.reset(seed=seed * 100)
-        done = False
-        while not done:
-            action, _ = model.predict(obs, deterministic=True)
-            obs, _, terminated, truncated, info = eval_env.step(int(action))
-            done = terminated or truncated
-        scores.append(info.get("score", 0))
-        lengths.append(info.get("snake_length", 3))
-
-    print(f"Score: {np.mean(scores):.1f} ± {np.std(scores):.1f}")
-    print(f"Length: {np.mean(lengths):.1f} ± {np.std(lengths):.1f}")
-    print(f"Min: {min(scores)}, Max: {max(scores)}")
+    evaluator = SeedEvaluator(eval_env_fn, workers=args.eval_workers)
+    result = evaluator.evaluate(model.policy, [seed * 100 for seed in range(50)])
+    evaluator.close()
+
+    print(f"Score: {result.mean_score:.1f} ± {result.std_score:.1f}")
+    print(f"Length: {result.mean_length:.1f} ± {np.std(result.lengths):.1f}")
+    print(f"Min: {result.min_score}, Max: {result.max_score}")
 
     # 8. Deploy (if requested)
     if args.deploy:
@@ -284,10 +239,24 @@ def main():
                         help="Maximum training timesteps (default: 1000000)")
     parser.add_argument("--grid-size", type=int, default=10,
                         help="Grid size (default: 10)")
+    parser.add_argument("--n-envs", type=int, default=1,
+                        help="Batched training games (SnakeVecEnv + VecLidarHunger) (default: 1)")
     parser.add_argument("--load", type=str,
                         help="Path to pretrained model to continue training")
     parser.add_argument("--deploy", action="store_true",
                         help="Auto-deploy weights to frontend after training")
+    parser.add_argument("--eval-workers", type=int, default=0,
+                        help="Processes for multi-seed evaluation (default: 0 = in-process, batched)")
+    parser.add_argument("--async-eval", action="store_true",
+                        help="Evaluate and checkpoint in a background process while training continues")
+    parser.add_argument("--throughput", action="store_true",
+                        help="Log steps/sec and env/policy/optimization time to output/logs")
+    parser.add_argument("--profile", action="store_true",
+                        help="Sample call stacks over a window of timesteps (output/logs/profile_*)")
+    parser.add_argument("--profile-start", type=int, default=10_000,
+                        help="Timestep to start profiling at (default: 10000)")
+    parser.add_argument("--profile-steps", type=int, default=20_000,
+                        help="Timesteps to profile (default: 20000)")
     
     args = parser.parse_args()
     train(args)
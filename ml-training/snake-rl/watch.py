@@ -7,6 +7,9 @@ Usage:
     python watch.py                 # Watch with default seed
     python watch.py --seed 123      # Watch with specific seed
     python watch.py --steps 50      # Watch for max 50 steps
+    python watch.py --replay eval.snakelog --episode 3 --start 200
+                                    # Replay a recorded episode from step 200
+                                    # (no model needed, see evaluate.py --record)
 """
 
 import sys
@@ -19,7 +22,7 @@ from stable_baselines3 import DQN
 SCRIPT_DIR = Path(__file__).resolve().parent
 sys.path.insert(0, str(SCRIPT_DIR.parent))
 
-from environments import SnakeEnv, Compact11Wrapper
+from environments import SnakeEnv, Compact11Wrapper, EpisodeReplayer
 
 
 def watch(model_path: Path, seed: int = 42, max_steps: int = 100):
@@ -74,6 +77,35 @@ def watch(model_path: Path, seed: int = 42, max_steps: int = 100):
     print("=" * 50)
 
 
+def replay(log_path: Path, episode: int = 0, start: int = 0, max_steps: int = 100):
+    """Print frames of a recorded episode without re-running the model."""
+    if not log_path.exists():
+        print(f"❌ Episode log not found: {log_path}")
+        return
+
+    replayer = EpisodeReplayer(log_path)
+    record = replayer.episodes[episode]
+    env = replayer.make_env(episode)
+    env.set_state(replayer.frame(episode, start))
+
+    print("=" * 50)
+    print(f"REPLAYING episode {episode}/{len(replayer) - 1} "
+          f"(seed={record.seed}, steps={len(record.actions)}, score={record.score})")
+    print("=" * 50)
+
+    dir_names = ['UP', 'DOWN', 'LEFT', 'RIGHT']
+    end = min(len(record.actions), start + max_steps)
+    for step in range(start, end):
+        action = int(record.actions[step])
+        print(f"\n--- Step {step} ---")
+        print(f"Direction: {dir_names[env.direction]} → Action: {dir_names[action]}")
+        print(env._render_ansi())
+        env.step(action)
+
+    print(f"\n--- Step {end} ---")
+    print(env._render_ansi())
+
+
 def main():
     parser = argparse.ArgumentParser(description="Watch Snake AI Play")
     parser.add_argument("--seed", type=int, default=42,
@@ -82,8 +114,18 @@ def main():
                         help="Maximum steps to watch (default: 100)")
     parser.add_argument("--model", type=str, default=None,
                         help="Path to model file (default: ./output/snake_dqn.zip)")
+    parser.add_argument("--replay", type=str, default=None,
+                        help="Replay an episode log written by evaluate.py --record")
+    parser.add_argument("--episode", type=int, default=0,
+                        help="Episode index in the replay log (default: 0)")
+    parser.add_argument("--start", type=int, default=0,
+                        help="First step to show when replaying (default: 0)")
     
     args = parser.parse_args()
+
+    if args.replay:
+        replay(Path(args.replay), args.episode, args.start, args.steps)
+        return
     
     if args.model:
         model_path = Path(args.model)
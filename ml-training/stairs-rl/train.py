@@ -11,6 +11,8 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "shared"))
 
 from base_trainer import BaseRLTrainer
+from profiler import ProfilerCallback
+from throughput_callback import ThroughputCallback
 from stable_baselines3 import PPO
 from stable_baselines3.common.callbacks import EvalCallback, CheckpointCallback, StopTrainingOnNoModelImprovement
 import gymnasium as gym
@@ -57,6 +59,18 @@ def main():
                         help='Total training timesteps (default: 10,000)')
     parser.add_argument('--n-envs', type=int, default=4,
                         help='Number of parallel environments (default: 4)')
+    parser.add_argument('--vec-env', type=str, default='auto',
+                        choices=['auto', 'dummy', 'subproc', 'shm'],
+                        help='Vectorization backend: auto picks by env step cost (default: auto)')
+    parser.add_argument('--throughput', action='store_true',
+                        help='Log steps/sec and env/policy/optimization time to output/logs')
+    parser.add_argument('--profile', action='store_true',
+                        help='Sample call stacks over a window of timesteps (output/logs/profile_*); '
+                             'use --vec-env dummy to include env steps')
+    parser.add_argument('--profile-start', type=int, default=2_000,
+                        help='Timestep to start profiling at (default: 2,000)')
+    parser.add_argument('--profile-steps', type=int, default=5_000,
+                        help='Timesteps to profile (default: 5,000)')
     parser.add_argument('--eval', action='store_true',
                         help='Evaluate existing model instead of training')
     parser.add_argument('--eval-freq', type=int, default=1000,
@@ -118,6 +132,17 @@ def main():
         )
 
         callbacks = [eval_callback, checkpoint_callback]
+        if args.profile:
+            callbacks.append(ProfilerCallback(
+                trainer.log_dir, start=args.profile_start, n_steps=args.profile_steps
+            ))
+        if args.throughput:
+            # 包住其他 callbacks，一併量測它們的耗時
+            callbacks = [ThroughputCallback(
+                callbacks,
+                log_path=trainer.log_dir / "throughput.jsonl",
+                tensorboard_dir=trainer.log_dir / "throughput",
+            )]
 
         print(f"Monitor training with: tensorboard --logdir {trainer.log_dir}\n")
 
@@ -126,7 +151,8 @@ def main():
             total_timesteps=args.timesteps,
             n_envs=args.n_envs,
             callbacks=callbacks,
-            progress_bar=True
+            progress_bar=True,
+            vec_env=args.vec_env
         )
 
         eval_env.close()
@@ -0,0 +1,6 @@
+"""Make the `environments` and `shared` packages importable from ml-training/."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
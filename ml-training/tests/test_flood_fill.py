@@ -0,0 +1,93 @@
+"""
+Run-based flood fill must agree with a plain BFS.
+"""
+
+from collections import deque
+
+import numpy as np
+import pytest
+
+from environments.features import FeatureExtractor
+from environments.flood_fill import RELATIVE_MOVES, accessible_area, move_areas
+from environments.snake_env import SnakeEnv
+
+_DELTAS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+
+def _bfs_area(occupancy, start):
+    """Cells reachable from start (counted), other occupied cells are walls."""
+    grid_h, grid_w = occupancy.shape
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        for dx, dy in _DELTAS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < grid_w and 0 <= ny < grid_h and not occupancy[ny, nx] and (nx, ny) not in seen:
+                seen.add((nx, ny))
+                queue.append((nx, ny))
+    return len(seen)
+
+
+def _bfs_move_area(occupancy, head, move):
+    grid_h, grid_w = occupancy.shape
+    x, y = head[0] + _DELTAS[move][0], head[1] + _DELTAS[move][1]
+    if not (0 <= x < grid_w and 0 <= y < grid_h) or occupancy[y, x]:
+        return 0
+    return _bfs_area(occupancy, (x, y))
+
+
+def _random_boards(n_boards, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(n_boards):
+        grid_w, grid_h = (int(v) for v in rng.integers(1, 13, size=2))
+        occupancy = (rng.random((grid_h, grid_w)) < rng.uniform(0.1, 0.7)).astype(np.uint8)
+        head = (int(rng.integers(grid_w)), int(rng.integers(grid_h)))
+        occupancy[head[1], head[0]] = 1
+        yield occupancy, head
+
+
+def test_accessible_area_matches_bfs():
+    for occupancy, head in _random_boards(500):
+        assert accessible_area(occupancy, head) == _bfs_area(occupancy, head)
+
+
+def test_move_areas_matches_bfs():
+    for occupancy, head in _random_boards(500, seed=1):
+        for direction, moves in RELATIVE_MOVES.items():
+            areas = move_areas(occupancy, head, direction)
+            expected = [_bfs_move_area(occupancy, head, move) for move in moves]
+            assert list(areas) == expected
+
+
+@pytest.mark.parametrize("shape", [(1, 7), (7, 1), (1, 1)])
+def test_single_row_and_column_boards(shape):
+    occupancy = np.zeros(shape, dtype=np.uint8)
+    grid_h, grid_w = shape
+    head = (grid_w // 2, grid_h // 2)
+    occupancy[head[1], head[0]] = 1
+    if grid_w > 2:
+        occupancy[0, 0] = 1  # split off one end
+    assert accessible_area(occupancy, head) == _bfs_area(occupancy, head)
+    for direction, moves in RELATIVE_MOVES.items():
+        areas = move_areas(occupancy, head, direction)
+        assert list(areas) == [_bfs_move_area(occupancy, head, move) for move in moves]
+
+
+def test_blocked_moves_have_zero_area():
+    # Head in a corner facing a wall, body on the only other side
+    occupancy = np.zeros((4, 4), dtype=np.uint8)
+    occupancy[0, 0] = occupancy[1, 0] = 1
+    areas = move_areas(occupancy, (0, 0), direction=0)  # UP: straight into the wall
+    assert areas.straight == 0
+    assert areas.left == 0       # LEFT: off the board
+    assert areas.right == 14     # RIGHT: every other free cell
+
+
+def test_space_feature_uses_move_areas():
+    env = SnakeEnv(grid_width=8, grid_height=6)
+    env.reset(seed=0)
+    extractor = FeatureExtractor("space", 8, 6)
+    areas = move_areas(env.occupancy, env.snake[0], env.direction)
+    expected = np.array([areas.straight, areas.right, areas.left], dtype=np.float32) / 48
+    np.testing.assert_allclose(extractor(env), expected)
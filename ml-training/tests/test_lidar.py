@@ -0,0 +1,73 @@
+"""
+The LIDAR engines must give the same features as the "raycast" reference.
+"""
+
+import numpy as np
+import pytest
+
+from environments import LidarHungerWrapper, SnakeEnv
+from environments.benchmark import _CyclePolicy, long_snake_state
+
+_DELTAS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+
+def _safe_random_action(env, rng):
+    """A random move that doesn't crash right away (if there is one)."""
+    head_x, head_y = env.snake[0]
+    actions = rng.permutation(4).tolist()
+    for action in actions:
+        x, y = head_x + _DELTAS[action][0], head_y + _DELTAS[action][1]
+        if 0 <= x < env.grid_width and 0 <= y < env.grid_height and not env.occupancy[y, x]:
+            return action
+    return actions[0]
+
+
+def _make_pair(engine, env_kwargs, grid_width, grid_height):
+    # max_snake_length covers the board: "raycast" reads the (untruncated) obs snake
+    kwargs = dict(grid_width=grid_width, grid_height=grid_height, max_steps=10_000,
+                  max_snake_length=grid_width * grid_height)
+    candidate = LidarHungerWrapper(SnakeEnv(**kwargs, **env_kwargs), engine=engine)
+    reference = LidarHungerWrapper(SnakeEnv(**kwargs), engine="raycast")
+    return candidate, reference
+
+
+def _assert_engine_matches_raycast(engine, env_kwargs, grid_width, grid_height):
+    candidate, reference = _make_pair(engine, env_kwargs, grid_width, grid_height)
+    rng = np.random.default_rng(0)
+    n_steps = 0
+    for seed in range(5):
+        obs, _ = candidate.reset(seed=seed)
+        expected, _ = reference.reset(seed=seed)
+        np.testing.assert_array_equal(obs, expected)
+        if seed % 2:
+            # Long body wound along the cycle, then followed with some detours
+            for env in (candidate.unwrapped, reference.unwrapped):
+                env.set_state(long_snake_state(env, grid_width * grid_height * 2 // 3, seed=seed))
+            policy = _CyclePolicy(grid_width, grid_height)
+        else:
+            policy = None
+
+        for _ in range(400):
+            env = candidate.unwrapped
+            if policy is not None and rng.random() > 0.05:
+                action = policy(env)
+            else:
+                action = _safe_random_action(env, rng)
+            obs, reward, terminated, truncated, _ = candidate.step(action)
+            expected, expected_reward, expected_terminated, expected_truncated, _ = reference.step(action)
+            np.testing.assert_array_equal(obs, expected)
+            assert (reward, terminated, truncated) == (expected_reward, expected_terminated, expected_truncated)
+            n_steps += 1
+            if terminated or truncated:
+                break
+    assert n_steps > 500
+
+
+@pytest.mark.parametrize("grid_width, grid_height", [(10, 10), (12, 8)])
+def test_bitboard_engine_matches_raycast(grid_width, grid_height):
+    _assert_engine_matches_raycast("bitboard", {"bitboard": True}, grid_width, grid_height)
+
+
+@pytest.mark.parametrize("grid_width, grid_height", [(10, 10), (12, 8)])
+def test_field_engine_matches_raycast(grid_width, grid_height):
+    _assert_engine_matches_raycast("field", {"distance_field": True}, grid_width, grid_height)
@@ -0,0 +1,66 @@
+"""
+UnpackObsExtractor must rebuild the float32 features of the default wrappers.
+"""
+
+import numpy as np
+import pytest
+
+th = pytest.importorskip("torch")
+pytest.importorskip("stable_baselines3")
+
+from stable_baselines3.common.preprocessing import preprocess_obs
+
+from environments import Compact11Wrapper, GridFlattenWrapper, SnakeEnv
+from environments.obs_extractors import UnpackObsExtractor
+
+
+def _collect(make_wrapper, compact_kwargs, grid_width, grid_height, n_steps=300):
+    """Play random games on a float32 wrapper and a compact one; return both obs batches."""
+    reference = make_wrapper(SnakeEnv(grid_width=grid_width, grid_height=grid_height))
+    compact = make_wrapper(SnakeEnv(grid_width=grid_width, grid_height=grid_height), **compact_kwargs)
+    rng = np.random.default_rng(0)
+    expected, observations = [], []
+    seed = 0
+    obs_a, _ = reference.reset(seed=seed)
+    obs_b, _ = compact.reset(seed=seed)
+    for _ in range(n_steps):
+        expected.append(np.array(obs_a))
+        observations.append(np.array(obs_b))
+        action = int(rng.integers(4))
+        obs_a, _, terminated, truncated, _ = reference.step(action)
+        obs_b, *_ = compact.step(action)
+        if terminated or truncated:
+            seed += 1
+            obs_a, _ = reference.reset(seed=seed)
+            obs_b, _ = compact.reset(seed=seed)
+    return compact.observation_space, np.stack(observations), np.stack(expected)
+
+
+def _unpack(observation_space, observations, **extractor_kwargs):
+    extractor = UnpackObsExtractor(observation_space, **extractor_kwargs)
+    # As the policy sees them: SB3 casts uint8 observations to float first
+    batch = preprocess_obs(th.as_tensor(observations), observation_space)
+    with th.no_grad():
+        features = extractor(batch)
+    assert features.dtype == th.float32
+    assert features.shape == (len(observations), extractor.features_dim)
+    return features.numpy()
+
+
+@pytest.mark.parametrize("packed_bits", [False, True])
+@pytest.mark.parametrize("grid_width, grid_height", [(10, 10), (12, 8)])
+def test_unpack_grid_matches_float32(grid_width, grid_height, packed_bits):
+    compact_kwargs = {"packed_bits": True} if packed_bits else {"dtype": "uint8"}
+    space, observations, expected = _collect(GridFlattenWrapper, compact_kwargs, grid_width, grid_height)
+    assert observations.dtype == np.uint8
+    features = _unpack(space, observations, layout="grid", grid_width=grid_width,
+                       grid_height=grid_height, packed_bits=packed_bits)
+    np.testing.assert_array_equal(features, expected)
+
+
+@pytest.mark.parametrize("packed_bits", [False, True])
+def test_unpack_compact11_matches_float32(packed_bits):
+    compact_kwargs = {"packed_bits": True} if packed_bits else {"dtype": "uint8"}
+    space, observations, expected = _collect(Compact11Wrapper, compact_kwargs, 10, 10)
+    features = _unpack(space, observations, layout="compact11", packed_bits=packed_bits)
+    np.testing.assert_array_equal(features, expected)
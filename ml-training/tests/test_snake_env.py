@@ -0,0 +1,220 @@
+"""
+SnakeEnv game rules and observation buffers.
+"""
+
+import numpy as np
+import pytest
+
+from environments import SnakeEnv, SnakeVecEnv
+from environments.benchmark import _CyclePolicy
+
+_DELTAS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+_OPPOSITE = (1, 0, 3, 2)
+
+
+class _BaselineSnake:
+    """The original list-based game, with its x-major food draw."""
+
+    def __init__(self, grid_width, grid_height, seed):
+        self.grid_width, self.grid_height = grid_width, grid_height
+        self.rng = np.random.default_rng(seed)
+        x, y = grid_width // 2, grid_height // 2
+        self.snake = [(x, y), (x - 1, y), (x - 2, y)]
+        self.direction = 3
+        self.spawn_food()
+
+    def spawn_food(self):
+        occupied = set(self.snake)
+        available = [
+            (x, y)
+            for x in range(self.grid_width)
+            for y in range(self.grid_height)
+            if (x, y) not in occupied
+        ]
+        if available:
+            self.food = available[self.rng.integers(0, len(available))]
+
+    def step(self, action):
+        """Returns False when the snake crashes."""
+        if action != _OPPOSITE[self.direction]:
+            self.direction = action
+        dx, dy = _DELTAS[self.direction]
+        head = (self.snake[0][0] + dx, self.snake[0][1] + dy)
+        if not (0 <= head[0] < self.grid_width and 0 <= head[1] < self.grid_height):
+            return False
+        if head in self.snake[:-1]:
+            return False
+        self.snake.insert(0, head)
+        if head == self.food:
+            self.spawn_food()
+        else:
+            self.snake.pop()
+        return True
+
+
+def _food_seeking_action(snake, food, direction, grid_width, grid_height, rng):
+    """Greedy toward the food, avoiding walls and body, 2% random moves."""
+    if rng.random() < 0.02:
+        return int(rng.integers(4))
+    head = snake[0]
+    body = set(snake[:-1])
+    best, best_distance = int(rng.integers(4)), None
+    for action in rng.permutation(4).tolist():
+        move = direction if action == _OPPOSITE[direction] else action
+        x, y = head[0] + _DELTAS[move][0], head[1] + _DELTAS[move][1]
+        if not (0 <= x < grid_width and 0 <= y < grid_height) or (x, y) in body:
+            continue
+        distance = abs(x - food[0]) + abs(y - food[1])
+        if best_distance is None or distance < best_distance:
+            best, best_distance = action, distance
+    return best
+
+
+def test_legacy_food_spawn_matches_baseline():
+    grid_width, grid_height = 7, 5
+    n_foods = 0
+    for seed in range(5):
+        env = SnakeEnv(grid_width=grid_width, grid_height=grid_height, max_steps=5000, legacy_food_spawn=True)
+        env.reset(seed=seed)
+        baseline = _BaselineSnake(grid_width, grid_height, seed)
+        rng = np.random.default_rng(100 + seed)
+
+        for _ in range(2000):
+            assert tuple(env.food) == baseline.food
+            action = _food_seeking_action(
+                baseline.snake, baseline.food, baseline.direction, grid_width, grid_height, rng
+            )
+            old_food = baseline.food
+            alive = baseline.step(action)
+            _, _, terminated, _, _ = env.step(action)
+            assert terminated == (not alive)
+            if not alive:
+                break
+            n_foods += baseline.food != old_food
+            assert list(env.snake) == baseline.snake
+    # Enough draws to cover a range of board fills
+    assert n_foods > 20
+
+
+@pytest.mark.parametrize("legacy_food_spawn", [False, True])
+def test_vec_env_draws_the_same_food(legacy_food_spawn):
+    grid_width, grid_height = 8, 6
+    for seed in range(5):
+        env = SnakeEnv(grid_width=grid_width, grid_height=grid_height, legacy_food_spawn=legacy_food_spawn)
+        env.reset(seed=seed)
+        venv = SnakeVecEnv(1, grid_width, grid_height, legacy_food_spawn=legacy_food_spawn)
+        venv.seed(seed)
+        obs = venv.reset()
+        rng = np.random.default_rng(seed)
+
+        for _ in range(1000):
+            np.testing.assert_array_equal(obs["food"][0], env.food)
+            action = _food_seeking_action(
+                list(env.snake), env.food, env.direction, grid_width, grid_height, rng
+            )
+            obs, _, dones, _ = venv.step(np.array([action]))
+            _, _, terminated, truncated, _ = env.step(action)
+            assert dones[0] == (terminated or truncated)
+            if dones[0]:
+                break
+
+
+@pytest.mark.parametrize("max_snake_length", [10, 100])
+def test_inplace_obs_survives_rebase(max_snake_length):
+    # A 6x4 board re-bases the snake window every 25 (or 101) steps
+    grid_width, grid_height = 6, 4
+    kwargs = dict(grid_width=grid_width, grid_height=grid_height, max_steps=5000, max_snake_length=max_snake_length)
+    inplace = SnakeEnv(obs_mode="inplace", **kwargs)
+    copy = SnakeEnv(obs_mode="copy", **kwargs)
+    policy = _CyclePolicy(grid_width, grid_height)
+    rng = np.random.default_rng(0)
+
+    n_steps = 0
+    for seed in range(3):
+        obs, _ = inplace.reset(seed=seed)
+        expected, _ = copy.reset(seed=seed)
+        done = False
+        while not done:
+            np.testing.assert_array_equal(obs["snake"], expected["snake"])
+            np.testing.assert_array_equal(obs["food"], expected["food"])
+            assert obs["snake_length"] == expected["snake_length"] == len(inplace.snake)
+            shown = min(len(inplace.snake), max_snake_length)
+            np.testing.assert_array_equal(obs["snake"][:shown], list(inplace.snake)[:shown])
+            assert (obs["snake"][shown:] == -1).all()
+
+            # Mostly along the cycle; the odd random move ends some games early
+            action = policy(inplace) if rng.random() > 0.01 else int(rng.integers(4))
+            obs, reward, terminated, truncated, _ = inplace.step(action)
+            expected, expected_reward, *_ = copy.step(action)
+            assert reward == expected_reward
+            done = terminated or truncated
+            n_steps += 1
+    # Several re-bases of the window (span = max(W * H, max_snake_length) + 1)
+    assert n_steps > 2 * (max(grid_width * grid_height, max_snake_length) + 1)
+
+
+def _play(env, actions):
+    """Step through `actions` (stopping at game over); return obs and rewards."""
+    trace = []
+    for action in actions:
+        obs, reward, terminated, truncated, _ = env.step(action)
+        trace.append((obs, reward, terminated, truncated, list(env.snake), env.food))
+        if terminated or truncated:
+            break
+    return trace
+
+
+def _assert_same_trace(trace, expected):
+    assert len(trace) == len(expected)
+    for (obs, *rest), (expected_obs, *expected_rest) in zip(trace, expected):
+        assert rest == expected_rest
+        for key, value in expected_obs.items():
+            np.testing.assert_array_equal(obs[key], value)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{}, {"snake_encoding": "chain"}, {"snake_encoding": "bitmap"}, {"bitboard": True, "distance_field": True}],
+    ids=lambda kwargs: str(kwargs or "defaults"),
+)
+def test_state_round_trip_replays_the_game(kwargs):
+    grid_width, grid_height = 8, 6
+    env = SnakeEnv(grid_width=grid_width, grid_height=grid_height, **kwargs)
+    env.reset(seed=7)
+    rng = np.random.default_rng(7)
+
+    def greedy_actions(n):
+        # Actions chosen against a scratch copy so that the snake eats (and redraws food)
+        scratch = env.clone()
+        actions = []
+        for _ in range(n):
+            action = _food_seeking_action(
+                list(scratch.snake), scratch.food, scratch.direction, grid_width, grid_height, rng
+            )
+            actions.append(action)
+            _, _, terminated, truncated, _ = scratch.step(action)
+            if terminated or truncated:
+                break
+        return actions
+
+    _play(env, greedy_actions(15))
+    state = env.get_state()
+    actions = greedy_actions(200)
+    expected = _play(env, actions)
+    assert sum(reward > 0 for _, reward, *_ in expected) >= 3
+
+    env.set_state(state)
+    _assert_same_trace(_play(env, actions), expected)
+
+    # A clone restored from the same snapshot is independent of the original
+    env.set_state(state)
+    clone = env.clone()
+    env.step(actions[0])
+    _assert_same_trace(_play(clone, actions), expected)
+    assert clone.get_state() != state
+
+
+def test_get_state_before_reset_raises():
+    env = SnakeEnv(grid_width=8, grid_height=6)
+    with pytest.raises(RuntimeError, match="before reset"):
+        env.get_state()
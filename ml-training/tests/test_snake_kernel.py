@@ -0,0 +1,14 @@
+"""
+JitSnakeEnv must play exactly the same games as SnakeEnv.
+"""
+
+import pytest
+
+pytest.importorskip("numba")
+
+from environments.snake_kernel import PARITY_CONFIGS, verify_parity
+
+
+@pytest.mark.parametrize("config", PARITY_CONFIGS, ids=lambda config: str(config or "defaults"))
+def test_jit_parity(config):
+    assert verify_parity(**config)
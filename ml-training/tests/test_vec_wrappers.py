@@ -0,0 +1,73 @@
+"""
+Batched wrappers must match their single-env counterparts game by game,
+and stay optional (they need Stable-Baselines3).
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from environments import LidarHungerWrapper, SnakeEnv, SnakeVecEnv, VecLidarHunger
+
+# DOWN, LEFT, UP, RIGHT: circles a 2x2 square without ever crashing
+_LOOP = [1, 2, 0, 3]
+
+
+def _compare_first_episodes(n_envs, max_steps, n_steps, choose_actions):
+    """Step both versions and compare each game until its first episode ends."""
+    venv = VecLidarHunger(SnakeVecEnv(n_envs, grid_width=8, grid_height=8, max_steps=max_steps))
+    venv.seed(3)
+    obs = venv.reset()
+    envs = [
+        LidarHungerWrapper(SnakeEnv(grid_width=8, grid_height=8, max_steps=max_steps), engine="table")
+        for _ in range(n_envs)
+    ]
+    expected = np.stack([env.reset(seed=3 + i)[0] for i, env in enumerate(envs)])
+    np.testing.assert_array_equal(obs, expected)
+
+    running = np.ones(n_envs, dtype=bool)
+    dones_seen = []
+    for t in range(n_steps):
+        actions = choose_actions(t)
+        obs, rewards, dones, infos = venv.step(actions)
+        for i in np.flatnonzero(running):
+            env_obs, reward, terminated, truncated, _ = envs[i].step(int(actions[i]))
+            assert np.isclose(rewards[i], reward)
+            assert dones[i] == (terminated or truncated)
+            if dones[i]:
+                np.testing.assert_array_equal(infos[i]["terminal_observation"], env_obs)
+                assert infos[i]["TimeLimit.truncated"] == (truncated and not terminated)
+                assert obs[i, 25] == 0.0
+                running[i] = False
+                dones_seen.append((t, terminated, truncated))
+            else:
+                np.testing.assert_array_equal(obs[i], env_obs)
+        if not running.any():
+            break
+    return dones_seen
+
+
+def test_vec_lidar_hunger_matches_wrapper():
+    rng = np.random.default_rng(0)
+    dones = _compare_first_episodes(16, 500, 300, lambda t: rng.integers(4, size=16))
+    assert len(dones) == 16
+
+
+def test_vec_lidar_hunger_starvation_truncates():
+    # Looping snakes never reach max_steps; they starve once food stops landing on the loop
+    dones = _compare_first_episodes(8, 2000, 600, lambda t: np.full(8, _LOOP[t % 4]))
+    starved = [t for t, terminated, truncated in dones if truncated and not terminated]
+    assert 500 in starved
+
+
+def test_star_import_without_sb3():
+    # The Vec* names are only exported when Stable-Baselines3 is importable
+    code = (
+        "import sys; sys.modules['stable_baselines3'] = None\n"
+        "from environments import *\n"
+        "assert 'SnakeEnv' in dir() and 'SnakeVecEnv' not in dir()\n"
+    )
+    root = Path(__file__).resolve().parents[1]
+    subprocess.run([sys.executable, "-c", code], cwd=root, check=True)
@@ -0,0 +1,101 @@
+"""
+Wrappers that return their own buffers must not corrupt a VecEnv's
+terminal_observation when the episode ends and the env is reset.
+"""
+
+import gymnasium as gym
+import numpy as np
+import pytest
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+from environments import EgocentricWrapper, FrameStackWrapper, GridFlattenWrapper, ImageWrapper, SnakeEnv
+from environments.benchmark import _CyclePolicy, long_snake_state
+
+
+class _StepRecorder(gym.Wrapper):
+    """Keeps a copy of the observation returned by the last step()."""
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        self.last_step_obs = obs.copy()
+        return obs, reward, terminated, truncated, info
+
+
+class _RawObsRecorder(gym.Wrapper):
+    """Keeps a copy of the Dict observation seen by the wrapper above."""
+
+    def reset(self, **kwargs):
+        obs, info = self.env.reset(**kwargs)
+        self.last_obs = {key: np.array(value) for key, value in obs.items()}
+        return obs, info
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        self.last_obs = {key: np.array(value) for key, value in obs.items()}
+        return obs, reward, terminated, truncated, info
+
+
+@pytest.mark.parametrize("make_wrapper", [
+    lambda env: GridFlattenWrapper(env, incremental=True),
+    lambda env: ImageWrapper(env, incremental=True),
+    lambda env: FrameStackWrapper(ImageWrapper(env), n_frames=3),
+    lambda env: FrameStackWrapper(GridFlattenWrapper(env), n_frames=3, delta=True),
+], ids=["grid-incremental", "image-incremental", "framestack", "framestack-delta"])
+def test_terminal_observation_survives_reset(make_wrapper):
+    venv = DummyVecEnv([
+        lambda: _StepRecorder(make_wrapper(SnakeEnv(grid_width=6, grid_height=6, max_steps=60)))
+    ])
+    venv.seed(7)
+    venv.reset()
+    rng = np.random.default_rng(0)
+
+    n_terminals = 0
+    for _ in range(400):
+        obs, _, dones, infos = venv.step(rng.integers(4, size=1))
+        if dones[0]:
+            # DummyVecEnv reset the env after this step: the terminal
+            # observation must still be what the last step returned
+            n_terminals += 1
+            terminal = infos[0]["terminal_observation"]
+            np.testing.assert_array_equal(terminal, venv.envs[0].last_step_obs)
+            assert not np.array_equal(terminal, obs[0])
+    venv.close()
+    assert n_terminals >= 3
+
+
+def _assert_egocentric_matches_rebuild(ego, obs):
+    # A fresh wrapper has no history, so it rebuilds the board from scratch
+    rebuilt = EgocentricWrapper(ego.unwrapped, ego.view_size, ego.global_size)
+    np.testing.assert_array_equal(obs, rebuilt.observation(ego.env.last_obs))
+
+
+@pytest.mark.parametrize("grid_w, grid_h, view_size, global_size, encoding", [
+    (8, 8, 5, 4, "padded"),
+    (12, 9, 7, 3, "padded"),
+    (6, 6, 5, 4, "bitmap"),
+])
+def test_egocentric_incremental_matches_rebuild(grid_w, grid_h, view_size, global_size, encoding):
+    env = SnakeEnv(grid_width=grid_w, grid_height=grid_h, max_steps=200, snake_encoding=encoding)
+    ego = EgocentricWrapper(_RawObsRecorder(env), view_size=view_size, global_size=global_size)
+    rng = np.random.default_rng(0)
+    obs, _ = ego.reset(seed=1)
+    _assert_egocentric_matches_rebuild(ego, obs)
+    for _ in range(2000):
+        obs, _, terminated, truncated, _ = ego.step(int(rng.integers(4)))
+        _assert_egocentric_matches_rebuild(ego, obs)
+        if terminated or truncated:
+            obs, _ = ego.reset()
+            _assert_egocentric_matches_rebuild(ego, obs)
+
+
+def test_egocentric_incremental_long_snake():
+    # Half-board snake past max_snake_length: the visible tail moves every step
+    env = SnakeEnv(grid_width=20, grid_height=20, max_steps=10_000, max_snake_length=100)
+    ego = EgocentricWrapper(_RawObsRecorder(env), view_size=11, global_size=4)
+    ego.reset(seed=0)
+    env.set_state(long_snake_state(env, 200))
+    policy = _CyclePolicy(20, 20)
+    for _ in range(600):
+        obs, _, terminated, truncated, _ = ego.step(policy(env))
+        _assert_egocentric_matches_rebuild(ego, obs)
+        assert not (terminated or truncated)